@@ -27,9 +27,11 @@ export async function benchmarkCommand(options: BenchmarkOptions = {}): Promise<
   try {
     // Run all benchmarks
     const reports = await suite.runAll();
+    const scaling = await suite.runScaling();
+    const startup = await suite.runStartup();
 
     // Generate report
-    const reportText = BenchmarkSuite.generateReport(reports);
+    const reportText = BenchmarkSuite.generateReport(reports, scaling, startup);
     console.log(reportText);
 
     // Save to file if output specified
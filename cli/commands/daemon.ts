@@ -0,0 +1,90 @@
+/**
+ * Daemon command for VibeSec CLI
+ *
+ * Starts, stops and reports on the scan daemon that `vibesec scan` hands
+ * its scans to when it is running
+ */
+
+import { spawn } from 'child_process';
+import chalk from 'chalk';
+import { ScanDaemon } from '../../src/daemon/server';
+import { daemonStatus, stopDaemon } from '../../src/daemon/client';
+import { socketPath } from '../../src/daemon/protocol';
+import { FriendlyErrorHandler } from '../../lib/errors/friendly-handler';
+
+interface DaemonCommandOptions {
+  detach?: boolean;
+}
+
+// How long start --detach waits for the new daemon to answer
+const START_TIMEOUT = 10000;
+
+export async function daemonCommand(action: string, options: DaemonCommandOptions): Promise<void> {
+  const errorHandler = new FriendlyErrorHandler();
+
+  try {
+    if (action === 'start') {
+      await (options.detach ? startDetached() : run());
+    } else if (action === 'stop') {
+      const status = await stopDaemon();
+      console.error(
+        status ? chalk.green(`✅ Scan daemon ${status.pid} stopped`) : 'No scan daemon is running'
+      );
+    } else if (action === 'status') {
+      const status = await daemonStatus();
+      if (!status) {
+        console.error('No scan daemon is running');
+        process.exit(1);
+      }
+      console.log(`Scan daemon ${status.pid} listening on ${socketPath()}`);
+      console.log(`   Up ${status.uptime}s, ${status.scans} scans, ${status.programs} rule sets`);
+    } else {
+      throw new Error(`Invalid action: ${action}. Must be one of: start, stop, status`);
+    }
+  } catch (error) {
+    errorHandler.handle(error as Error, {
+      action: `${action} scan daemon`,
+      userLevel: 'technical',
+    });
+    process.exit(1);
+  }
+}
+
+/**
+ * Serve scans in this process until stopped
+ */
+async function run(): Promise<void> {
+  const daemon = new ScanDaemon();
+  await daemon.listen();
+  console.error(chalk.bold(`🔥 Scan daemon listening on ${daemon.socket}`));
+  console.error(chalk.gray('   Scans from vibesec scan now run here. Press Ctrl+C to stop.'));
+
+  const stop = (): Promise<void> => daemon.close();
+  process.once('SIGINT', stop);
+  process.once('SIGTERM', stop);
+  await daemon.closed();
+}
+
+/**
+ * Start the daemon in the background and wait until it answers
+ */
+async function startDetached(): Promise<void> {
+  const running = await daemonStatus();
+  if (running) {
+    throw new Error(`A scan daemon is already running (pid ${running.pid})`);
+  }
+
+  const args = [...process.execArgv, process.argv[1], 'daemon', 'start'];
+  spawn(process.execPath, args, { detached: true, stdio: 'ignore' }).unref();
+
+  const deadline = Date.now() + START_TIMEOUT;
+  while (Date.now() < deadline) {
+    const status = await daemonStatus();
+    if (status) {
+      console.error(chalk.green(`✅ Scan daemon ${status.pid} listening on ${socketPath()}`));
+      return;
+    }
+    await new Promise((resolve) => setTimeout(resolve, 50));
+  }
+  throw new Error(`Scan daemon did not start within ${START_TIMEOUT / 1000}s`);
+}
@@ -0,0 +1,32 @@
+/**
+ * Rules command for VibeSec CLI
+ *
+ * Compiles a rules directory into the bundle the rule loader reads at
+ * startup instead of parsing every YAML file
+ */
+
+import * as nodePath from 'path';
+import chalk from 'chalk';
+import { RuleLoader } from '../../scanner/core/rule-loader';
+import { FriendlyErrorHandler } from '../../lib/errors/friendly-handler';
+
+export async function rulesCommand(action: string, path?: string): Promise<void> {
+  const errorHandler = new FriendlyErrorHandler();
+
+  try {
+    if (action !== 'compile') {
+      throw new Error(`Invalid action: ${action}. Must be one of: compile`);
+    }
+    const start = Date.now();
+    const { file, rules } = await new RuleLoader(path && nodePath.resolve(path)).compileBundle();
+    console.error(chalk.green(`✅ Compiled ${rules} rules into ${file}`));
+    console.error(chalk.gray(`   Took ${Date.now() - start}ms. Recompile after editing rules.`));
+  } catch (error) {
+    errorHandler.handle(error as Error, {
+      action: 'compile rules',
+      path,
+      userLevel: 'technical',
+    });
+    process.exit(1);
+  }
+}
@@ -1,21 +1,12 @@
-import { Severity, ScanOptions } from '../../scanner/core/types';
-import { Scanner } from '../../scanner/core/engine';
-import { PlainTextReporter } from '../../reporters/plaintext';
-import { JsonReporter } from '../../reporters/json';
-import { PlainLanguageReporter } from '../../reporters/plain-language';
-import { StakeholderReporter } from '../../reporters/stakeholder';
-import { FriendlyErrorHandler } from '../../lib/errors/friendly-handler';
-import ora from 'ora';
-import chalk from 'chalk';
+import type { Severity, ScanOptions, ScanEvent } from '../../scanner/core/types';
+import type { NdjsonReporter } from '../../reporters/ndjson';
+import type { SarifReporter } from '../../reporters/sarif';
+import { collectScanResult } from '../../scanner/core/scan-result';
+import { scanWithDaemon } from '../../src/daemon/client';
 
 // Check if colors should be disabled
 const NO_COLOR = process.env.NO_COLOR !== undefined || process.argv.includes('--no-color');
 
-// Disable chalk if --no-color is set
-if (NO_COLOR) {
-  chalk.level = 0;
-}
-
 interface ScanCommandOptions {
   format: string;
   severity: string;
@@ -26,13 +17,23 @@ interface ScanCommandOptions {
   color?: boolean;
   rules?: string;
   parallel: boolean;
+  concurrency?: string;
+  workers?: string;
+  cache?: boolean;
+  cacheDir?: string;
+  engine?: string;
+  patternTimeout?: string;
+  regexBackend?: string;
+  daemon?: boolean;
 }
 
+/**
+ * Reporters, the spinner and colors are loaded only by the code paths that
+ * use them, so machine-readable scans start without them
+ */
 export async function scanCommand(path: string, options: ScanCommandOptions): Promise<void> {
-  const errorHandler = new FriendlyErrorHandler();
-
   try {
-    const isJson = options.format === 'json';
+    const isJson = ['json', 'ndjson', 'sarif'].includes(options.format);
     const useExplain = options.explain || false;
 
     // Validate severity
@@ -42,64 +43,87 @@ export async function scanCommand(path: string, options: ScanCommandOptions): Pr
     const scanOptions: ScanOptions = {
       path,
       severity,
-      format: options.format as 'text' | 'json',
+      format: options.format as 'text' | 'json' | 'ndjson' | 'sarif',
       output: options.output,
-      exclude: options.exclude,
-      include: options.include,
       rulesPath: options.rules,
       parallel: options.parallel,
+      concurrency: validateConcurrency(options.concurrency),
+      workers: validateWorkers(options.workers),
+      cache: options.cache || options.cacheDir !== undefined,
+      cacheDir: options.cacheDir,
+      engine: validateEngine(options.engine),
+      patternTimeout: validatePatternTimeout(options.patternTimeout),
+      regexBackend: validateRegexBackend(options.regexBackend),
       quiet: isJson, // Suppress progress messages for JSON output
     };
+    // Leave the scanner's default patterns in place unless some were given
+    if (options.exclude) scanOptions.exclude = options.exclude;
+    if (options.include) scanOptions.include = options.include;
+
+    const useDaemon = options.daemon !== false && !process.env.VIBESEC_NO_DAEMON;
+
+    // NDJSON and SARIF are written as findings are produced rather than from a full result
+    if (options.format === 'ndjson' || options.format === 'sarif') {
+      let reporter: NdjsonReporter | SarifReporter;
+      if (options.format === 'ndjson') {
+        const { NdjsonReporter } = await import('../../reporters/ndjson');
+        reporter = new NdjsonReporter();
+      } else {
+        const { SarifReporter } = await import('../../reporters/sarif');
+        reporter = new SarifReporter({ root: await sarifRoot(path) });
+      }
+      const events = await startScan(scanOptions, useDaemon);
+      const { summary } = await writeStreaming(events, reporter, options.output);
+      if (summary.bySeverity.critical > 0 || summary.bySeverity.high > 0) {
+        process.exit(1);
+      }
+      return;
+    }
+
+    if (isJson) {
+      const startTime = Date.now();
+      const result = await collectScanResult(await startScan(scanOptions, useDaemon));
+      result.scan.duration = (Date.now() - startTime) / 1000;
 
-    // Create scanner
-    const scanner = new Scanner(scanOptions);
+      const { JsonReporter } = await import('../../reporters/json');
+      await writeReport(new JsonReporter().generate(result), options.output);
+      if (result.summary.bySeverity.critical > 0 || result.summary.bySeverity.high > 0) {
+        process.exit(1);
+      }
+      return;
+    }
 
-    // Progress indicator (only for non-JSON output)
-    const spinner = !isJson ? ora('Initializing scan...').start() : null;
+    // Progress indicator
+    const chalk = await loadChalk();
+    const { default: ora } = await import('ora');
+    const spinner = ora('Initializing scan...').start();
 
     try {
       // Run scan with progress updates
       const startTime = Date.now();
 
-      if (spinner) spinner.text = 'Finding files to scan...';
+      spinner.text = 'Finding files to scan...';
 
-      const result = await scanner.scan();
+      const result = await collectScanResult(await startScan(scanOptions, useDaemon));
 
       const duration = (Date.now() - startTime) / 1000;
       result.scan.duration = duration;
 
-      if (spinner) {
-        spinner.succeed(chalk.green('Scan complete!'));
-        console.error(''); // Empty line for spacing
+      spinner.succeed(chalk.green('Scan complete!'));
+      for (const diagnostic of result.diagnostics || []) {
+        const where = diagnostic.file ? ` in ${diagnostic.file}` : '';
+        console.error(chalk.yellow(`⚠️  ${diagnostic.rule}${where}: ${diagnostic.message}`));
       }
+      console.error(''); // Empty line for spacing
 
-      // Select reporter based on options
-      let reporter;
-      if (options.format === 'json') {
-        reporter = new JsonReporter();
-      } else if (options.format === 'stakeholder') {
-        reporter = new StakeholderReporter();
-      } else if (useExplain) {
-        reporter = new PlainLanguageReporter();
-      } else {
-        reporter = new PlainTextReporter();
-      }
-
-      const report = reporter.generate(result);
-
-      // Output report
+      const reporter = await loadReporter(options.format, useExplain);
+      await writeReport(reporter.generate(result), options.output);
       if (options.output) {
-        const fs = await import('fs').then((m) => m.promises);
-        await fs.writeFile(options.output, report);
-        if (!isJson) {
-          console.error(chalk.green(`✅ Report saved to ${options.output}`));
-        }
-      } else {
-        console.log(report);
+        console.error(chalk.green(`✅ Report saved to ${options.output}`));
       }
 
-      // Show success summary (non-JSON only)
-      if (!isJson && !options.output) {
+      // Show success summary
+      if (!options.output) {
         console.error(''); // Empty line
         console.error(chalk.bold('📊 Scan Summary:'));
         console.error(chalk.gray(`   Files scanned: ${result.scan.filesScanned}`));
@@ -160,13 +184,13 @@ export async function scanCommand(path: string, options: ScanCommandOptions): Pr
         process.exit(1);
       }
     } catch (scanError) {
-      if (spinner) {
-        spinner.fail(chalk.red('Scan failed'));
-      }
+      spinner.fail(chalk.red('Scan failed'));
       throw scanError;
     }
   } catch (error) {
-    errorHandler.handle(error as Error, {
+    await loadChalk();
+    const { FriendlyErrorHandler } = await import('../../lib/errors/friendly-handler');
+    new FriendlyErrorHandler().handle(error as Error, {
       action: 'scan project',
       path,
       userLevel: options.explain ? 'non-technical' : 'technical',
@@ -175,7 +199,137 @@ export async function scanCommand(path: string, options: ScanCommandOptions): Pr
   }
 }
 
-function validateSeverity(severity: string): Severity {
+/**
+ * chalk, with colors disabled if --no-color or NO_COLOR is set. Reporters
+ * share the same instance, so this runs before any of them is used.
+ */
+async function loadChalk() {
+  const { default: chalk } = await import('chalk');
+  if (NO_COLOR) {
+    chalk.level = 0;
+  }
+  return chalk;
+}
+
+/**
+ * Reporter for a format that needs the full result
+ */
+async function loadReporter(format: string, explain: boolean) {
+  if (format === 'stakeholder') {
+    const { StakeholderReporter } = await import('../../reporters/stakeholder');
+    return new StakeholderReporter();
+  }
+  if (explain) {
+    const { PlainLanguageReporter } = await import('../../reporters/plain-language');
+    return new PlainLanguageReporter();
+  }
+  const { PlainTextReporter } = await import('../../reporters/plaintext');
+  return new PlainTextReporter();
+}
+
+async function writeReport(report: string, output?: string): Promise<void> {
+  if (output) {
+    const fs = await import('fs').then((m) => m.promises);
+    await fs.writeFile(output, report);
+  } else {
+    console.log(report);
+  }
+}
+
+/**
+ * Events of the scan: from the scan daemon if it may be used and one is
+ * running, otherwise from a scan in this process
+ */
+async function startScan(
+  scanOptions: ScanOptions,
+  useDaemon: boolean
+): Promise<AsyncIterable<ScanEvent>> {
+  const events = useDaemon ? await scanWithDaemon(scanOptions) : null;
+  if (events) {
+    return events;
+  }
+  const { Scanner } = await import('../../scanner/core/engine');
+  return new Scanner(scanOptions).scanStream();
+}
+
+async function writeStreaming(
+  events: AsyncIterable<ScanEvent>,
+  reporter: NdjsonReporter | SarifReporter,
+  output?: string
+) {
+  if (!output) {
+    return reporter.write(events, process.stdout);
+  }
+
+  const fs = await import('fs');
+  const out = fs.createWriteStream(output);
+  try {
+    return await reporter.write(events, out);
+  } finally {
+    await new Promise((resolve) => out.end(resolve));
+  }
+}
+
+/**
+ * SARIF result URIs are relative to the scanned directory, or to the
+ * directory containing the scanned file
+ */
+async function sarifRoot(scanPath: string): Promise<string> {
+  const fs = await import('fs');
+  const nodePath = await import('path');
+  const resolved = nodePath.resolve(scanPath);
+  const stat = await fs.promises.stat(resolved).catch(() => null);
+  return stat?.isFile() ? nodePath.dirname(resolved) : resolved;
+}
+
+export function validateEngine(engine: string = 'regex'): 'regex' | 'combined' {
+  if (engine !== 'regex' && engine !== 'combined') {
+    throw new Error(`Invalid engine: ${engine}. Must be one of: regex, combined`);
+  }
+  return engine;
+}
+
+export function validateRegexBackend(backend: string = 'native'): 'native' | 'linear' {
+  if (backend !== 'native' && backend !== 'linear') {
+    throw new Error(`Invalid regex backend: ${backend}. Must be one of: native, linear`);
+  }
+  return backend;
+}
+
+function validateConcurrency(concurrency?: string): number | undefined {
+  if (concurrency === undefined) {
+    return undefined;
+  }
+  const count = Number(concurrency);
+  if (!Number.isInteger(count) || count < 1) {
+    throw new Error(`Invalid concurrency: ${concurrency}. Must be a positive whole number`);
+  }
+  return count;
+}
+
+export function validateWorkers(workers?: string): number | undefined {
+  if (workers === undefined) {
+    return undefined;
+  }
+  const count = Number(workers);
+  if (!Number.isInteger(count) || count < 1) {
+    throw new Error(`Invalid worker count: ${workers}. Must be a positive whole number`);
+  }
+  return count;
+}
+
+export function validatePatternTimeout(timeout?: string): number | undefined {
+  if (timeout === undefined) {
+    return undefined;
+  }
+  const ms = Number(timeout);
+  if (!Number.isInteger(ms) || ms < 0) {
+    throw new Error(`Invalid pattern timeout: ${timeout}. Must be a whole number of milliseconds`);
+  }
+  return ms;
+}
+
+export function validateSeverity(severity: string): Severity {
   const validSeverities = ['critical', 'high', 'medium', 'low'];
   if (!validSeverities.includes(severity.toLowerCase())) {
     throw new Error(`Invalid severity: ${severity}. Must be one of: ${validSeverities.join(', ')}`);
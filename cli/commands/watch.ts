@@ -0,0 +1,154 @@
+/**
+ * Watch command for VibeSec CLI
+ *
+ * Scans once, then rescans only the files that change and reports the
+ * findings that appeared or went away
+ */
+
+import * as nodePath from 'path';
+import chalk from 'chalk';
+import { Finding, ScanOptions, Severity } from '../../scanner/core/types';
+import { ScanWatcher, WatchDelta } from '../../scanner/core/watcher';
+import { FriendlyErrorHandler } from '../../lib/errors/friendly-handler';
+import {
+  validateEngine,
+  validatePatternTimeout,
+  validateRegexBackend,
+  validateSeverity,
+  validateWorkers,
+} from './scan';
+
+// Check if colors should be disabled
+if (process.env.NO_COLOR !== undefined || process.argv.includes('--no-color')) {
+  chalk.level = 0;
+}
+
+interface WatchCommandOptions {
+  format: string;
+  severity: string;
+  exclude?: string[];
+  include?: string[];
+  rules?: string;
+  debounce?: string;
+  workers?: string;
+  cache?: boolean;
+  cacheDir?: string;
+  engine?: string;
+  patternTimeout?: string;
+  regexBackend?: string;
+}
+
+const SEVERITY_COLORS: Record<Severity, chalk.Chalk> = {
+  [Severity.CRITICAL]: chalk.red.bold,
+  [Severity.HIGH]: chalk.red,
+  [Severity.MEDIUM]: chalk.yellow,
+  [Severity.LOW]: chalk.blue,
+};
+
+export async function watchCommand(path: string, options: WatchCommandOptions): Promise<void> {
+  const errorHandler = new FriendlyErrorHandler();
+
+  try {
+    const format = validateFormat(options.format);
+    const scanOptions: ScanOptions = {
+      path,
+      severity: validateSeverity(options.severity),
+      rulesPath: options.rules,
+      workers: validateWorkers(options.workers),
+      cache: options.cache || options.cacheDir !== undefined,
+      cacheDir: options.cacheDir,
+      engine: validateEngine(options.engine),
+      patternTimeout: validatePatternTimeout(options.patternTimeout),
+      regexBackend: validateRegexBackend(options.regexBackend),
+      quiet: true,
+    };
+    // Leave the scanner's default patterns in place unless some were given
+    if (options.exclude) scanOptions.exclude = options.exclude;
+    if (options.include) scanOptions.include = options.include;
+
+    const watcher = new ScanWatcher(scanOptions, { debounce: validateDebounce(options.debounce) });
+    process.once('SIGINT', () => watcher.close());
+
+    let first = true;
+    for await (const delta of watcher.deltas()) {
+      if (format === 'ndjson') {
+        console.log(deltaRecord(delta));
+      } else {
+        printDelta(delta, first, path);
+      }
+      first = false;
+    }
+  } catch (error) {
+    errorHandler.handle(error as Error, {
+      action: 'watch project',
+      path,
+      userLevel: 'technical',
+    });
+    process.exit(1);
+  }
+}
+
+/**
+ * One NDJSON record per delta
+ */
+function deltaRecord(delta: WatchDelta): string {
+  return JSON.stringify({ type: 'delta', timestamp: new Date().toISOString(), ...delta });
+}
+
+function printDelta(delta: WatchDelta, initial: boolean, path: string): void {
+  const { summary } = delta;
+  const totals = [
+    `${summary.bySeverity.critical} critical`,
+    `${summary.bySeverity.high} high`,
+    `${summary.bySeverity.medium} medium`,
+    `${summary.bySeverity.low} low`,
+  ].join(', ');
+
+  if (initial) {
+    console.error(chalk.bold(`👀 Watching ${path} (${delta.files.length} files)`));
+    console.error(chalk.gray(`   ${summary.total} issues: ${totals}. Press Ctrl+C to stop.`));
+  } else {
+    const time = new Date().toLocaleTimeString();
+    const files = `${delta.files.length} file${delta.files.length === 1 ? '' : 's'}`;
+    const added = chalk.red(`+${delta.added.length} new`);
+    const fixed = chalk.green(`-${delta.fixed.length} fixed`);
+    console.error(`${chalk.gray(`[${time}]`)} ${files} changed: ${added}, ${fixed}`);
+    console.error(chalk.gray(`   ${summary.total} issues: ${totals}`));
+  }
+
+  for (const finding of delta.added) {
+    console.log(formatFinding(chalk.red('+'), finding));
+  }
+  for (const finding of delta.fixed) {
+    console.log(formatFinding(chalk.green('-'), finding));
+  }
+  for (const diagnostic of delta.diagnostics) {
+    const where = diagnostic.file ? ` in ${diagnostic.file}` : '';
+    console.error(chalk.yellow(`⚠️  ${diagnostic.rule}${where}: ${diagnostic.message}`));
+  }
+}
+
+function formatFinding(marker: string, finding: Finding): string {
+  const severity = SEVERITY_COLORS[finding.severity](finding.severity.toUpperCase().padEnd(8));
+  const file = nodePath.relative(process.cwd(), finding.location.file);
+  const where = chalk.gray(`${file}:${finding.location.line}`);
+  return `${marker} ${severity} ${finding.title} ${where}`;
+}
+
+function validateFormat(format: string): 'text' | 'ndjson' {
+  if (format !== 'text' && format !== 'ndjson') {
+    throw new Error(`Invalid format: ${format}. Must be one of: text, ndjson`);
+  }
+  return format;
+}
+
+function validateDebounce(debounce?: string): number | undefined {
+  if (debounce === undefined) {
+    return undefined;
+  }
+  const ms = Number(debounce);
+  if (!Number.isInteger(ms) || ms < 0) {
+    throw new Error(`Invalid debounce: ${debounce}. Must be a whole number of milliseconds`);
+  }
+  return ms;
+}
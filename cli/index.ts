@@ -1,17 +1,30 @@
 #!/usr/bin/env node
 
 import { Command } from 'commander';
-import { scanCommand } from './commands/scan';
-import { benchmarkCommand } from './commands/benchmark';
-import { initSentryFromEnv } from '../src/observability/integrations/sentry';
 
-// Initialize observability (Sentry logging and error tracking)
-try {
-  if (process.env.SENTRY_DSN) {
+/**
+ * Action that loads its command's module when the command runs, so
+ * `--help`, `--version` and each command only pay for what they use
+ */
+function lazy<T extends unknown[]>(
+  load: () => Promise<(...args: T) => Promise<void>>
+): (...args: T) => Promise<void> {
+  return async (...args: T) => (await load())(...args);
+}
+
+/**
+ * Sentry logging and error tracking, loaded only when configured
+ */
+async function initObservability(): Promise<void> {
+  if (!process.env.SENTRY_DSN) {
+    return;
+  }
+  try {
+    const { initSentryFromEnv } = await import('../src/observability/integrations/sentry');
     initSentryFromEnv();
+  } catch (error) {
+    console.error('Failed to initialize Sentry:', error);
   }
-} catch (error) {
-  console.error('Failed to initialize Sentry:', error);
 }
 
 const program = new Command();
@@ -22,7 +35,7 @@ program
   .command('scan')
   .description('Scan a directory or file for security vulnerabilities')
   .argument('[path]', 'Path to scan', '.')
-  .option('-f, --format <format>', 'Output format (text|json|stakeholder)', 'text')
+  .option('-f, --format <format>', 'Output format (text|json|ndjson|sarif|stakeholder)', 'text')
   .option('-s, --severity <level>', 'Minimum severity level (critical|high|medium|low)', 'low')
   .option('-o, --output <file>', 'Output file path (default: stdout)')
   .option('-e, --exclude <patterns...>', 'File patterns to exclude')
@@ -31,6 +44,14 @@ program
   .option('--no-color', 'Disable colored output')
   .option('--rules <path>', 'Custom rules directory path')
   .option('--no-parallel', 'Disable parallel scanning')
+  .option('--concurrency <n>', 'Files read and matched at once in parallel mode (default: 16)')
+  .option('--workers <n>', 'Worker threads that scan batches of files (default: 1)')
+  .option('--cache', 'Reuse findings for files unchanged since the last cached scan')
+  .option('--cache-dir <dir>', 'Result cache directory (default: .vibesec-cache)')
+  .option('--engine <engine>', 'Matching engine (regex|combined)', 'regex')
+  .option('--pattern-timeout <ms>', 'Time budget per rule pattern per file (0 disables)')
+  .option('--regex-backend <backend>', 'Regex backend for rule patterns (native|linear)', 'native')
+  .option('--no-daemon', 'Scan in this process even if a scan daemon is running')
   .addHelpText(
     'after',
     `
@@ -50,7 +71,75 @@ Tips:
   • Have questions? Check docs at https://github.com/vibesec/vibesec
 `
   )
-  .action(scanCommand);
+  .action(lazy(() => import('./commands/scan').then((m) => m.scanCommand)));
+
+program
+  .command('watch')
+  .description('Scan, then rescan changed files and report new and fixed issues')
+  .argument('[path]', 'Path to watch', '.')
+  .option('-f, --format <format>', 'Output format (text|ndjson)', 'text')
+  .option('-s, --severity <level>', 'Minimum severity level (critical|high|medium|low)', 'low')
+  .option('-e, --exclude <patterns...>', 'File patterns to exclude')
+  .option('-i, --include <patterns...>', 'File patterns to include')
+  .option('--no-color', 'Disable colored output')
+  .option('--rules <path>', 'Custom rules directory path')
+  .option('--debounce <ms>', 'Quiet period before changed files are rescanned (default: 100)')
+  .option('--workers <n>', 'Worker threads for the initial scan (default: 1)')
+  .option('--cache', 'Reuse findings for files unchanged since the last cached scan')
+  .option('--cache-dir <dir>', 'Result cache directory (default: .vibesec-cache)')
+  .option('--engine <engine>', 'Matching engine (regex|combined)', 'regex')
+  .option('--pattern-timeout <ms>', 'Time budget per rule pattern per file (0 disables)')
+  .option('--regex-backend <backend>', 'Regex backend for rule patterns (native|linear)', 'native')
+  .addHelpText(
+    'after',
+    `
+Examples:
+  $ vibesec watch                       Watch current directory
+  $ vibesec watch ./src --cache         Start from cached results
+  $ vibesec watch -f ndjson             One JSON line per change, for editors and tools
+`
+  )
+  .action(lazy(() => import('./commands/watch').then((m) => m.watchCommand)));
+
+program
+  .command('daemon')
+  .description('Keep rules loaded in a background process that scan commands hand off to')
+  .argument('[action]', 'start, stop or status', 'start')
+  .option('-d, --detach', 'Start in the background and return once the daemon is ready')
+  .addHelpText(
+    'after',
+    `
+Examples:
+  $ vibesec daemon                      Run the daemon in this terminal
+  $ vibesec daemon start --detach       Run it in the background
+  $ vibesec daemon status               Show whether one is running
+  $ vibesec daemon stop                 Stop it
+
+While a daemon is running, vibesec scan sends scans to it and prints the
+same output. Set VIBESEC_NO_DAEMON=1 or pass --no-daemon to scan in-process.
+The socket is $XDG_RUNTIME_DIR/vibesec.sock or a per-user file in the
+temporary directory; set VIBESEC_DAEMON_SOCKET to use another.
+`
+  )
+  .action(lazy(() => import('./commands/daemon').then((m) => m.daemonCommand)));
+
+program
+  .command('rules')
+  .description('Compile rule files into a bundle that loads without parsing YAML')
+  .argument('<action>', 'compile')
+  .argument('[path]', 'Rules directory (default: built-in rules)')
+  .addHelpText(
+    'after',
+    `
+Examples:
+  $ vibesec rules compile               Compile the built-in rules
+  $ vibesec rules compile ./my-rules    Compile a custom rules directory
+
+The bundle is written to rules.bundle.json in the rules directory. Scans use
+it while the rule files are unchanged and parse the YAML files otherwise.
+`
+  )
+  .action(lazy(() => import('./commands/rules').then((m) => m.rulesCommand)));
 
 program
   .command('benchmark')
@@ -72,12 +161,14 @@ Benchmarks:
   • Vulnerable Code (100 files)
   • Clean Code (100 files)
   • Mixed Languages (200 files)
+  • Worker Scaling (2000 files, 1 to one worker per CPU)
+  • CLI Startup (--version, JSON scan of an empty dir)
 
 Target Performance:
   • Speed: <2 minutes for 10,000 files
   • Memory: <500MB peak usage
 `
   )
-  .action(benchmarkCommand);
+  .action(lazy(() => import('./commands/benchmark').then((m) => m.benchmarkCommand)));
 
-program.parse();
+initObservability().then(() => program.parseAsync());
@@ -20,3 +20,13 @@ function copyDir(src, dest) {
 // Copy rules directory
 copyDir('rules', 'dist/rules');
 console.log('✓ Copied rules/ to dist/rules/');
+
+// Precompile the built-in rules so the CLI starts without parsing YAML
+const { RuleLoader } = require('./dist/scanner/core/rule-loader');
+new RuleLoader(path.resolve('dist/rules/default'))
+  .compileBundle()
+  .then(({ rules }) => console.log(`✓ Compiled ${rules} rules into dist/rules/default`))
+  .catch((err) => {
+    console.error(`✗ Could not compile rules: ${err.message}`);
+    process.exit(1);
+  });
@@ -0,0 +1,65 @@
+import { Writable } from 'stream';
+import { ScanResult, ScanEvent, Finding, ScanDiagnostic } from '../scanner/core/types';
+import { writeChunk } from './write-stream';
+
+/**
+ * Newline-delimited JSON: one `finding` record per line, then a single
+ * trailing `summary` record with the scan metadata, totals and diagnostics.
+ */
+export class NdjsonReporter {
+  generate(result: ScanResult): string {
+    const lines = result.findings.map((finding) => this.findingRecord(finding));
+    lines.push(this.summaryRecord(result.version, result, result.diagnostics || []));
+    return lines.join('\n') + '\n';
+  }
+
+  /**
+   * Write records to out as the scan produces them, waiting for the stream
+   * to drain so output never builds up in memory. Resolves with the summary
+   * record's contents once the scan is complete.
+   */
+  async write(
+    events: AsyncIterable<ScanEvent>,
+    out: Writable
+  ): Promise<Omit<ScanResult, 'findings'>> {
+    let complete: Omit<ScanResult, 'findings'> | undefined;
+
+    for await (const event of events) {
+      if (event.type === 'file') {
+        for (const finding of event.findings) {
+          await writeChunk(out, this.findingRecord(finding) + '\n');
+        }
+      } else if (event.type === 'complete') {
+        complete = { version: event.scan.version, scan: event.scan, summary: event.summary };
+        if (event.diagnostics.length > 0) {
+          complete.diagnostics = event.diagnostics;
+        }
+        const record = this.summaryRecord(complete.version, event, event.diagnostics);
+        await writeChunk(out, record + '\n');
+      }
+    }
+
+    if (!complete) {
+      throw new Error('Scan ended without a summary');
+    }
+    return complete;
+  }
+
+  private findingRecord(finding: Finding): string {
+    return JSON.stringify({ type: 'finding', ...toPlain(finding) });
+  }
+
+  private summaryRecord(
+    version: string,
+    { scan, summary }: Pick<ScanResult, 'scan' | 'summary'>,
+    diagnostics: ScanDiagnostic[]
+  ): string {
+    return JSON.stringify({ type: 'summary', version, scan, summary, diagnostics });
+  }
+}
+
+// Findings may compute fields lazily and expose them through toJSON
+function toPlain(finding: Finding): Finding {
+  const serializable = finding as Finding & { toJSON?: () => Finding };
+  return serializable.toJSON ? serializable.toJSON() : finding;
+}
@@ -0,0 +1,226 @@
+import * as path from 'path';
+import { createHash } from 'crypto';
+import { pathToFileURL } from 'url';
+import { Writable } from 'stream';
+import {
+  ScanResult,
+  ScanEvent,
+  ScanMetadata,
+  ScanSummary,
+  ScanDiagnostic,
+  Finding,
+  Severity,
+} from '../scanner/core/types';
+import { writeChunk } from './write-stream';
+
+const SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json';
+const INFORMATION_URI = 'https://github.com/ferg-cod3s/vibesec';
+
+const LEVELS: Record<Severity, 'error' | 'warning' | 'note'> = {
+  [Severity.CRITICAL]: 'error',
+  [Severity.HIGH]: 'error',
+  [Severity.MEDIUM]: 'warning',
+  [Severity.LOW]: 'note',
+};
+
+// Numeric scores GitHub code scanning uses to rank security results
+const SECURITY_SEVERITY: Record<Severity, string> = {
+  [Severity.CRITICAL]: '9.5',
+  [Severity.HIGH]: '7.5',
+  [Severity.MEDIUM]: '5.0',
+  [Severity.LOW]: '2.0',
+};
+
+export interface SarifReporterOptions {
+  /** Directory result URIs are made relative to (default: the scanned path) */
+  root?: string;
+}
+
+/**
+ * SARIF 2.1.0 log with a single run
+ *
+ * Each rule is described once in tool.driver.rules and results point at it
+ * by ruleIndex; a result's message is only the rule title, so the longer
+ * description and help text appear once per rule however many results
+ * share it. The results array is written before the tool object so a
+ * streamed log only has to remember the rules it has seen, not the results;
+ * JSON member order carries no meaning, so the log is still valid SARIF.
+ */
+export class SarifReporter {
+  private root?: string;
+
+  constructor(options: SarifReporterOptions = {}) {
+    this.root = options.root;
+  }
+
+  generate(result: ScanResult): string {
+    const run = new SarifRun(this.root || result.scan.path);
+    const results = result.findings.map((finding) => run.result(finding));
+    return (
+      run.header() +
+      results.join(',\n') +
+      run.footer(result.scan, result.summary, result.diagnostics || [])
+    );
+  }
+
+  /**
+   * Write the log to out as the scan produces findings. Resolves with the
+   * rest of the scan result once the scan is complete.
+   */
+  async write(
+    events: AsyncIterable<ScanEvent>,
+    out: Writable
+  ): Promise<Omit<ScanResult, 'findings'>> {
+    const run = new SarifRun(this.root || process.cwd());
+    let complete: Omit<ScanResult, 'findings'> | undefined;
+    let first = true;
+
+    await writeChunk(out, run.header());
+    for await (const event of events) {
+      if (event.type === 'file') {
+        for (const finding of event.findings) {
+          await writeChunk(out, (first ? '' : ',\n') + run.result(finding));
+          first = false;
+        }
+      } else if (event.type === 'complete') {
+        complete = { version: event.scan.version, scan: event.scan, summary: event.summary };
+        if (event.diagnostics.length > 0) {
+          complete.diagnostics = event.diagnostics;
+        }
+        await writeChunk(out, run.footer(event.scan, event.summary, event.diagnostics));
+      }
+    }
+
+    if (!complete) {
+      throw new Error('Scan ended without a summary');
+    }
+    return complete;
+  }
+}
+
+interface RuleDescriptor {
+  id: string;
+  [property: string]: unknown;
+}
+
+/**
+ * Serializes one run, assigning rule indexes in the order rules first appear.
+ * Rule files can reuse an id for rules with a different severity or help,
+ * so rules are told apart by their whole descriptor. The first rule seen
+ * with an id keeps it; later ones get the id with a hash of their
+ * descriptor appended, which stays the same from one scan to the next.
+ */
+class SarifRun {
+  private root: string;
+  private ruleIndexes = new Map<string, number>();
+  private rules: RuleDescriptor[] = [];
+  private ruleIds = new Set<string>();
+
+  constructor(root: string) {
+    this.root = path.resolve(root);
+  }
+
+  header(): string {
+    return `{"$schema":"${SARIF_SCHEMA}","version":"2.1.0","runs":[{"results":[\n`;
+  }
+
+  result(finding: Finding): string {
+    const { location } = finding;
+    const region: Record<string, unknown> = {
+      startLine: location.line,
+      startColumn: location.column + 1,
+    };
+    if (location.endLine !== undefined && location.endColumn !== undefined) {
+      region.endLine = location.endLine;
+      region.endColumn = location.endColumn + 1;
+    }
+    if (finding.fix.before) {
+      region.snippet = { text: finding.fix.before };
+    }
+
+    const physicalLocation = { artifactLocation: this.artifact(location.file), region };
+
+    const ruleIndex = this.ruleIndex(finding);
+    return JSON.stringify({
+      ruleId: this.rules[ruleIndex].id,
+      ruleIndex,
+      level: LEVELS[finding.severity],
+      message: { text: finding.title },
+      locations: [{ physicalLocation }],
+      properties: { confidence: finding.metadata.confidence },
+    });
+  }
+
+  footer(scan: ScanMetadata, summary: ScanSummary, diagnostics: ScanDiagnostic[]): string {
+    const tool = {
+      driver: {
+        name: 'VibeSec',
+        version: scan.version,
+        informationUri: INFORMATION_URI,
+        rules: this.rules,
+      },
+    };
+    const invocation = {
+      executionSuccessful: true,
+      startTimeUtc: scan.timestamp,
+      toolExecutionNotifications: diagnostics.map((diagnostic) => ({
+        level: 'warning',
+        message: { text: diagnostic.message },
+        associatedRule: { id: diagnostic.rule },
+        ...(diagnostic.file && {
+          locations: [{ physicalLocation: { artifactLocation: this.artifact(diagnostic.file) } }],
+        }),
+      })),
+    };
+    const originalUriBaseIds = {
+      SRCROOT: { uri: pathToFileURL(this.root + path.sep).href },
+    };
+    const properties = { filesScanned: scan.filesScanned, duration: scan.duration, summary };
+
+    return (
+      `\n],"tool":${JSON.stringify(tool)},"invocations":[${JSON.stringify(invocation)}],` +
+      `"originalUriBaseIds":${JSON.stringify(originalUriBaseIds)},` +
+      `"properties":${JSON.stringify(properties)}}]}\n`
+    );
+  }
+
+  private ruleIndex(finding: Finding): number {
+    const descriptor = this.ruleDescriptor(finding);
+    const key = JSON.stringify(descriptor);
+    let index = this.ruleIndexes.get(key);
+    if (index === undefined) {
+      index = this.rules.length;
+      if (this.ruleIds.has(descriptor.id)) {
+        descriptor.id += `/${createHash('sha256').update(key).digest('hex').slice(0, 8)}`;
+      }
+      this.ruleIndexes.set(key, index);
+      this.ruleIds.add(descriptor.id);
+      this.rules.push(descriptor);
+    }
+    return index;
+  }
+
+  private ruleDescriptor(finding: Finding): RuleDescriptor {
+    const { cwe, owasp } = finding.metadata;
+    const tags = ['security', finding.category, cwe, owasp && `OWASP ${owasp}`].filter(Boolean);
+    return {
+      id: finding.rule,
+      name: finding.title,
+      shortDescription: { text: finding.title },
+      fullDescription: { text: finding.description },
+      help: { text: finding.fix.recommendation },
+      ...(finding.fix.references.length > 0 && { helpUri: finding.fix.references[0] }),
+      defaultConfiguration: { level: LEVELS[finding.severity] },
+      properties: { tags, 'security-severity': SECURITY_SEVERITY[finding.severity] },
+    };
+  }
+
+  private artifact(file: string): { uri: string; uriBaseId?: string } {
+    const relative = path.relative(this.root, path.resolve(file));
+    if (relative && !relative.startsWith('..') && !path.isAbsolute(relative)) {
+      const uri = relative.split(path.sep).map(encodeURIComponent).join('/');
+      return { uri, uriBaseId: 'SRCROOT' };
+    }
+    return { uri: pathToFileURL(path.resolve(file)).href };
+  }
+}
@@ -0,0 +1,23 @@
+import { Writable } from 'stream';
+
+/**
+ * Write text to a stream, waiting for it to drain when its buffer is full so
+ * streaming reporters never hold more than one record in memory
+ */
+export function writeChunk(out: Writable, text: string): Promise<void> {
+  if (out.write(text)) {
+    return Promise.resolve();
+  }
+  return new Promise((resolve, reject) => {
+    const onDrain = (): void => {
+      out.off('error', onError);
+      resolve();
+    };
+    const onError = (error: Error): void => {
+      out.off('drain', onDrain);
+      reject(error);
+    };
+    out.once('drain', onDrain);
+    out.once('error', onError);
+  });
+}
@@ -0,0 +1,237 @@
+import { Finding } from '../core/types';
+import { CompiledRule, CompiledPattern, RuleProgram } from '../core/rule-program';
+import { FileContext, findLineIndex } from '../core/file-context';
+import { RegexAnalyzer } from './regex';
+
+/**
+ * A pattern taking part in a combined regex, addressed by its group name
+ */
+interface CombinedEntry {
+  compiled: CompiledRule;
+  pattern: CompiledPattern;
+  group: string;
+}
+
+// Numbered backreferences would point at the wrong group once patterns are
+// concatenated, and named groups could collide between patterns. Patterns on
+// the linear backend stay standalone so they keep its worst-case guarantee.
+const BACKREFERENCE = /\\[1-9]|\\k</;
+const NAMED_GROUP = /(^|[^\\])\(\?<(?![=!])/;
+
+/**
+ * One alternation of patterns sharing the same flags:
+ * (?<p0>pattern0)|(?<p1>pattern1)|...
+ */
+class CombinedGroup {
+  readonly entries: CombinedEntry[];
+  readonly regex: RegExp;
+  readonly suspicious: boolean;
+  private alternatives: string[];
+  private flags: string;
+  private tails: Array<RegExp | undefined>;
+
+  constructor(entries: CombinedEntry[], flags: string) {
+    this.entries = entries;
+    this.flags = flags;
+    this.alternatives = entries.map(({ pattern, group }) => `(?<${group}>${pattern.source.regex})`);
+    this.regex = new RegExp(this.alternatives.join('|'), flags);
+    this.suspicious = entries.some(({ pattern }) => pattern.suspicious);
+    this.tails = new Array(entries.length);
+  }
+
+  /**
+   * Sticky alternation of the entries from index `start` onward, used to
+   * find every other pattern that also matches at a position.
+   */
+  tail(start: number): RegExp {
+    let tail = this.tails[start];
+    if (!tail) {
+      tail = new RegExp(this.alternatives.slice(start).join('|'), this.flags + 'y');
+      this.tails[start] = tail;
+    }
+    return tail;
+  }
+
+  /**
+   * Index of the first entry (from `start`) whose group took part in match
+   */
+  matchedEntry(match: RegExpExecArray, start: number): number {
+    const groups = match.groups || {};
+    for (let i = start; i < this.entries.length; i++) {
+      if (groups[this.entries[i].group] !== undefined) {
+        return i;
+      }
+    }
+    return -1;
+  }
+}
+
+/**
+ * All patterns for one language, split into combined groups plus the
+ * patterns that have to be matched on their own.
+ */
+class CombinedPatternSet {
+  readonly groups: CombinedGroup[] = [];
+  readonly standalone: Array<{ compiled: CompiledRule; pattern: CompiledPattern }> = [];
+
+  constructor(rules: CompiledRule[]) {
+    const byFlags = new Map<string, CombinedEntry[]>();
+    let count = 0;
+
+    for (const compiled of rules) {
+      for (const pattern of compiled.patterns) {
+        if (!this.isCombinable(pattern)) {
+          this.standalone.push({ compiled, pattern });
+          continue;
+        }
+
+        const flags = pattern.bufferRegex.flags;
+        const entries = byFlags.get(flags) || [];
+        entries.push({ compiled, pattern, group: `p${count++}` });
+        byFlags.set(flags, entries);
+      }
+    }
+
+    for (const [flags, entries] of byFlags) {
+      if (entries.length < 2) {
+        entries.forEach(({ compiled, pattern }) => this.standalone.push({ compiled, pattern }));
+        continue;
+      }
+
+      try {
+        this.groups.push(new CombinedGroup(entries, flags));
+      } catch {
+        entries.forEach(({ compiled, pattern }) => this.standalone.push({ compiled, pattern }));
+      }
+    }
+  }
+
+  private isCombinable(pattern: CompiledPattern): boolean {
+    const source = pattern.source.regex;
+    return (
+      pattern.backend === 'native' &&
+      !pattern.source.multiline &&
+      !pattern.lineOnly &&
+      !BACKREFERENCE.test(source) &&
+      !NAMED_GROUP.test(source)
+    );
+  }
+}
+
+// Shared by every analyzer, so a program that stays loaded keeps its
+// combined regexes, already compiled and optimized, from one scan to the next
+const patternSets = new WeakMap<RuleProgram, Map<string, CombinedPatternSet>>();
+
+/**
+ * Alternative engine that scans each file once per flag group with a single
+ * combined regex for every pattern of the file's language, instead of once
+ * per pattern. Named groups map each match back to its rule and pattern.
+ *
+ * After a match at a position, the remaining alternatives are tried there
+ * with a sticky tail regex and the scan resumes one character later, so
+ * overlapping matches of different patterns are all found. Each pattern
+ * keeps its own resume offset, which makes the results the same as
+ * RegexAnalyzer's buffer mode.
+ */
+export class CombinedRegexAnalyzer extends RegexAnalyzer {
+  async analyzeFile(context: FileContext, program: RuleProgram): Promise<Finding[]> {
+    const set = this.getPatternSet(program, context.language);
+    const findings: Finding[] = [];
+
+    for (const group of set.groups) {
+      const matched: Finding[] = [];
+      const run = (): void => this.matchGroup(context, group, matched);
+      if (this.runWithinBudget(context, group.suspicious, run)) {
+        findings.push(...matched);
+        continue;
+      }
+
+      // Out of time: match the group's patterns one by one, so each gets its
+      // own budget and the slow one is reported
+      for (const { compiled, pattern } of group.entries) {
+        findings.push(...(await this.analyzeContext(context, compiled, [pattern])));
+      }
+    }
+
+    for (const { compiled, pattern } of set.standalone) {
+      findings.push(...(await this.analyzeContext(context, compiled, [pattern])));
+    }
+
+    return findings;
+  }
+
+  private getPatternSet(program: RuleProgram, language: string): CombinedPatternSet {
+    let byLanguage = patternSets.get(program);
+    if (!byLanguage) {
+      byLanguage = new Map();
+      patternSets.set(program, byLanguage);
+    }
+
+    let set = byLanguage.get(language);
+    if (!set) {
+      set = new CombinedPatternSet(program.rulesForLanguage(language));
+      byLanguage.set(language, set);
+    }
+    return set;
+  }
+
+  private matchGroup(context: FileContext, group: CombinedGroup, findings: Finding[]): void {
+    const { content, lineOffsets } = context;
+    const { entries, regex } = group;
+    // Offset from which each pattern may match again (non-overlapping per pattern)
+    const resumeAt = new Float64Array(entries.length);
+    regex.lastIndex = 0;
+
+    let match: RegExpExecArray | null;
+    while ((match = regex.exec(content)) !== null) {
+      this.checkBudget();
+      const position = match.index;
+      let current: RegExpExecArray | null = match;
+      let entryIndex = group.matchedEntry(match, 0);
+
+      while (current && entryIndex !== -1) {
+        const entry = entries[entryIndex];
+        const text = (current.groups || {})[entry.group] || '';
+
+        if (position >= resumeAt[entryIndex]) {
+          const lineIndex = findLineIndex(lineOffsets, position);
+          const lineStart = lineOffsets[lineIndex];
+
+          if (text.indexOf('\n') !== -1) {
+            // Single-line patterns never span lines: re-run this one on the line
+            const from = Math.max(resumeAt[entryIndex], lineStart) - lineStart;
+            this.matchLine(context, entry.compiled, entry.pattern, lineIndex, from, findings);
+            resumeAt[entryIndex] =
+              lineIndex + 1 < lineOffsets.length ? lineOffsets[lineIndex + 1] : content.length + 1;
+          } else {
+            const location = {
+              file: context.filePath,
+              line: lineIndex + 1,
+              column: position - lineStart,
+            };
+            findings.push(
+              this.createFinding(context, entry.compiled, entry.pattern, lineIndex, location, text)
+            );
+            resumeAt[entryIndex] = position + Math.max(text.length, 1);
+          }
+        }
+
+        if (entryIndex + 1 >= entries.length) {
+          break;
+        }
+        const tail = group.tail(entryIndex + 1);
+        tail.lastIndex = position;
+        current = tail.exec(content);
+        entryIndex = current ? group.matchedEntry(current, entryIndex + 1) : -1;
+      }
+
+      // The alternation only reports the first member that matches at a
+      // position, and another member may start a match inside this one's span
+      // (e.g. a secret inside a matched URL), so skipping past the span would
+      // lose findings. This re-runs the alternation over the span, which is
+      // quadratic for long runs of overlapping matches; the time budget bounds
+      // that, as it does for a slow pattern in RegexAnalyzer.
+      regex.lastIndex = position + 1;
+    }
+  }
+}
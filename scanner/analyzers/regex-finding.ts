@@ -0,0 +1,212 @@
+import {
+  Finding,
+  FindingMetadata,
+  FixRecommendation,
+  Location,
+  Severity,
+  Category,
+} from '../core/types';
+import { CompiledPattern, CompiledRule, RuleProgram } from '../core/rule-program';
+
+/** Lines of context shown on either side of the matched line */
+const SNIPPET_CONTEXT = 2;
+
+/**
+ * Structured-clone friendly form of a RegexFinding, sent from scan workers
+ * to the main thread. Only the lines the snippet needs are kept; the rule is
+ * referenced by its position in the program and the pattern by its index in
+ * the rule.
+ */
+export interface CompactFinding {
+  rule: number;
+  pattern: number;
+  location: Location;
+  matchLength: number;
+  /** File line index of lines[0] */
+  firstLine: number;
+  lines: string[];
+}
+
+/**
+ * Finding produced by the regex analyzers
+ *
+ * Besides the rule's own fields, only the match position, a reference to
+ * the rule and the few lines the snippet shows are stored, so findings do
+ * not keep their file's content alive. The snippet, fix and metadata are
+ * built the first time they are read (or when the finding is serialized),
+ * so findings that get filtered out never allocate them.
+ */
+export class RegexFinding implements Finding {
+  id: string;
+  rule: string;
+  severity: Severity;
+  category: Category;
+  title: string;
+  description: string;
+  location: Location;
+
+  private compiled: CompiledRule;
+  private pattern: CompiledPattern;
+  private lines: string[];
+  private lineIndex: number;
+  private firstLine: number;
+  private matchLength: number;
+  private cachedSnippet?: string;
+  private cachedFix?: FixRecommendation;
+  private cachedMetadata?: FindingMetadata;
+
+  /**
+   * lines may be a window of the file starting at file line index firstLine;
+   * lineIndex is relative to that window. Only the lines around lineIndex
+   * are kept.
+   */
+  constructor(
+    compiled: CompiledRule,
+    pattern: CompiledPattern,
+    lines: string[],
+    lineIndex: number,
+    location: Location,
+    matchLength: number,
+    firstLine: number = 0
+  ) {
+    const { rule } = compiled;
+    this.id = `${rule.id}-${Date.now()}-${Math.random().toString(36).substr(2, 9)}`;
+    this.rule = rule.id;
+    this.severity = rule.severity;
+    this.category = rule.category;
+    this.title = rule.name;
+    this.description = rule.description;
+    this.location = location;
+    this.compiled = compiled;
+    this.pattern = pattern;
+    const start = Math.max(0, lineIndex - SNIPPET_CONTEXT);
+    this.lines = lines.slice(start, lineIndex + SNIPPET_CONTEXT + 1);
+    this.lineIndex = lineIndex - start;
+    this.firstLine = firstLine + start;
+    this.matchLength = matchLength;
+  }
+
+  /**
+   * Rebuild a finding sent by a scan worker against the main thread's
+   * compilation of the same rules
+   */
+  static fromCompact(program: RuleProgram, compact: CompactFinding): RegexFinding {
+    const compiled = program.rules[compact.rule];
+    if (!compiled) {
+      throw new Error(`Compact finding refers to rule ${compact.rule}, not in the program`);
+    }
+    return new RegexFinding(
+      compiled,
+      compiled.patterns[compact.pattern],
+      compact.lines,
+      compact.location.line - 1 - compact.firstLine,
+      compact.location,
+      compact.matchLength,
+      compact.firstLine
+    );
+  }
+
+  /** The rule that produced this finding */
+  get compiledRule(): CompiledRule {
+    return this.compiled;
+  }
+
+  get snippet(): string {
+    if (this.cachedSnippet === undefined) {
+      this.cachedSnippet = buildSnippet(this.lines, this.lineIndex, this.firstLine);
+    }
+    return this.cachedSnippet;
+  }
+
+  get fix(): FixRecommendation {
+    if (!this.cachedFix) {
+      const { rule } = this.compiled;
+      this.cachedFix = {
+        recommendation: rule.fix?.template || 'Review and fix this security issue',
+        before: this.lines[this.lineIndex].trim(),
+        after: '', // Will be populated by specific detectors
+        references: rule.fix?.references || [],
+      };
+    }
+    return this.cachedFix;
+  }
+
+  get metadata(): FindingMetadata {
+    if (!this.cachedMetadata) {
+      const { rule } = this.compiled;
+      this.cachedMetadata = {
+        confidence: calculateConfidence(this.matchLength, this.pattern.source.regex),
+        cwe: rule.metadata?.cwe,
+        owasp: rule.metadata?.owasp,
+      };
+    }
+    return this.cachedMetadata;
+  }
+
+  /**
+   * Plain object with every field materialized, used by JSON.stringify
+   */
+  toJSON(): Finding {
+    return {
+      id: this.id,
+      rule: this.rule,
+      severity: this.severity,
+      category: this.category,
+      title: this.title,
+      description: this.description,
+      location: this.location,
+      snippet: this.snippet,
+      fix: this.fix,
+      metadata: this.metadata,
+    };
+  }
+
+  /**
+   * Compact form holding just the lines around the match, for a program
+   * containing this finding's rule
+   */
+  toCompact(program: RuleProgram): CompactFinding {
+    return {
+      rule: program.indexOf(this.compiled),
+      pattern: this.compiled.patterns.indexOf(this.pattern),
+      location: this.location,
+      matchLength: this.matchLength,
+      firstLine: this.firstLine,
+      lines: this.lines,
+    };
+  }
+}
+
+function buildSnippet(
+  lines: string[],
+  lineIndex: number,
+  firstLine: number,
+  context: number = SNIPPET_CONTEXT
+): string {
+  const start = Math.max(0, lineIndex - context);
+  const end = Math.min(lines.length, lineIndex + context + 1);
+
+  return lines
+    .slice(start, end)
+    .map((line, i) => {
+      const actualLine = firstLine + start + i + 1;
+      const prefix = actualLine === firstLine + lineIndex + 1 ? '→ ' : '  ';
+      return `${prefix}${actualLine.toString().padStart(4, ' ')} | ${line}`;
+    })
+    .join('\n');
+}
+
+function calculateConfidence(matchLength: number, pattern: string): number {
+  // Simple heuristic: longer matches and more specific patterns = higher confidence
+  let confidence = 0.7;
+
+  // Increase confidence for longer matches
+  if (matchLength > 20) confidence += 0.1;
+  if (matchLength > 40) confidence += 0.1;
+
+  // Increase confidence for more specific patterns
+  if (pattern.includes('\\b')) confidence += 0.05; // Word boundaries
+  if (pattern.includes('[A-Z]') || pattern.includes('[a-z]')) confidence += 0.05; // Character classes
+
+  return Math.min(confidence, 1.0);
+}
@@ -1,84 +1,233 @@
-import { Finding, Rule, Location, FixRecommendation } from '../core/types';
+import { Finding, Rule, Location } from '../core/types';
+import { CompiledRule, CompiledPattern, compileRule } from '../core/rule-program';
+import { FileContext, createFileContext, findLineIndex } from '../core/file-context';
+import { RegexFinding } from './regex-finding';
+import {
+  DEFAULT_PATTERN_TIMEOUT,
+  LONG_LINE_LENGTH,
+  PatternTimeoutError,
+  runWithTimeout,
+} from '../core/match-guard';
+
+/**
+ * How patterns are run against a file:
+ * - buffer: each pattern runs once over the whole file and match offsets are
+ *   mapped to lines through the file's line-offset index (default). Patterns
+ *   that use lookaround or line anchors still run line by line.
+ * - line: each pattern runs separately on every line
+ */
+export type RegexMatchMode = 'buffer' | 'line';
+
+export interface RegexAnalyzerOptions {
+  mode?: RegexMatchMode;
+  /** Milliseconds each pattern may spend on one file; 0 disables the budget */
+  timeout?: number;
+}
 
 export class RegexAnalyzer {
+  private mode: RegexMatchMode;
+  private timeout: number;
+  private deadline = Infinity;
+
+  constructor(options: RegexAnalyzerOptions = {}) {
+    this.mode = options.mode || 'buffer';
+    this.timeout = options.timeout ?? DEFAULT_PATTERN_TIMEOUT;
+  }
+
   async analyze(filePath: string, content: string, rule: Rule): Promise<Finding[]> {
+    return this.analyzeContext(createFileContext(filePath, content), compileRule(rule));
+  }
+
+  /**
+   * Run an already-compiled rule against a shared file context. The compiled
+   * RegExp objects are shared across files, so matching drives lastIndex
+   * directly instead of using matchAll (which clones the regex on every call).
+   * patterns restricts matching to some of the rule's own patterns.
+   */
+  async analyzeContext(
+    context: FileContext,
+    compiled: CompiledRule,
+    patterns: CompiledPattern[] = compiled.patterns
+  ): Promise<Finding[]> {
     const findings: Finding[] = [];
 
-    for (const pattern of rule.patterns) {
-      const regex = new RegExp(pattern.regex, pattern.flags || 'g');
-      const lines = content.split('\n');
-
-      for (let i = 0; i < lines.length; i++) {
-        const line = lines[i];
-        const matches = line.matchAll(regex);
-
-        for (const match of matches) {
-          const location: Location = {
-            file: filePath,
-            line: i + 1,
-            column: match.index || 0,
-          };
-
-          const snippet = this.getSnippet(lines, i);
-
-          const fix: FixRecommendation = {
-            recommendation: rule.fix?.template || 'Review and fix this security issue',
-            before: line.trim(),
-            after: '', // Will be populated by specific detectors
-            references: rule.fix?.references || [],
-          };
-
-          const finding: Finding = {
-            id: `${rule.id}-${Date.now()}-${Math.random().toString(36).substr(2, 9)}`,
-            rule: rule.id,
-            severity: rule.severity,
-            category: rule.category,
-            title: rule.name,
-            description: rule.description,
-            location,
-            snippet,
-            fix,
-            metadata: {
-              confidence: this.calculateConfidence(match[0], pattern.regex),
-              cwe: rule.metadata?.cwe,
-              owasp: rule.metadata?.owasp,
-            },
-          };
-
-          findings.push(finding);
+    for (const pattern of patterns) {
+      const matched: Finding[] = [];
+      const completed = this.runWithinBudget(context, pattern.suspicious, () => {
+        if (this.mode === 'buffer' && !pattern.lineOnly) {
+          this.matchBuffer(context, compiled, pattern, matched);
+        } else {
+          for (let i = 0; i < context.lines.length; i++) {
+            this.matchLine(context, compiled, pattern, i, 0, matched);
+          }
         }
+      });
+
+      if (completed) {
+        findings.push(...matched);
+      } else {
+        // Partial results would depend on timing, so the pattern reports nothing
+        context.diagnostics.push({
+          type: 'rule-timeout',
+          rule: compiled.rule.id,
+          file: context.filePath,
+          message: `Pattern ${pattern.source.regex} timed out after ${this.timeout}ms`,
+        });
       }
     }
 
     return findings;
   }
 
-  private getSnippet(lines: string[], lineIndex: number, context: number = 2): string {
-    const start = Math.max(0, lineIndex - context);
-    const end = Math.min(lines.length, lineIndex + context + 1);
-
-    return lines
-      .slice(start, end)
-      .map((line, i) => {
-        const actualLine = start + i + 1;
-        const prefix = actualLine === lineIndex + 1 ? '→ ' : '  ';
-        return `${prefix}${actualLine.toString().padStart(4, ' ')} | ${line}`;
-      })
-      .join('\n');
+  /**
+   * Run matching within the per-pattern time budget. Matching that may get
+   * stuck inside a single regex call (suspicious patterns, files with very
+   * long lines) runs under a hard timeout; everything else only checks the
+   * deadline between matches. Returns false if the budget ran out.
+   */
+  protected runWithinBudget(context: FileContext, suspicious: boolean, run: () => void): boolean {
+    if (this.timeout <= 0) {
+      run();
+      return true;
+    }
+
+    this.deadline = Date.now() + this.timeout;
+    try {
+      if (suspicious || context.longestLine >= LONG_LINE_LENGTH) {
+        runWithTimeout(run, this.timeout);
+      } else {
+        run();
+      }
+      return true;
+    } catch (err) {
+      if (err instanceof PatternTimeoutError) {
+        return false;
+      }
+      throw err;
+    } finally {
+      this.deadline = Infinity;
+    }
+  }
+
+  /**
+   * Abort the current match loop once the deadline has passed
+   */
+  protected checkBudget(): void {
+    if (Date.now() > this.deadline) {
+      throw new PatternTimeoutError(this.timeout);
+    }
   }
 
-  private calculateConfidence(match: string, pattern: string): number {
-    // Simple heuristic: longer matches and more specific patterns = higher confidence
-    let confidence = 0.7;
+  /**
+   * Run a pattern once over the whole file. Matches of single-line patterns
+   * that cross a line break are re-run on that line alone, so results are the
+   * same as matching line by line.
+   */
+  private matchBuffer(
+    context: FileContext,
+    compiled: CompiledRule,
+    pattern: CompiledPattern,
+    findings: Finding[]
+  ): void {
+    const { content, lineOffsets } = context;
+    const regex = pattern.bufferRegex;
+    const multiline = pattern.source.multiline === true;
+    regex.lastIndex = 0;
 
-    // Increase confidence for longer matches
-    if (match.length > 20) confidence += 0.1;
-    if (match.length > 40) confidence += 0.1;
+    let searchFrom = 0;
+    let match: RegExpExecArray | null;
+    while ((match = regex.exec(content)) !== null) {
+      this.checkBudget();
+      const lineIndex = findLineIndex(lineOffsets, match.index);
+      const lineStart = lineOffsets[lineIndex];
 
-    // Increase confidence for more specific patterns
-    if (pattern.includes('\\b')) confidence += 0.05; // Word boundaries
-    if (pattern.includes('[A-Z]') || pattern.includes('[a-z]')) confidence += 0.05; // Character classes
+      if (!multiline && match[0].indexOf('\n') !== -1) {
+        this.matchLine(
+          context,
+          compiled,
+          pattern,
+          lineIndex,
+          Math.max(searchFrom, lineStart) - lineStart,
+          findings
+        );
+        regex.lastIndex =
+          lineIndex + 1 < lineOffsets.length ? lineOffsets[lineIndex + 1] : content.length + 1;
+        searchFrom = regex.lastIndex;
+        continue;
+      }
+
+      // Step past empty matches so the loop always advances
+      if (match[0].length === 0) {
+        regex.lastIndex++;
+      }
+      searchFrom = regex.lastIndex;
+
+      const location: Location = {
+        file: context.filePath,
+        line: lineIndex + 1,
+        column: match.index - lineStart,
+      };
+
+      if (multiline) {
+        const end = match.index + match[0].length;
+        const endLineIndex = findLineIndex(lineOffsets, end);
+        location.endLine = endLineIndex + 1;
+        location.endColumn = end - lineOffsets[endLineIndex];
+      }
+
+      findings.push(this.createFinding(context, compiled, pattern, lineIndex, location, match[0]));
+    }
+  }
+
+  /**
+   * Run a pattern over a single line, starting at the given column
+   */
+  protected matchLine(
+    context: FileContext,
+    compiled: CompiledRule,
+    pattern: CompiledPattern,
+    lineIndex: number,
+    fromColumn: number,
+    findings: Finding[]
+  ): void {
+    const line = context.lines[lineIndex];
+    const regex = pattern.regex;
+    regex.lastIndex = fromColumn;
+    this.checkBudget();
+
+    let match: RegExpExecArray | null;
+    while ((match = regex.exec(line)) !== null) {
+      this.checkBudget();
+      // Step past empty matches so the loop always advances
+      if (match[0].length === 0) {
+        regex.lastIndex++;
+      }
+
+      const location: Location = {
+        file: context.filePath,
+        line: lineIndex + 1,
+        column: match.index,
+      };
+
+      findings.push(this.createFinding(context, compiled, pattern, lineIndex, location, match[0]));
+    }
+  }
 
-    return Math.min(confidence, 1.0);
+  protected createFinding(
+    context: FileContext,
+    compiled: CompiledRule,
+    pattern: CompiledPattern,
+    lineIndex: number,
+    location: Location,
+    matchText: string
+  ): Finding {
+    return new RegexFinding(
+      compiled,
+      pattern,
+      context.lines,
+      lineIndex,
+      location,
+      matchText.length
+    );
   }
 }
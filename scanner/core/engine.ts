@@ -1,94 +1,263 @@
 import * as path from 'path';
 import * as fs from 'fs/promises';
 import fg from 'fast-glob';
-import { ScanOptions, ScanResult, Finding, ScanSummary, Severity } from './types';
+import {
+  ScanOptions,
+  ScanResult,
+  ScanEvent,
+  FileScanResult,
+  Finding,
+  ScanSummary,
+  Severity,
+  ScanDiagnostic,
+} from './types';
+import { collectScanResult } from './scan-result';
 import { RuleLoader } from './rule-loader';
+import { RuleProgram } from './rule-program';
+import { createFileContext } from './file-context';
+import { DEFAULT_FILE_CONCURRENCY, mapBounded } from './pipeline';
+import { scanInWorkers } from './worker-pool';
+import { CacheLookup, DEFAULT_CACHE_DIR, ResultCache, cacheFingerprint } from './result-cache';
 import { RegexAnalyzer } from '../analyzers/regex';
+import { CombinedRegexAnalyzer } from '../analyzers/combined';
 import { DependencyAnalyzer } from '../analyzers/dependency';
+import { ConfigLoader } from '../../src/config/config-loader';
+import { metrics } from '../../src/observability/metrics';
+
+const EXTENSION_LANGUAGES: ReadonlyMap<string, string> = new Map([
+  ['js', 'javascript'],
+  ['jsx', 'javascript'],
+  ['ts', 'typescript'],
+  ['tsx', 'typescript'],
+  ['py', 'python'],
+]);
+
+export const DEFAULT_INCLUDE = ['**/*.js', '**/*.ts', '**/*.py', '**/*.jsx', '**/*.tsx'];
+export const DEFAULT_EXCLUDE = ['**/node_modules/**', '**/dist/**', '**/build/**', '**/.git/**'];
 
 export class Scanner {
   private options: ScanOptions;
   private ruleLoader: RuleLoader;
   private analyzer: RegexAnalyzer;
+  private combinedAnalyzer: CombinedRegexAnalyzer;
   private dependencyAnalyzer: DependencyAnalyzer;
 
   constructor(options: ScanOptions) {
     this.options = {
-      exclude: ['**/node_modules/**', '**/dist/**', '**/build/**', '**/.git/**'],
-      include: ['**/*.js', '**/*.ts', '**/*.py', '**/*.jsx', '**/*.tsx'],
+      exclude: DEFAULT_EXCLUDE,
+      include: DEFAULT_INCLUDE,
       parallel: true,
       maxFileSize: 5 * 1024 * 1024, // 5MB default
       ...options,
     };
 
-    this.ruleLoader = new RuleLoader(this.options.rulesPath);
-    this.analyzer = new RegexAnalyzer();
+    this.ruleLoader = new RuleLoader(this.options.rulesPath, {
+      regexBackend: this.options.regexBackend,
+    });
+    this.analyzer = new RegexAnalyzer({ timeout: this.options.patternTimeout });
+    this.combinedAnalyzer = new CombinedRegexAnalyzer({ timeout: this.options.patternTimeout });
     this.dependencyAnalyzer = new DependencyAnalyzer();
   }
 
   async scan(): Promise<ScanResult> {
+    return collectScanResult(this.scanStream());
+  }
+
+  /**
+   * Scan incrementally: each file's findings are yielded as soon as the file
+   * is done, and the summary totals arrive in a final complete event. Nothing
+   * is retained between files apart from the running totals. A program
+   * from an earlier loadRules() call with the same rule options is reused
+   * instead of loading the rules again.
+   */
+  async *scanStream(rules?: RuleProgram): AsyncGenerator<ScanEvent> {
     const startTime = new Date().toISOString();
     const scanStart = Date.now();
 
-    // Load rules
-    const rules = await this.ruleLoader.load();
-    if (!this.options.quiet) console.error(`📋 Loaded ${rules.length} rules`);
+    const program = rules || (await this.loadRules());
 
     // Find files to scan
     const files = await this.findFiles();
     if (!this.options.quiet) console.error(`📁 Found ${files.length} files to scan`);
+    yield { type: 'start', files: files.length, rules: program.rules.length };
 
-    // Scan files
-    const findings: Finding[] = [];
-    let filesScanned = 0;
+    // Rules rejected at load time are reported alongside per-file problems
+    const diagnostics: ScanDiagnostic[] = program.errors.map((error) => ({
+      type: 'rule-error',
+      rule: error.ruleId,
+      message: error.message,
+    }));
 
-    if (this.options.parallel) {
-      // Parallel scanning
-      const promises = files.map((file) =>
-        this.scanFile(file, rules).catch((err) => {
-          console.error(`⚠️  Error scanning ${file}:`, err.message);
-          return [];
-        })
-      );
-      const results = await Promise.all(promises);
-      results.forEach((fileFindings) => findings.push(...fileFindings));
-      filesScanned = files.length;
-    } else {
-      // Sequential scanning
-      for (const file of files) {
-        try {
-          const fileFindings = await this.scanFile(file, rules);
-          findings.push(...fileFindings);
-          filesScanned++;
-        } catch (err) {
-          console.error(`⚠️  Error scanning ${file}:`, (err as Error).message);
-        }
+    const summary = createSummary();
+    let filesScanned = 0;
+    for await (const result of this.collectResults(files, program)) {
+      addToSummary(summary, result.findings);
+      diagnostics.push(...result.diagnostics);
+      if (result.scanned) {
+        filesScanned++;
       }
+      yield { type: 'file', ...result };
     }
 
-    // Filter by severity
-    const filteredFindings = this.filterBySeverity(findings);
-
-    // Generate summary
-    const summary = this.generateSummary(filteredFindings);
-
-    const duration = (Date.now() - scanStart) / 1000;
-
-    return {
-      version: '0.1.0',
+    yield {
+      type: 'complete',
       scan: {
         path: this.options.path,
         filesScanned,
-        duration,
+        duration: (Date.now() - scanStart) / 1000,
         timestamp: startTime,
         version: '0.1.0',
       },
       summary,
-      findings: filteredFindings,
+      diagnostics,
     };
   }
 
-  private async findFiles(): Promise<string[]> {
+  /**
+   * Results for every file: replayed from the result cache where the content
+   * is unchanged since a cached run, scanned otherwise. Files whose content
+   * is cached for only some of the rules are run against the rest. Indexes
+   * refer to files; results arrive in completion order.
+   */
+  async *collectResults(
+    files: string[],
+    program: RuleProgram
+  ): AsyncGenerator<FileScanResult> {
+    if (!this.options.cache) {
+      yield* this.dispatch(files, program);
+      return;
+    }
+
+    const fingerprint = cacheFingerprint(this.options);
+    const root = path.resolve(this.options.path);
+    const cache = await ResultCache.open(await this.cacheDir(), fingerprint, root, program);
+    try {
+      // Files to scan, grouped by the rules they need
+      const groups = new Map<string, Array<{ index: number; lookup: CacheLookup }>>();
+      const lookups = mapBounded(files, DEFAULT_FILE_CONCURRENCY, (file) => cache.lookup(file));
+      for await (const { index, result } of lookups) {
+        if (result.findings && result.missing.length === 0) {
+          const { file, findings } = result;
+          yield { file, index, findings, diagnostics: [], scanned: true };
+          continue;
+        }
+        const key = result.missing.map((compiled) => program.indexOf(compiled)).join(',');
+        const group = groups.get(key) || [];
+        group.push({ index, lookup: result });
+        groups.set(key, group);
+      }
+
+      for (const misses of groups.values()) {
+        misses.sort((a, b) => a.index - b.index);
+        const { missing } = misses[0].lookup;
+        const wanted = new Set(missing.map(({ rule }) => rule));
+        const rules =
+          missing === program.rules ? program : program.select((rule) => wanted.has(rule));
+
+        const results = this.dispatch(misses.map(({ lookup }) => lookup.file), program, rules);
+        for await (const result of results) {
+          const { index, lookup } = misses[result.index];
+          const findings = cache.merge(lookup, result.findings);
+          // Timeouts depend on machine load, so only complete results are cached
+          if (result.scanned && result.diagnostics.length === 0) {
+            cache.set(lookup, findings);
+          }
+          yield { ...result, index, findings };
+        }
+      }
+
+      await cache.save();
+    } finally {
+      // Releases the cache files if the scan stops early
+      await cache.close();
+    }
+    metrics.updateScanMetrics({
+      cacheHits: cache.hits,
+      cacheMisses: cache.partial + cache.misses,
+    });
+    if (!this.options.quiet) {
+      const { hits, partial } = cache;
+      const rerun = partial > 0 ? ` (${partial} more run only against changed rules)` : '';
+      console.error(`♻️  Reused cached results for ${hits} of ${files.length} files${rerun}`);
+    }
+  }
+
+  /**
+   * Scan files with rules, a subset of program, in worker threads if more
+   * than one was asked for
+   */
+  private dispatch(
+    files: string[],
+    program: RuleProgram,
+    rules: RuleProgram = program
+  ): AsyncGenerator<FileScanResult> {
+    const workers = this.options.workers || 1;
+    if (workers <= 1) {
+      return this.scanFiles(files, rules);
+    }
+    const subset =
+      rules === program ? undefined : rules.rules.map((compiled) => program.indexOf(compiled));
+    return scanInWorkers(this.options, files, workers, program, subset);
+  }
+
+  /**
+   * Cache directory from the options, else performance.cacheDir from the config
+   */
+  private async cacheDir(): Promise<string> {
+    if (this.options.cacheDir) {
+      return this.options.cacheDir;
+    }
+    const config = await new ConfigLoader().loadConfig();
+    return config.performance?.cacheDir || DEFAULT_CACHE_DIR;
+  }
+
+  /**
+   * Load and compile rules, then drop those the severity and rule-id filters
+   * would discard so they are never run
+   */
+  async loadRules(): Promise<RuleProgram> {
+    const rules = await this.ruleLoader.load();
+    if (!this.options.quiet) console.error(`📋 Loaded ${rules.length} rules`);
+    return this.selectRules(this.ruleLoader.getProgram());
+  }
+
+  /**
+   * Scan a list of files in this thread with an already-loaded program,
+   * yielding each file's results in completion order
+   */
+  async *scanFiles(files: string[], program: RuleProgram): AsyncGenerator<FileScanResult> {
+    // In parallel mode a bounded number of files are read and matched at once
+    const concurrency = this.options.parallel
+      ? this.options.concurrency || DEFAULT_FILE_CONCURRENCY
+      : 1;
+
+    const pipeline = mapBounded(files, concurrency, async (file, index) => {
+      const result: FileScanResult = {
+        file,
+        index,
+        findings: [],
+        diagnostics: [],
+        scanned: false,
+      };
+      try {
+        result.findings = await this.scanFile(file, program, result.diagnostics);
+        result.scanned = true;
+      } catch (err) {
+        console.error(`⚠️  Error scanning ${file}:`, (err as Error).message);
+      }
+      return result;
+    });
+
+    for await (const { result } of pipeline) {
+      yield result;
+    }
+  }
+
+  /**
+   * Absolute paths of the files to scan: the scan path itself if it is a
+   * file, otherwise the files under it matching include and not exclude
+   */
+  async findFiles(): Promise<string[]> {
     const searchPath = path.resolve(this.options.path);
 
     // Check if path is a file
@@ -102,7 +271,7 @@ export class Scanner {
     }
 
     // Scan directory
-    const patterns = this.options.include || ['**/*.{js,ts,py,jsx,tsx}'];
+    const patterns = this.options.include || DEFAULT_INCLUDE;
     const ignore = this.options.exclude || [];
 
     const files = await fg(patterns, {
@@ -115,7 +284,11 @@ export class Scanner {
     return files;
   }
 
-  private async scanFile(filePath: string, rules: any[]): Promise<Finding[]> {
+  private async scanFile(
+    filePath: string,
+    program: RuleProgram,
+    diagnostics: ScanDiagnostic[]
+  ): Promise<Finding[]> {
     // Check file size
     const stat = await fs.stat(filePath);
     if (stat.size > (this.options.maxFileSize || 5 * 1024 * 1024)) {
@@ -128,65 +301,75 @@ export class Scanner {
 
     // Detect language from extension
     const ext = path.extname(filePath).slice(1);
-    const language = this.mapExtensionToLanguage(ext);
+    const language = EXTENSION_LANGUAGES.get(ext) || ext;
 
-    // Filter rules by language
-    const applicableRules = rules.filter(
-      (rule) => rule.enabled && (rule.languages.includes(language) || rule.languages.includes('*'))
-    );
+    // Split and index the file once for every rule
+    const context = createFileContext(filePath, content, language);
+
+    if (this.options.engine === 'combined') {
+      const combinedFindings = await this.combinedAnalyzer.analyzeFile(context, program);
+      diagnostics.push(...context.diagnostics);
+      return combinedFindings;
+    }
+
+    // Filter rules by language, then skip rules whose required literals
+    // never appear in the file
+    const applicableRules = program.selectRules(program.rulesForLanguage(language), content);
 
     // Run detection
     const findings: Finding[] = [];
-    for (const rule of applicableRules) {
-      const ruleFindings = await this.analyzer.analyze(filePath, content, rule);
+    for (const compiled of applicableRules) {
+      const ruleFindings = await this.analyzer.analyzeContext(context, compiled);
       findings.push(...ruleFindings);
     }
+    diagnostics.push(...context.diagnostics);
 
     return findings;
   }
 
-  private mapExtensionToLanguage(ext: string): string {
-    const mapping: Record<string, string> = {
-      js: 'javascript',
-      jsx: 'javascript',
-      ts: 'typescript',
-      tsx: 'typescript',
-      py: 'python',
-    };
-    return mapping[ext] || ext;
-  }
-
-  private filterBySeverity(findings: Finding[]): Finding[] {
-    if (!this.options.severity) {
-      return findings;
+  /**
+   * Restrict the program to rules at or above the minimum severity and in
+   * the requested rule set
+   */
+  private selectRules(program: RuleProgram): RuleProgram {
+    const { severity, ruleIds } = this.options;
+    if (!severity && !ruleIds) {
+      return program;
     }
 
     const severityOrder = [Severity.CRITICAL, Severity.HIGH, Severity.MEDIUM, Severity.LOW];
-    const minIndex = severityOrder.indexOf(this.options.severity);
+    const minIndex = severity ? severityOrder.indexOf(severity) : severityOrder.length - 1;
+    const ids = ruleIds ? new Set(ruleIds) : null;
 
-    return findings.filter((finding) => {
-      const findingIndex = severityOrder.indexOf(finding.severity);
-      return findingIndex <= minIndex;
-    });
+    return program.select(
+      (rule) => severityOrder.indexOf(rule.severity) <= minIndex && (!ids || ids.has(rule.id))
+    );
   }
+}
 
-  private generateSummary(findings: Finding[]): ScanSummary {
-    const summary: ScanSummary = {
-      total: findings.length,
-      bySeverity: {
-        critical: 0,
-        high: 0,
-        medium: 0,
-        low: 0,
-      },
-      byCategory: {},
-    };
-
-    for (const finding of findings) {
-      summary.bySeverity[finding.severity]++;
-      summary.byCategory[finding.category] = (summary.byCategory[finding.category] || 0) + 1;
-    }
+/**
+ * Totals with no findings counted yet
+ */
+export function createSummary(): ScanSummary {
+  return {
+    total: 0,
+    bySeverity: {
+      critical: 0,
+      high: 0,
+      medium: 0,
+      low: 0,
+    },
+    byCategory: {},
+  };
+}
 
-    return summary;
+/**
+ * Count findings into summary
+ */
+export function addToSummary(summary: ScanSummary, findings: Finding[]): void {
+  summary.total += findings.length;
+  for (const finding of findings) {
+    summary.bySeverity[finding.severity]++;
+    summary.byCategory[finding.category] = (summary.byCategory[finding.category] || 0) + 1;
   }
 }
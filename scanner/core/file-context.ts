@@ -0,0 +1,78 @@
+import { ScanDiagnostic } from './types';
+
+/**
+ * Per-file analysis context
+ *
+ * Built once per scanned file and shared by every rule and analyzer, so the
+ * file is split into lines and indexed a single time.
+ */
+
+export interface FileContext {
+  filePath: string;
+  content: string;
+  language: string;
+  /** content.split('\n') */
+  lines: string[];
+  /** Offset of the first character of each line in content */
+  lineOffsets: Uint32Array;
+  /** Length of the longest line */
+  longestLine: number;
+  /** Problems reported by analyzers while matching this file */
+  diagnostics: ScanDiagnostic[];
+}
+
+/**
+ * Compute the start offset of every line in content
+ */
+export function computeLineOffsets(content: string): Uint32Array {
+  let count = 1;
+  for (let i = content.indexOf('\n'); i !== -1; i = content.indexOf('\n', i + 1)) {
+    count++;
+  }
+
+  const offsets = new Uint32Array(count);
+  let line = 1;
+  for (let i = content.indexOf('\n'); i !== -1; i = content.indexOf('\n', i + 1)) {
+    offsets[line++] = i + 1;
+  }
+
+  return offsets;
+}
+
+/**
+ * Map a character offset to the index of the line containing it
+ */
+export function findLineIndex(lineOffsets: Uint32Array, offset: number): number {
+  let low = 0;
+  let high = lineOffsets.length - 1;
+
+  while (low < high) {
+    const mid = (low + high + 1) >>> 1;
+    if (lineOffsets[mid] <= offset) {
+      low = mid;
+    } else {
+      high = mid - 1;
+    }
+  }
+
+  return low;
+}
+
+export function createFileContext(filePath: string, content: string, language = ''): FileContext {
+  const lineOffsets = computeLineOffsets(content);
+
+  let longestLine = content.length - lineOffsets[lineOffsets.length - 1];
+  for (let i = 1; i < lineOffsets.length; i++) {
+    longestLine = Math.max(longestLine, lineOffsets[i] - lineOffsets[i - 1] - 1);
+  }
+
+  return {
+    filePath,
+    content,
+    language,
+    lines: content.split('\n'),
+    lineOffsets,
+    longestLine,
+    diagnostics: [],
+  };
+}
@@ -0,0 +1,209 @@
+/**
+ * JSON Schema validator compiler
+ *
+ * Turns a schema into a tree of check functions once, so validating each
+ * rule only runs the checks and never walks or interprets the schema again.
+ * Covers the draft-07 subset rules/schema.json is written in; a schema
+ * using any other keyword is rejected when compiled rather than silently
+ * half-checked.
+ */
+
+export type JsonSchema = { [keyword: string]: any };
+
+/** Errors found in a value, each prefixed with the path to the bad field */
+export type SchemaValidator = (value: unknown) => string[];
+
+/** Checks value, found at path `at` ('' for the root), adding its errors */
+type Check = (value: unknown, at: string, errors: string[]) => void;
+
+
+type JsonType = 'string' | 'number' | 'integer' | 'boolean' | 'object' | 'array' | 'null';
+
+// Keywords that describe a schema without constraining values
+const ANNOTATIONS = new Set([
+  '$schema',
+  '$id',
+  'title',
+  'description',
+  'definitions',
+  'default',
+  'examples',
+  'format',
+]);
+
+/**
+ * Compile schema into a validator. Local references (#/definitions/...) are
+ * resolved here; an unsupported keyword or unresolvable reference throws.
+ */
+export function compileSchema(root: JsonSchema): SchemaValidator {
+  const compiled = new Map<string, Check>();
+
+  const resolve = (ref: string): Check => {
+    const cached = compiled.get(ref);
+    if (cached) {
+      return cached;
+    }
+    if (!ref.startsWith('#/')) {
+      throw new Error(`Unsupported schema reference ${ref}`);
+    }
+    let target: any = root;
+    for (const part of ref.slice(2).split('/')) {
+      target = target?.[part];
+    }
+    if (!target || typeof target !== 'object') {
+      throw new Error(`Unresolved schema reference ${ref}`);
+    }
+    // Registered before compiling so recursive references terminate
+    let check: Check = () => {};
+    compiled.set(ref, (value, at, errors) => check(value, at, errors));
+    check = compile(target);
+    return check;
+  };
+
+  const compile = (schema: JsonSchema): Check => {
+    if (schema.$ref !== undefined) {
+      return resolve(schema.$ref);
+    }
+
+    const types: JsonType[] | undefined =
+      schema.type === undefined ? undefined : [].concat(schema.type);
+    const checks: Check[] = [];
+
+    for (const [keyword, arg] of Object.entries(schema)) {
+      switch (keyword) {
+        case 'type':
+          break;
+        case 'enum':
+          checks.push((value, at, errors) => {
+            if (!arg.includes(value)) {
+              fail(errors, at, `must be one of ${arg.join(', ')}`);
+            }
+          });
+          break;
+        case 'pattern': {
+          const regex = new RegExp(arg, 'u');
+          checks.push((value, at, errors) => {
+            if (typeof value === 'string' && !regex.test(value)) {
+              fail(errors, at, `must match ${arg}`);
+            }
+          });
+          break;
+        }
+        case 'minLength': {
+          const message = arg === 1 ? 'must not be empty' : `must be at least ${arg} characters`;
+          checks.push((value, at, errors) => {
+            if (typeof value === 'string' && value.length < arg) {
+              fail(errors, at, message);
+            }
+          });
+          break;
+        }
+        case 'minimum':
+          checks.push((value, at, errors) => {
+            if (typeof value === 'number' && value < arg) {
+              fail(errors, at, `must be at least ${arg}`);
+            }
+          });
+          break;
+        case 'maximum':
+          checks.push((value, at, errors) => {
+            if (typeof value === 'number' && value > arg) {
+              fail(errors, at, `must be at most ${arg}`);
+            }
+          });
+          break;
+        case 'minItems': {
+          const message = arg === 1 ? 'must not be empty' : `must have at least ${arg} items`;
+          checks.push((value, at, errors) => {
+            if (Array.isArray(value) && value.length < arg) {
+              fail(errors, at, message);
+            }
+          });
+          break;
+        }
+        case 'items': {
+          const item = compile(arg);
+          checks.push((value, at, errors) => {
+            if (Array.isArray(value)) {
+              value.forEach((element, index) => item(element, `${at}[${index}]`, errors));
+            }
+          });
+          break;
+        }
+        case 'required':
+          checks.push((value, at, errors) => {
+            if (isObject(value)) {
+              const missing = (arg as string[]).filter((key) => value[key] === undefined);
+              if (missing.length > 0) {
+                fail(errors, at, `missing required fields: ${missing.join(', ')}`);
+              }
+            }
+          });
+          break;
+        case 'properties': {
+          const properties = Object.entries(arg as Record<string, JsonSchema>).map(
+            ([key, property]): [string, Check] => [key, compile(property)]
+          );
+          checks.push((value, at, errors) => {
+            if (isObject(value)) {
+              for (const [key, check] of properties) {
+                if (value[key] !== undefined) {
+                  check(value[key], at ? `${at}.${key}` : key, errors);
+                }
+              }
+            }
+          });
+          break;
+        }
+        default:
+          if (!ANNOTATIONS.has(keyword)) {
+            throw new Error(`Unsupported schema keyword ${keyword}`);
+          }
+      }
+    }
+
+    return (value, at, errors) => {
+      // Other keywords are meaningless for a value of the wrong type
+      if (types && !types.some((type) => hasType(value, type))) {
+        fail(errors, at, `must be ${types.join(' or ')}`);
+        return;
+      }
+      for (const check of checks) {
+        check(value, at, errors);
+      }
+    };
+  };
+
+  const check = compile(root);
+  return (value) => {
+    const errors: string[] = [];
+    check(value, '', errors);
+    return errors;
+  };
+}
+
+function hasType(value: unknown, type: JsonType): boolean {
+  switch (type) {
+    case 'array':
+      return Array.isArray(value);
+    case 'object':
+      return isObject(value);
+    case 'null':
+      return value === null;
+    case 'integer':
+      return Number.isInteger(value);
+    case 'number':
+      return typeof value === 'number' && Number.isFinite(value);
+    default:
+      return typeof value === type;
+  }
+}
+
+function isObject(value: unknown): value is Record<string, unknown> {
+  return typeof value === 'object' && value !== null && !Array.isArray(value);
+}
+
+/** Record an error, prefixed with the path to the value unless it is the root */
+function fail(errors: string[], at: string, message: string): void {
+  errors.push(at ? `${at}: ${message}` : message);
+}
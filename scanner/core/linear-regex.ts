@@ -0,0 +1,873 @@
+/**
+ * Linear-time regex backend
+ *
+ * A Thompson-NFA matcher (Pike VM) for the regex subset rule patterns use:
+ * literals, character classes, \d \w \s and their negations, dot, ^ $ \b
+ * \B, groups, alternation and greedy or lazy quantifiers. Each input
+ * position is visited once with at most one thread per instruction, so a
+ * match takes O(pattern length × input length) time whatever the pattern.
+ *
+ * Threads are kept in priority order, so the match found is the one a
+ * backtracking engine would report. Only the overall match is tracked;
+ * capture groups are not reported. Syntax that needs backtracking
+ * (backreferences, lookaround) and the u flag are not supported:
+ * compileLinearRegex() returns null and callers fall back to RegExp.
+ */
+
+/**
+ * What the analyzers need from a compiled pattern; implemented by both
+ * RegExp and LinearRegex
+ */
+export interface RegexLike {
+  readonly source: string;
+  readonly flags: string;
+  lastIndex: number;
+  exec(input: string): RegExpExecArray | null;
+}
+
+/** Programs above this many instructions are left to RegExp */
+const MAX_PROGRAM_SIZE = 20000;
+
+enum Op {
+  Char,
+  Any,
+  AnyWithNewline,
+  Class,
+  Split,
+  Jump,
+  LineStart,
+  LineEnd,
+  WordBoundary,
+  NotWordBoundary,
+  Match,
+}
+
+class UnsupportedSyntaxError extends Error {}
+
+/**
+ * Character class as sorted, non-overlapping [from, to] code ranges
+ */
+interface CharClass {
+  ranges: number[];
+  negated: boolean;
+}
+
+interface CompiledClass {
+  ranges: number[];
+  negated: boolean;
+  /** Precomputed result for ASCII input */
+  ascii: Uint8Array;
+}
+
+type Node =
+  | { type: 'char'; code: number }
+  | { type: 'any' }
+  | { type: 'class'; cls: CharClass }
+  | { type: 'assert'; op: Op.LineStart | Op.LineEnd | Op.WordBoundary | Op.NotWordBoundary }
+  | { type: 'empty' }
+  | { type: 'seq'; items: Node[] }
+  | { type: 'alt'; alts: Node[] }
+  | { type: 'repeat'; body: Node; min: number; max: number; greedy: boolean };
+
+const DIGIT_RANGES = [48, 57];
+const WORD_RANGES = [48, 57, 65, 90, 95, 95, 97, 122];
+const SPACE_RANGES = [
+  9, 13, 32, 32, 0xa0, 0xa0, 0x1680, 0x1680, 0x2000, 0x200a, 0x2028, 0x2029, 0x202f, 0x202f,
+  0x205f, 0x205f, 0x3000, 0x3000, 0xfeff, 0xfeff,
+];
+
+function normalizeRanges(ranges: number[]): number[] {
+  const pairs: Array<[number, number]> = [];
+  for (let i = 0; i < ranges.length; i += 2) {
+    pairs.push([ranges[i], ranges[i + 1]]);
+  }
+  pairs.sort((a, b) => a[0] - b[0]);
+
+  const merged: number[] = [];
+  for (const [from, to] of pairs) {
+    const last = merged.length - 1;
+    if (last > 0 && from <= merged[last] + 1) {
+      merged[last] = Math.max(merged[last], to);
+    } else {
+      merged.push(from, to);
+    }
+  }
+  return merged;
+}
+
+function complementRanges(ranges: number[]): number[] {
+  const result: number[] = [];
+  let next = 0;
+  for (let i = 0; i < ranges.length; i += 2) {
+    if (ranges[i] > next) {
+      result.push(next, ranges[i] - 1);
+    }
+    next = ranges[i + 1] + 1;
+  }
+  if (next <= 0xffff) {
+    result.push(next, 0xffff);
+  }
+  return result;
+}
+
+function inRanges(ranges: number[], code: number): boolean {
+  for (let i = 0; i < ranges.length; i += 2) {
+    if (code < ranges[i]) {
+      return false;
+    }
+    if (code <= ranges[i + 1]) {
+      return true;
+    }
+  }
+  return false;
+}
+
+let canonicalTable: Uint16Array | null = null;
+
+/**
+ * Case folding used by the i flag without u: the upper-case form of a
+ * character, unless that takes a non-ASCII character into ASCII or is not
+ * a single character.
+ */
+function canonical(code: number): number {
+  if (!canonicalTable) {
+    canonicalTable = new Uint16Array(0x10000);
+    for (let c = 0; c <= 0xffff; c++) {
+      const upper = String.fromCharCode(c).toUpperCase();
+      const folded = upper.length === 1 ? upper.charCodeAt(0) : c;
+      canonicalTable[c] = c >= 128 && folded < 128 ? c : folded;
+    }
+  }
+  return canonicalTable[code];
+}
+
+function isLineTerminator(code: number): boolean {
+  return code === 10 || code === 13 || code === 0x2028 || code === 0x2029;
+}
+
+function isWordChar(code: number): boolean {
+  return (
+    (code >= 48 && code <= 57) ||
+    (code >= 65 && code <= 90) ||
+    (code >= 97 && code <= 122) ||
+    code === 95
+  );
+}
+
+class LinearParser {
+  private source: string;
+  private pos = 0;
+
+  constructor(source: string) {
+    this.source = source;
+  }
+
+  parse(): Node {
+    const node = this.parseAlternation();
+    if (this.pos < this.source.length) {
+      throw new UnsupportedSyntaxError(`Unexpected character at ${this.pos}`);
+    }
+    return node;
+  }
+
+  private parseAlternation(): Node {
+    const alts = [this.parseSequence()];
+    while (this.source[this.pos] === '|') {
+      this.pos++;
+      alts.push(this.parseSequence());
+    }
+    return alts.length === 1 ? alts[0] : { type: 'alt', alts };
+  }
+
+  private parseSequence(): Node {
+    const items: Node[] = [];
+    while (this.pos < this.source.length) {
+      const char = this.source[this.pos];
+      if (char === '|' || char === ')') {
+        break;
+      }
+      items.push(this.parseQuantified(this.parseAtom()));
+    }
+    if (items.length === 0) {
+      return { type: 'empty' };
+    }
+    return items.length === 1 ? items[0] : { type: 'seq', items };
+  }
+
+  private parseQuantified(atom: Node): Node {
+    const char = this.source[this.pos];
+    let min: number;
+    let max: number;
+
+    if (char === '*') {
+      [min, max] = [0, Infinity];
+      this.pos++;
+    } else if (char === '+') {
+      [min, max] = [1, Infinity];
+      this.pos++;
+    } else if (char === '?') {
+      [min, max] = [0, 1];
+      this.pos++;
+    } else if (char === '{') {
+      const match = /^\{(\d+)(,(\d*))?\}/.exec(this.source.slice(this.pos));
+      if (!match) {
+        return atom;
+      }
+      min = parseInt(match[1], 10);
+      max = match[2] === undefined ? min : match[3] ? parseInt(match[3], 10) : Infinity;
+      this.pos += match[0].length;
+    } else {
+      return atom;
+    }
+
+    let greedy = true;
+    if (this.source[this.pos] === '?') {
+      greedy = false;
+      this.pos++;
+    }
+    if (atom.type === 'assert') {
+      throw new UnsupportedSyntaxError('Quantified assertion');
+    }
+    return { type: 'repeat', body: atom, min, max, greedy };
+  }
+
+  private parseAtom(): Node {
+    const char = this.source[this.pos++];
+
+    switch (char) {
+      case '(':
+        return this.parseGroup();
+      case '[':
+        return { type: 'class', cls: this.parseClass() };
+      case '.':
+        return { type: 'any' };
+      case '^':
+        return { type: 'assert', op: Op.LineStart };
+      case '$':
+        return { type: 'assert', op: Op.LineEnd };
+      case '\\':
+        return this.parseEscape();
+      case '*':
+      case '+':
+      case '?':
+        throw new UnsupportedSyntaxError('Nothing to repeat');
+      default:
+        return { type: 'char', code: char.charCodeAt(0) };
+    }
+  }
+
+  private parseGroup(): Node {
+    if (this.source[this.pos] === '?') {
+      const next = this.source[this.pos + 1];
+      const after = this.source[this.pos + 2];
+      if (next === ':') {
+        this.pos += 2;
+      } else if (next === '<' && after !== '=' && after !== '!') {
+        // Named group: only the overall match is reported, so treat it as plain
+        this.pos = this.source.indexOf('>', this.pos) + 1;
+      } else {
+        throw new UnsupportedSyntaxError('Lookaround and group modifiers need backtracking');
+      }
+    }
+
+    const inner = this.parseAlternation();
+    if (this.source[this.pos++] !== ')') {
+      throw new UnsupportedSyntaxError('Unterminated group');
+    }
+    return inner;
+  }
+
+  /**
+   * Ranges for \d, \w, \s and their negations; null for anything else
+   */
+  private classEscape(char: string): number[] | null {
+    switch (char) {
+      case 'd':
+        return DIGIT_RANGES;
+      case 'D':
+        return complementRanges(DIGIT_RANGES);
+      case 'w':
+        return WORD_RANGES;
+      case 'W':
+        return complementRanges(WORD_RANGES);
+      case 's':
+        return SPACE_RANGES;
+      case 'S':
+        return complementRanges(SPACE_RANGES);
+      default:
+        return null;
+    }
+  }
+
+  private parseEscape(): Node {
+    const char = this.source[this.pos++];
+    const ranges = this.classEscape(char);
+    if (ranges) {
+      return { type: 'class', cls: { ranges, negated: false } };
+    }
+    if (char === 'b') {
+      return { type: 'assert', op: Op.WordBoundary };
+    }
+    if (char === 'B') {
+      return { type: 'assert', op: Op.NotWordBoundary };
+    }
+    return { type: 'char', code: this.escapeCode(char) };
+  }
+
+  /**
+   * Code of a single escaped character
+   */
+  private escapeCode(char: string): number {
+    if (char === undefined) {
+      throw new UnsupportedSyntaxError('Trailing backslash');
+    }
+
+    const controls: Record<string, number> = { n: 10, r: 13, t: 9, f: 12, v: 11 };
+    if (char in controls) {
+      return controls[char];
+    }
+    if (char === '0' && !/[0-9]/.test(this.source[this.pos] || '')) {
+      return 0;
+    }
+    if (/[0-9]/.test(char) || char === 'k' || char === 'p' || char === 'P') {
+      throw new UnsupportedSyntaxError('Backreferences and property escapes are not supported');
+    }
+    if (char === 'x' || char === 'u') {
+      const digits = char === 'x' ? 2 : 4;
+      const hex = this.source.slice(this.pos, this.pos + digits);
+      if (hex.length === digits && /^[0-9a-fA-F]+$/.test(hex)) {
+        this.pos += digits;
+        return parseInt(hex, 16);
+      }
+      return char.charCodeAt(0);
+    }
+    if (char === 'c') {
+      const letter = this.source[this.pos];
+      if (letter && /[a-zA-Z]/.test(letter)) {
+        this.pos++;
+        return letter.charCodeAt(0) % 32;
+      }
+      throw new UnsupportedSyntaxError('Unusual control escape');
+    }
+    return char.charCodeAt(0);
+  }
+
+  private parseClass(): CharClass {
+    let negated = false;
+    if (this.source[this.pos] === '^') {
+      negated = true;
+      this.pos++;
+    }
+
+    const ranges: number[] = [];
+    while (this.pos < this.source.length) {
+      const char = this.source[this.pos++];
+      if (char === ']') {
+        return { ranges: normalizeRanges(ranges), negated };
+      }
+
+      let from: number;
+      if (char === '\\') {
+        const escaped = this.source[this.pos++];
+        const classRanges = this.classEscape(escaped);
+        if (classRanges) {
+          ranges.push(...classRanges);
+          continue;
+        }
+        from = escaped === 'b' ? 8 : this.escapeCode(escaped);
+      } else {
+        from = char.charCodeAt(0);
+      }
+
+      if (this.source[this.pos] === '-' && this.source[this.pos + 1] !== ']') {
+        this.pos++;
+        let to: number;
+        const end = this.source[this.pos++];
+        if (end === '\\') {
+          const escaped = this.source[this.pos++];
+          if (this.classEscape(escaped)) {
+            throw new UnsupportedSyntaxError('Class escape used as a range bound');
+          }
+          to = escaped === 'b' ? 8 : this.escapeCode(escaped);
+        } else {
+          to = end.charCodeAt(0);
+        }
+        ranges.push(from, to);
+      } else {
+        ranges.push(from, from);
+      }
+    }
+
+    throw new UnsupportedSyntaxError('Unterminated character class');
+  }
+}
+
+/**
+ * A compiled pattern with the same exec()/lastIndex interface as a global
+ * RegExp
+ */
+export class LinearRegex implements RegexLike {
+  readonly source: string;
+  readonly flags: string;
+  lastIndex = 0;
+
+  private ignoreCase: boolean;
+  private multiline: boolean;
+  private ops: Uint8Array;
+  private args: Int32Array;
+  private alternates: Int32Array;
+  private classes: CompiledClass[];
+
+  // Thread lists and the visited marks, reused between calls
+  private currentPcs: Int32Array;
+  private currentStarts: Int32Array;
+  private nextPcs: Int32Array;
+  private nextStarts: Int32Array;
+  private marks: Uint32Array;
+  private generation = 0;
+  private stack: Int32Array;
+
+  // Characters that can start a match, used to skip ahead when no thread is alive
+  private canSkip: boolean;
+  private firstChar = -1;
+  private firstPcs: number[] = [];
+  private firstAscii = new Uint8Array(128);
+
+  constructor(source: string, flags: string) {
+    if (flags.includes('u') || flags.includes('v')) {
+      throw new UnsupportedSyntaxError('Unicode mode is not supported');
+    }
+
+    this.source = source;
+    this.flags = flags;
+    this.ignoreCase = flags.includes('i');
+    this.multiline = flags.includes('m');
+
+    const builder = new ProgramBuilder(this.ignoreCase, flags.includes('s'));
+    builder.emit(new LinearParser(source).parse());
+    builder.push(Op.Match, 0);
+
+    this.ops = Uint8Array.from(builder.ops);
+    this.args = Int32Array.from(builder.args);
+    this.alternates = Int32Array.from(builder.alternates);
+    this.classes = builder.classes;
+
+    const size = this.ops.length;
+    this.currentPcs = new Int32Array(size);
+    this.currentStarts = new Int32Array(size);
+    this.nextPcs = new Int32Array(size);
+    this.nextStarts = new Int32Array(size);
+    this.marks = new Uint32Array(size);
+    this.stack = new Int32Array(2 * size + 2);
+
+    this.canSkip = this.computeFirstChars();
+  }
+
+  exec(input: string): RegExpExecArray | null {
+    const from = this.lastIndex;
+    if (from > input.length) {
+      this.lastIndex = 0;
+      return null;
+    }
+
+    const found = this.search(input, from);
+    if (found === null) {
+      this.lastIndex = 0;
+      return null;
+    }
+
+    const [start, stop] = found;
+    const result = [input.slice(start, stop)] as unknown as RegExpExecArray;
+    result.index = start;
+    result.input = input;
+    this.lastIndex = stop;
+    return result;
+  }
+
+  /**
+   * Leftmost match starting at or after from, as [start, end]
+   */
+  private search(input: string, from: number): [number, number] | null {
+    const { ops } = this;
+    const length = input.length;
+    let currentCount = 0;
+    let matchStart = -1;
+    let matchEnd = -1;
+    let pos = from;
+
+    this.nextGeneration();
+    for (;;) {
+      if (matchStart === -1) {
+        if (currentCount === 0 && this.canSkip) {
+          const candidate = this.nextCandidate(input, pos);
+          if (candidate === -1) {
+            break;
+          }
+          if (candidate !== pos) {
+            pos = candidate;
+            this.nextGeneration();
+          }
+        }
+        currentCount = this.addThread(
+          input,
+          this.currentPcs,
+          this.currentStarts,
+          currentCount,
+          0,
+          pos,
+          pos
+        );
+      }
+      if (currentCount === 0) {
+        // An assertion failed at pos; try the next position
+        if (matchStart !== -1 || pos >= length) {
+          break;
+        }
+        pos++;
+        this.nextGeneration();
+        continue;
+      }
+
+      const code = pos < length ? input.charCodeAt(pos) : -1;
+      let nextCount = 0;
+      this.nextGeneration();
+
+      for (let i = 0; i < currentCount; i++) {
+        const pc = this.currentPcs[i];
+        if (ops[pc] === Op.Match) {
+          // Lower-priority threads can no longer win
+          matchStart = this.currentStarts[i];
+          matchEnd = pos;
+          break;
+        }
+        if (code !== -1 && this.accepts(pc, code)) {
+          nextCount = this.addThread(
+            input,
+            this.nextPcs,
+            this.nextStarts,
+            nextCount,
+            pc + 1,
+            pos + 1,
+            this.currentStarts[i]
+          );
+        }
+      }
+
+      [this.currentPcs, this.nextPcs] = [this.nextPcs, this.currentPcs];
+      [this.currentStarts, this.nextStarts] = [this.nextStarts, this.currentStarts];
+      currentCount = nextCount;
+
+      if (pos >= length) {
+        break;
+      }
+      pos++;
+    }
+
+    return matchStart === -1 ? null : [matchStart, matchEnd];
+  }
+
+  private nextGeneration(): void {
+    this.generation++;
+    if (this.generation === 0xffffffff) {
+      this.marks.fill(0);
+      this.generation = 1;
+    }
+  }
+
+  /**
+   * Add the thread at pc to a list, following jumps, splits and assertions
+   * at pos in priority order. Returns the new list length.
+   */
+  private addThread(
+    input: string,
+    pcs: Int32Array,
+    starts: Int32Array,
+    count: number,
+    pc: number,
+    pos: number,
+    start: number
+  ): number {
+    const { ops, args, alternates, marks, stack, generation } = this;
+    let top = 0;
+    stack[top++] = pc;
+
+    while (top > 0) {
+      const current = stack[--top];
+      if (marks[current] === generation) {
+        continue;
+      }
+      marks[current] = generation;
+
+      switch (ops[current]) {
+        case Op.Jump:
+          stack[top++] = args[current];
+          break;
+        case Op.Split:
+          // The preferred branch is popped first
+          stack[top++] = alternates[current];
+          stack[top++] = args[current];
+          break;
+        case Op.LineStart:
+          if (pos === 0 || (this.multiline && isLineTerminator(input.charCodeAt(pos - 1)))) {
+            stack[top++] = current + 1;
+          }
+          break;
+        case Op.LineEnd:
+          if (pos === input.length || (this.multiline && isLineTerminator(input.charCodeAt(pos)))) {
+            stack[top++] = current + 1;
+          }
+          break;
+        case Op.WordBoundary:
+        case Op.NotWordBoundary: {
+          const before = pos > 0 && isWordChar(input.charCodeAt(pos - 1));
+          const after = pos < input.length && isWordChar(input.charCodeAt(pos));
+          if ((before !== after) === (ops[current] === Op.WordBoundary)) {
+            stack[top++] = current + 1;
+          }
+          break;
+        }
+        default:
+          pcs[count] = current;
+          starts[count] = start;
+          count++;
+      }
+    }
+
+    return count;
+  }
+
+  private accepts(pc: number, code: number): boolean {
+    switch (this.ops[pc]) {
+      case Op.Char:
+        return (this.ignoreCase ? canonical(code) : code) === this.args[pc];
+      case Op.Any:
+        return !isLineTerminator(code);
+      case Op.AnyWithNewline:
+        return true;
+      case Op.Class:
+        return this.classAccepts(this.classes[this.args[pc]], code);
+      default:
+        return false;
+    }
+  }
+
+  private classAccepts(cls: CompiledClass, code: number): boolean {
+    if (code < 128) {
+      return cls.ascii[code] === 1;
+    }
+    const found =
+      inRanges(cls.ranges, code) || (this.ignoreCase && inRanges(cls.ranges, canonical(code)));
+    return found !== cls.negated;
+  }
+
+  /**
+   * Collect the instructions that can consume the first character of a
+   * match, treating every assertion as satisfied. Skipping is only possible
+   * if the pattern cannot match the empty string.
+   */
+  private computeFirstChars(): boolean {
+    const { ops, args, alternates } = this;
+    const seen = new Uint8Array(ops.length);
+    const stack = [0];
+
+    while (stack.length > 0) {
+      const pc = stack.pop() as number;
+      if (seen[pc]) {
+        continue;
+      }
+      seen[pc] = 1;
+
+      switch (ops[pc]) {
+        case Op.Match:
+          return false;
+        case Op.Jump:
+          stack.push(args[pc]);
+          break;
+        case Op.Split:
+          stack.push(args[pc], alternates[pc]);
+          break;
+        case Op.LineStart:
+        case Op.LineEnd:
+        case Op.WordBoundary:
+        case Op.NotWordBoundary:
+          stack.push(pc + 1);
+          break;
+        default:
+          this.firstPcs.push(pc);
+      }
+    }
+
+    for (let code = 0; code < 128; code++) {
+      this.firstAscii[code] = this.firstPcs.some((pc) => this.accepts(pc, code)) ? 1 : 0;
+    }
+    if (this.firstPcs.length === 1 && ops[this.firstPcs[0]] === Op.Char && !this.ignoreCase) {
+      this.firstChar = args[this.firstPcs[0]];
+    }
+    return true;
+  }
+
+  /**
+   * First position at or after pos where a match can start, or -1
+   */
+  private nextCandidate(input: string, pos: number): number {
+    if (this.firstChar !== -1) {
+      return input.indexOf(String.fromCharCode(this.firstChar), pos);
+    }
+
+    for (let i = pos; i < input.length; i++) {
+      const code = input.charCodeAt(i);
+      const possible =
+        code < 128
+          ? this.firstAscii[code] === 1
+          : this.firstPcs.some((pc) => this.accepts(pc, code));
+      if (possible) {
+        return i;
+      }
+    }
+    return -1;
+  }
+}
+
+/**
+ * Emits Pike VM instructions for a syntax tree
+ */
+class ProgramBuilder {
+  readonly ops: number[] = [];
+  readonly args: number[] = [];
+  /** Lower-priority target of Split instructions */
+  readonly alternates: number[] = [];
+  readonly classes: CompiledClass[] = [];
+  private ignoreCase: boolean;
+  private dotAll: boolean;
+
+  constructor(ignoreCase: boolean, dotAll: boolean) {
+    this.ignoreCase = ignoreCase;
+    this.dotAll = dotAll;
+  }
+
+  push(op: Op, arg: number, alternate = 0): number {
+    if (this.ops.length >= MAX_PROGRAM_SIZE) {
+      throw new UnsupportedSyntaxError('Pattern is too large');
+    }
+    this.ops.push(op);
+    this.args.push(arg);
+    this.alternates.push(alternate);
+    return this.ops.length - 1;
+  }
+
+  emit(node: Node): void {
+    switch (node.type) {
+      case 'char':
+        this.push(Op.Char, this.ignoreCase ? canonical(node.code) : node.code);
+        break;
+      case 'any':
+        this.push(this.dotAll ? Op.AnyWithNewline : Op.Any, 0);
+        break;
+      case 'class':
+        this.push(Op.Class, this.addClass(node.cls));
+        break;
+      case 'assert':
+        this.push(node.op, 0);
+        break;
+      case 'empty':
+        break;
+      case 'seq':
+        node.items.forEach((item) => this.emit(item));
+        break;
+      case 'alt':
+        this.emitAlternation(node.alts);
+        break;
+      case 'repeat':
+        this.emitRepeat(node);
+        break;
+    }
+  }
+
+  /**
+   * split L1, L2; L1: alt0; jump end; L2: split ...; last alt; end:
+   */
+  private emitAlternation(alts: Node[]): void {
+    const jumps: number[] = [];
+    for (let i = 0; i < alts.length - 1; i++) {
+      const split = this.push(Op.Split, 0);
+      this.args[split] = this.ops.length;
+      this.emit(alts[i]);
+      jumps.push(this.push(Op.Jump, 0));
+      this.alternates[split] = this.ops.length;
+    }
+    this.emit(alts[alts.length - 1]);
+    jumps.forEach((jump) => (this.args[jump] = this.ops.length));
+  }
+
+  private emitRepeat(node: Node & { type: 'repeat' }): void {
+    for (let i = 0; i < node.min; i++) {
+      this.emit(node.body);
+    }
+
+    if (node.max === Infinity) {
+      // loop: split body, out; body; jump loop
+      const split = this.push(Op.Split, 0);
+      this.emit(node.body);
+      this.push(Op.Jump, split);
+      this.setSplit(split, split + 1, this.ops.length, node.greedy);
+      return;
+    }
+
+    // Optional copies nested so skipping one skips the rest: (x(x)?)?
+    const splits: number[] = [];
+    for (let i = node.min; i < node.max; i++) {
+      splits.push(this.push(Op.Split, 0));
+      this.emit(node.body);
+    }
+    for (const split of splits) {
+      this.setSplit(split, split + 1, this.ops.length, node.greedy);
+    }
+  }
+
+  private setSplit(split: number, body: number, out: number, greedy: boolean): void {
+    this.args[split] = greedy ? body : out;
+    this.alternates[split] = greedy ? out : body;
+  }
+
+  private addClass(cls: CharClass): number {
+    let ranges = cls.ranges;
+    if (this.ignoreCase) {
+      // Close the set under case folding so canonical(code) can be looked up
+      const folded = [...ranges];
+      for (let i = 0; i < ranges.length; i += 2) {
+        for (let code = ranges[i]; code <= ranges[i + 1]; code++) {
+          const canon = canonical(code);
+          if (canon !== code) {
+            folded.push(canon, canon);
+          }
+        }
+      }
+      ranges = normalizeRanges(folded);
+    }
+
+    const ascii = new Uint8Array(128);
+    for (let code = 0; code < 128; code++) {
+      const found =
+        inRanges(ranges, code) || (this.ignoreCase && inRanges(ranges, canonical(code)));
+      ascii[code] = found !== cls.negated ? 1 : 0;
+    }
+
+    this.classes.push({ ranges, negated: cls.negated, ascii });
+    return this.classes.length - 1;
+  }
+}
+
+/**
+ * Compile a pattern for the linear-time backend, or return null if it uses
+ * syntax the backend does not support
+ */
+export function compileLinearRegex(source: string, flags: string): LinearRegex | null {
+  try {
+    return new LinearRegex(source, flags);
+  } catch (err) {
+    if (err instanceof UnsupportedSyntaxError) {
+      return null;
+    }
+    throw err;
+  }
+}
@@ -0,0 +1,442 @@
+/**
+ * Literal prefilter
+ *
+ * Most rules cannot match a file unless it contains a specific literal
+ * (`exec`, `password`, `sk_live_`, ...). The loader derives those literals
+ * from each pattern, or takes them from the rule's `keywords` field, and a
+ * single Aho-Corasick pass per file decides which rules are worth running.
+ *
+ * Matching is ASCII case-insensitive, which makes the filter a superset for
+ * case-sensitive patterns too.
+ */
+
+/** Shorter literals match almost every file and are not worth filtering on */
+export const MIN_LITERAL_LENGTH = 3;
+
+const ALPHABET_SIZE = 128;
+
+/**
+ * "At least one of these lowercase strings appears in every match", or null
+ * when nothing useful can be derived.
+ */
+type Requirement = string[] | null;
+
+type Atom =
+  | { kind: 'char'; value: string }
+  | { kind: 'group'; requirement: Requirement }
+  | { kind: 'other' };
+
+const SEQUENCE_ESCAPES = new Set(['d', 'D', 'w', 'W', 's', 'S', 'b', 'B']);
+
+/**
+ * Minimal parser over regex source that tracks which literal runs are
+ * required by every match. Anything it does not understand is treated as
+ * "no literal here", so the result stays conservative.
+ */
+class LiteralExtractor {
+  private source: string;
+  private pos = 0;
+
+  constructor(source: string) {
+    this.source = source;
+  }
+
+  extract(): Requirement {
+    const requirement = this.parseAlternation();
+    return this.pos < this.source.length ? null : requirement;
+  }
+
+  private parseAlternation(): Requirement {
+    const alternatives: Requirement[] = [this.parseSequence()];
+    while (this.source[this.pos] === '|') {
+      this.pos++;
+      alternatives.push(this.parseSequence());
+    }
+
+    const union = new Set<string>();
+    for (const alternative of alternatives) {
+      if (!alternative) {
+        return null;
+      }
+      alternative.forEach((literal) => union.add(literal));
+    }
+    return Array.from(union);
+  }
+
+  private parseSequence(): Requirement {
+    const candidates: string[][] = [];
+    let run = '';
+
+    const flush = (): void => {
+      if (run.length >= MIN_LITERAL_LENGTH) {
+        candidates.push([run]);
+      }
+      run = '';
+    };
+
+    while (this.pos < this.source.length) {
+      const char = this.source[this.pos];
+      if (char === '|' || char === ')') {
+        break;
+      }
+
+      const atom = this.parseAtom();
+      const quantifier = this.parseQuantifier();
+
+      if (atom.kind === 'char' && quantifier === 'one') {
+        run += atom.value;
+        continue;
+      }
+
+      if (atom.kind === 'char' && quantifier === 'some') {
+        // The character appears at least once, but may repeat
+        run += atom.value;
+        flush();
+        continue;
+      }
+
+      flush();
+      if (atom.kind === 'group' && atom.requirement && quantifier !== 'optional') {
+        candidates.push(atom.requirement);
+      }
+    }
+    flush();
+
+    return this.pickBest(candidates);
+  }
+
+  /**
+   * Prefer the requirement whose shortest literal is longest, then the one
+   * with the fewest alternatives.
+   */
+  private pickBest(candidates: string[][]): Requirement {
+    let best: string[] | null = null;
+    let bestScore = -1;
+
+    for (const candidate of candidates) {
+      const shortest = Math.min(...candidate.map((literal) => literal.length));
+      if (shortest < MIN_LITERAL_LENGTH) {
+        continue;
+      }
+      const score = shortest * 1000 - candidate.length;
+      if (score > bestScore) {
+        best = candidate;
+        bestScore = score;
+      }
+    }
+
+    return best;
+  }
+
+  private parseAtom(): Atom {
+    const char = this.source[this.pos++];
+
+    switch (char) {
+      case '\\':
+        return this.parseEscape();
+      case '[':
+        this.skipClass();
+        return { kind: 'other' };
+      case '(':
+        return this.parseGroup();
+      case '.':
+      case '^':
+      case '$':
+        return { kind: 'other' };
+      default:
+        return this.literal(char);
+    }
+  }
+
+  private literal(char: string): Atom {
+    // Non-ASCII characters do not survive ASCII-only case folding
+    if (char.charCodeAt(0) >= ALPHABET_SIZE) {
+      return { kind: 'other' };
+    }
+    return { kind: 'char', value: char.toLowerCase() };
+  }
+
+  private parseEscape(): Atom {
+    const char = this.source[this.pos++];
+    if (char === undefined) {
+      return { kind: 'other' };
+    }
+
+    if (SEQUENCE_ESCAPES.has(char) || /[0-9]/.test(char)) {
+      return { kind: 'other' };
+    }
+
+    if (char === 'x') {
+      this.pos += 2;
+      return { kind: 'other' };
+    }
+    if (char === 'u' || char === 'p' || char === 'P' || char === 'k') {
+      const open = this.source[this.pos];
+      if (open === '{' || open === '<') {
+        const close = this.source.indexOf(open === '{' ? '}' : '>', this.pos);
+        this.pos = close === -1 ? this.source.length : close + 1;
+      } else if (char === 'u') {
+        this.pos += 4;
+      }
+      return { kind: 'other' };
+    }
+    if (char === 'c') {
+      this.pos++;
+      return { kind: 'other' };
+    }
+    if (/[a-zA-Z]/.test(char)) {
+      // \n, \t, \f, ... are control characters, not literals worth indexing
+      return { kind: 'other' };
+    }
+
+    return this.literal(char);
+  }
+
+  private skipClass(): void {
+    while (this.pos < this.source.length) {
+      const char = this.source[this.pos++];
+      if (char === '\\') {
+        this.pos++;
+      } else if (char === ']') {
+        return;
+      }
+    }
+  }
+
+  private parseGroup(): Atom {
+    let lookaround = false;
+
+    if (this.source[this.pos] === '?') {
+      const next = this.source[this.pos + 1];
+      if (next === ':') {
+        this.pos += 2;
+      } else if (next === '=' || next === '!') {
+        lookaround = true;
+        this.pos += 2;
+      } else if (next === '<') {
+        const after = this.source[this.pos + 2];
+        if (after === '=' || after === '!') {
+          lookaround = true;
+          this.pos += 3;
+        } else {
+          const close = this.source.indexOf('>', this.pos);
+          this.pos = close === -1 ? this.source.length : close + 1;
+        }
+      } else {
+        // Unknown group syntax (e.g. inline modifiers)
+        lookaround = true;
+        this.pos++;
+      }
+    }
+
+    const requirement = this.parseAlternation();
+    if (this.source[this.pos] === ')') {
+      this.pos++;
+    }
+
+    return { kind: 'group', requirement: lookaround ? null : requirement };
+  }
+
+  /**
+   * Consume a quantifier following an atom, if any
+   */
+  private parseQuantifier(): 'one' | 'some' | 'optional' {
+    const char = this.source[this.pos];
+    let result: 'one' | 'some' | 'optional' = 'one';
+
+    if (char === '*' || char === '?') {
+      this.pos++;
+      result = 'optional';
+    } else if (char === '+') {
+      this.pos++;
+      result = 'some';
+    } else if (char === '{') {
+      const match = /^\{(\d+)(,\d*)?\}/.exec(this.source.slice(this.pos));
+      if (!match) {
+        return 'one';
+      }
+      this.pos += match[0].length;
+      result = parseInt(match[1], 10) === 0 ? 'optional' : 'some';
+    } else {
+      return 'one';
+    }
+
+    // Lazy modifier
+    if (this.source[this.pos] === '?') {
+      this.pos++;
+    }
+    return result;
+  }
+}
+
+/**
+ * Derive lowercase literals, one of which must appear in every match of
+ * the pattern. Returns null if the pattern has no usable literal.
+ */
+export function extractRequiredLiterals(source: string): string[] | null {
+  try {
+    return new LiteralExtractor(source).extract();
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Aho-Corasick automaton over lowercase ASCII keywords, compiled to a dense
+ * transition table so searching costs one array lookup per character.
+ */
+export class AhoCorasick {
+  private transitions: Int32Array;
+  private outputs: number[][];
+
+  constructor(keywords: string[]) {
+    const goto: Array<Map<number, number>> = [new Map()];
+    const outputs: number[][] = [[]];
+
+    keywords.forEach((keyword, index) => {
+      let state = 0;
+      for (let i = 0; i < keyword.length; i++) {
+        const code = keyword.charCodeAt(i);
+        let next = goto[state].get(code);
+        if (next === undefined) {
+          next = goto.length;
+          goto.push(new Map());
+          outputs.push([]);
+          goto[state].set(code, next);
+        }
+        state = next;
+      }
+      outputs[state].push(index);
+    });
+
+    // Breadth-first construction of failure links, folded into a full DFA
+    const transitions = new Int32Array(goto.length * ALPHABET_SIZE);
+    const fail = new Int32Array(goto.length);
+    const queue: number[] = [];
+
+    for (const [code, next] of goto[0]) {
+      transitions[code] = next;
+      queue.push(next);
+    }
+
+    for (let head = 0; head < queue.length; head++) {
+      const state = queue[head];
+      outputs[state].push(...outputs[fail[state]]);
+
+      for (let code = 0; code < ALPHABET_SIZE; code++) {
+        const next = goto[state].get(code);
+        if (next === undefined) {
+          transitions[state * ALPHABET_SIZE + code] =
+            transitions[fail[state] * ALPHABET_SIZE + code];
+        } else {
+          fail[next] = transitions[fail[state] * ALPHABET_SIZE + code];
+          transitions[state * ALPHABET_SIZE + code] = next;
+          queue.push(next);
+        }
+      }
+    }
+
+    this.transitions = transitions;
+    this.outputs = outputs;
+  }
+
+  /**
+   * Call onMatch with the index of every keyword found in text. Returning
+   * true from onMatch stops the search early.
+   */
+  search(text: string, onMatch: (keywordIndex: number) => boolean | void): void {
+    const { transitions, outputs } = this;
+    let state = 0;
+
+    for (let i = 0; i < text.length; i++) {
+      let code = text.charCodeAt(i);
+      if (code >= ALPHABET_SIZE) {
+        state = 0;
+        continue;
+      }
+      if (code >= 65 && code <= 90) {
+        code += 32; // ASCII case folding
+      }
+
+      state = transitions[state * ALPHABET_SIZE + code];
+      const found = outputs[state];
+      for (let j = 0; j < found.length; j++) {
+        if (onMatch(found[j])) {
+          return;
+        }
+      }
+    }
+  }
+}
+
+/**
+ * Selects, per file, the rules whose required literals are present
+ */
+export class LiteralPrefilter<T> {
+  private automaton: AhoCorasick;
+  private keywordTargets: T[][];
+  private filteredCount: number;
+
+  /**
+   * @param entries each target with its keywords, or null if it must always run
+   */
+  constructor(entries: Array<{ target: T; keywords: string[] | null }>) {
+    const keywordIndex = new Map<string, number>();
+    this.keywordTargets = [];
+    this.filteredCount = 0;
+
+    for (const { target, keywords } of entries) {
+      if (!keywords) {
+        continue;
+      }
+      this.filteredCount++;
+      for (const keyword of keywords) {
+        let index = keywordIndex.get(keyword);
+        if (index === undefined) {
+          index = this.keywordTargets.length;
+          keywordIndex.set(keyword, index);
+          this.keywordTargets.push([]);
+        }
+        this.keywordTargets[index].push(target);
+      }
+    }
+
+    this.automaton = new AhoCorasick(Array.from(keywordIndex.keys()));
+  }
+
+  /**
+   * Targets with keywords that appear in content
+   */
+  match(content: string): Set<T> {
+    const matched = new Set<T>();
+    const seen = new Uint8Array(this.keywordTargets.length);
+    if (this.filteredCount === 0) {
+      return matched;
+    }
+
+    this.automaton.search(content, (keywordIndex) => {
+      if (seen[keywordIndex]) {
+        return false;
+      }
+      seen[keywordIndex] = 1;
+      for (const target of this.keywordTargets[keywordIndex]) {
+        matched.add(target);
+      }
+      return matched.size === this.filteredCount;
+    });
+
+    return matched;
+  }
+}
+
+/**
+ * Normalize user-supplied keywords; returns null if any keyword cannot be
+ * indexed (too short or non-ASCII), in which case the rule always runs.
+ */
+export function normalizeKeywords(keywords: string[]): string[] | null {
+  const normalized = keywords.map((keyword) => keyword.toLowerCase());
+  const indexable = normalized.every(
+    (keyword) => keyword.length > 0 && !/[^\x00-\x7f]/.test(keyword)
+  );
+  return indexable && normalized.length > 0 ? normalized : null;
+}
@@ -0,0 +1,49 @@
+/**
+ * Runtime time budget for pattern matching
+ *
+ * Every pattern gets a fixed budget per file. Between matches the analyzers
+ * compare the clock against a deadline; a single regex call that can run
+ * away (a suspicious pattern, or any pattern on a file with very long
+ * lines such as minified bundles) is additionally run through vm with a
+ * timeout, which interrupts the regex engine itself.
+ */
+
+import * as vm from 'vm';
+
+/** Milliseconds a pattern may spend on one file */
+export const DEFAULT_PATTERN_TIMEOUT = 1000;
+
+/** Lines at least this long make backtracking cost noticeable */
+export const LONG_LINE_LENGTH = 4096;
+
+export class PatternTimeoutError extends Error {
+  constructor(timeout: number) {
+    super(`Pattern exceeded its ${timeout}ms time budget`);
+    this.name = 'PatternTimeoutError';
+  }
+}
+
+let sandbox: vm.Context | null = null;
+let script: vm.Script | null = null;
+
+/**
+ * Run fn, interrupting it if it runs longer than timeout milliseconds
+ */
+export function runWithTimeout<T>(fn: () => T, timeout: number): T {
+  if (!sandbox || !script) {
+    sandbox = vm.createContext({ task: null });
+    script = new vm.Script('task()');
+  }
+
+  sandbox.task = fn;
+  try {
+    return script.runInContext(sandbox, { timeout: Math.max(1, Math.ceil(timeout)) }) as T;
+  } catch (err) {
+    if ((err as { code?: string }).code === 'ERR_SCRIPT_EXECUTION_TIMEOUT') {
+      throw new PatternTimeoutError(timeout);
+    }
+    throw err;
+  } finally {
+    sandbox.task = null;
+  }
+}
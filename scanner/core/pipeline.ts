@@ -0,0 +1,57 @@
+/**
+ * Bounded-concurrency file pipeline
+ *
+ * Scanning a file is an fs read followed by synchronous matching. Starting
+ * every file at once holds every file's content in memory and can exhaust
+ * file descriptors on large repos, so tasks are started a limited number at
+ * a time and a new one only starts when a finished result is handed on.
+ */
+
+/** Files read and matched at the same time when no limit is given */
+export const DEFAULT_FILE_CONCURRENCY = 16;
+
+export interface PipelineResult<R> {
+  index: number;
+  result: R;
+}
+
+/**
+ * Run task over items with at most `concurrency` tasks in flight, yielding
+ * results in completion order along with the index of their item. If the
+ * consumer stops early or a task fails, tasks still in flight are left to
+ * finish and their outcome is ignored.
+ */
+export async function* mapBounded<T, R>(
+  items: readonly T[],
+  concurrency: number,
+  task: (item: T, index: number) => Promise<R>
+): AsyncGenerator<PipelineResult<R>> {
+  const limit = Math.max(1, Math.floor(concurrency));
+  const running = new Map<number, Promise<PipelineResult<R>>>();
+  let next = 0;
+
+  const start = (): void => {
+    const index = next++;
+    running.set(index, task(items[index], index).then((result) => ({ index, result })));
+  };
+
+  while (next < items.length && running.size < limit) {
+    start();
+  }
+
+  try {
+    while (running.size > 0) {
+      const done = await Promise.race(running.values());
+      running.delete(done.index);
+      if (next < items.length) {
+        start();
+      }
+      yield done;
+    }
+  } finally {
+    // Nothing awaits these any more, so a rejection must not go unhandled
+    for (const task of running.values()) {
+      task.catch(() => {});
+    }
+  }
+}
@@ -0,0 +1,587 @@
+/**
+ * Static ReDoS check for rule patterns
+ *
+ * Parses a regex into a small syntax tree and looks for the shapes that make
+ * a backtracking engine take exponential time:
+ * - an unbounded repeat whose body can be matched through an inner
+ *   unbounded repeat in more than one way, e.g. (a+)+, (\w+\s?)*, (x\w+)+
+ * - an unbounded repeat over alternatives that can start with the same
+ *   character, e.g. (a|a)*, (\d|\w)+
+ *
+ * Clear-cut cases are reported as 'exponential' and rejected at load time;
+ * ambiguous ones are 'suspicious' and always run under the runtime time
+ * budget. Polynomial patterns (e.g. .*x.*) are left to the time budget.
+ */
+
+export type PatternSafety = 'safe' | 'suspicious' | 'exponential';
+
+export interface SafetyReport {
+  safety: PatternSafety;
+  reason?: string;
+}
+
+/**
+ * Version of the check, stored with cached results such as compiled rule
+ * bundles. Bump it whenever a change here can classify a pattern differently.
+ */
+export const SAFETY_CHECK_VERSION = 2;
+
+/** Highest code point a pattern can match */
+const MAX_CODE = 0x10ffff;
+
+/**
+ * Set of characters a node can consume: a bitmap over ASCII plus sorted,
+ * disjoint ranges for everything above it.
+ */
+class CharSet {
+  readonly bits = new Uint32Array(4);
+  ranges: Array<[number, number]> = [];
+
+  static of(...codes: number[]): CharSet {
+    const set = new CharSet();
+    codes.forEach((code) => set.add(code));
+    return set;
+  }
+
+  static range(from: number, to: number): CharSet {
+    const set = new CharSet();
+    for (let code = from; code <= to && code < 128; code++) {
+      set.add(code);
+    }
+    if (to >= 128) {
+      set.ranges = [[Math.max(from, 128), to]];
+    }
+    return set;
+  }
+
+  static all(): CharSet {
+    const set = new CharSet();
+    set.bits.fill(0xffffffff);
+    set.ranges = [[128, MAX_CODE]];
+    return set;
+  }
+
+  add(code: number): void {
+    if (code >= 128) {
+      this.ranges = mergeRanges([...this.ranges, [code, code]]);
+    } else {
+      this.bits[code >>> 5] |= 1 << (code & 31);
+    }
+  }
+
+  union(other: CharSet): CharSet {
+    const set = new CharSet();
+    for (let i = 0; i < 4; i++) {
+      set.bits[i] = this.bits[i] | other.bits[i];
+    }
+    set.ranges = mergeRanges([...this.ranges, ...other.ranges]);
+    return set;
+  }
+
+  complement(): CharSet {
+    const set = new CharSet();
+    for (let i = 0; i < 4; i++) {
+      set.bits[i] = ~this.bits[i];
+    }
+    let next = 128;
+    for (const [from, to] of this.ranges) {
+      if (from > next) {
+        set.ranges.push([next, from - 1]);
+      }
+      next = to + 1;
+    }
+    if (next <= MAX_CODE) {
+      set.ranges.push([next, MAX_CODE]);
+    }
+    return set;
+  }
+
+  overlaps(other: CharSet): boolean {
+    for (let i = 0; i < 4; i++) {
+      if (this.bits[i] & other.bits[i]) {
+        return true;
+      }
+    }
+    return this.ranges.some(([from, to]) =>
+      other.ranges.some(([otherFrom, otherTo]) => from <= otherTo && otherFrom <= to)
+    );
+  }
+
+  isEmpty(): boolean {
+    return this.ranges.length === 0 && this.bits.every((word) => word === 0);
+  }
+}
+
+function mergeRanges(ranges: Array<[number, number]>): Array<[number, number]> {
+  const merged: Array<[number, number]> = [];
+  for (const [from, to] of ranges.sort((a, b) => a[0] - b[0])) {
+    const last = merged[merged.length - 1];
+    if (last && from <= last[1] + 1) {
+      last[1] = Math.max(last[1], to);
+    } else {
+      merged.push([from, to]);
+    }
+  }
+  return merged;
+}
+
+const DIGITS = CharSet.range(48, 57);
+const WORD = DIGITS.union(CharSet.range(65, 90))
+  .union(CharSet.range(97, 122))
+  .union(CharSet.of(95));
+// Includes the Unicode spaces JavaScript's \s matches
+const SPACE = CharSet.of(9, 10, 11, 12, 13, 32, 0xa0, 0x1680, 0x2028, 0x2029)
+  .union(CharSet.of(0x202f, 0x205f, 0x3000, 0xfeff))
+  .union(CharSet.range(0x2000, 0x200a));
+const DOT = CharSet.of(10, 13, 0x2028, 0x2029).complement();
+
+type Node =
+  | { type: 'set'; set: CharSet }
+  | { type: 'empty' }
+  | { type: 'seq'; items: Node[] }
+  | { type: 'alt'; alts: Node[] }
+  | { type: 'repeat'; body: Node; min: number; max: number };
+
+class RegexParser {
+  private source: string;
+  private ignoreCase: boolean;
+  private pos = 0;
+
+  constructor(source: string, flags: string) {
+    this.source = source;
+    this.ignoreCase = flags.includes('i');
+  }
+
+  parse(): Node {
+    const node = this.parseAlternation();
+    if (this.pos < this.source.length) {
+      throw new Error(`Unexpected character at ${this.pos}`);
+    }
+    return node;
+  }
+
+  private parseAlternation(): Node {
+    const alts = [this.parseSequence()];
+    while (this.source[this.pos] === '|') {
+      this.pos++;
+      alts.push(this.parseSequence());
+    }
+    return alts.length === 1 ? alts[0] : { type: 'alt', alts };
+  }
+
+  private parseSequence(): Node {
+    const items: Node[] = [];
+    while (this.pos < this.source.length) {
+      const char = this.source[this.pos];
+      if (char === '|' || char === ')') {
+        break;
+      }
+      items.push(this.parseQuantified(this.parseAtom()));
+    }
+    return items.length === 1 ? items[0] : { type: 'seq', items };
+  }
+
+  private parseQuantified(atom: Node): Node {
+    const char = this.source[this.pos];
+    let min: number;
+    let max: number;
+
+    if (char === '*') {
+      [min, max] = [0, Infinity];
+      this.pos++;
+    } else if (char === '+') {
+      [min, max] = [1, Infinity];
+      this.pos++;
+    } else if (char === '?') {
+      [min, max] = [0, 1];
+      this.pos++;
+    } else if (char === '{') {
+      const match = /^\{(\d+)(,(\d*))?\}/.exec(this.source.slice(this.pos));
+      if (!match) {
+        return atom;
+      }
+      min = parseInt(match[1], 10);
+      max = match[2] === undefined ? min : match[3] ? parseInt(match[3], 10) : Infinity;
+      this.pos += match[0].length;
+    } else {
+      return atom;
+    }
+
+    if (this.source[this.pos] === '?') {
+      this.pos++;
+    }
+    return { type: 'repeat', body: atom, min, max };
+  }
+
+  private parseAtom(): Node {
+    const char = this.source[this.pos++];
+
+    switch (char) {
+      case '(':
+        return this.parseGroup();
+      case '[':
+        return { type: 'set', set: this.parseClass() };
+      case '.':
+        return { type: 'set', set: DOT };
+      case '^':
+      case '$':
+        return { type: 'empty' };
+      case '\\':
+        return this.parseEscape();
+      default:
+        return { type: 'set', set: this.literal(char.charCodeAt(0)) };
+    }
+  }
+
+  private literal(code: number): CharSet {
+    const set = CharSet.of(code);
+    if (this.ignoreCase) {
+      const char = String.fromCharCode(code);
+      set.add(char.toLowerCase().charCodeAt(0));
+      set.add(char.toUpperCase().charCodeAt(0));
+    }
+    return set;
+  }
+
+  private parseGroup(): Node {
+    let lookaround = false;
+
+    if (this.source[this.pos] === '?') {
+      const next = this.source[this.pos + 1];
+      if (next === ':') {
+        this.pos += 2;
+      } else if (next === '=' || next === '!') {
+        lookaround = true;
+        this.pos += 2;
+      } else if (next === '<') {
+        const after = this.source[this.pos + 2];
+        if (after === '=' || after === '!') {
+          lookaround = true;
+          this.pos += 3;
+        } else {
+          this.pos = this.source.indexOf('>', this.pos) + 1;
+        }
+      }
+    }
+
+    const inner = this.parseAlternation();
+    if (this.source[this.pos++] !== ')') {
+      throw new Error('Unterminated group');
+    }
+    return lookaround ? { type: 'empty' } : inner;
+  }
+
+  /**
+   * Character set for \d, \w, \s and friends; null for anything else
+   */
+  private classEscape(char: string): CharSet | null {
+    switch (char) {
+      case 'd':
+        return DIGITS;
+      case 'D':
+        return DIGITS.complement();
+      case 'w':
+        return WORD;
+      case 'W':
+        return WORD.complement();
+      case 's':
+        return SPACE;
+      case 'S':
+        return SPACE.complement();
+      default:
+        return null;
+    }
+  }
+
+  private parseEscape(): Node {
+    const char = this.source[this.pos++];
+    const classSet = this.classEscape(char);
+    if (classSet) {
+      return { type: 'set', set: classSet };
+    }
+
+    if (char === 'b' || char === 'B') {
+      return { type: 'empty' };
+    }
+    if (/[1-9]/.test(char) || char === 'k') {
+      // Backreferences can match anything, including nothing
+      if (char === 'k') {
+        this.pos = this.source.indexOf('>', this.pos) + 1;
+      }
+      return { type: 'repeat', body: { type: 'set', set: CharSet.all() }, min: 0, max: Infinity };
+    }
+    return { type: 'set', set: this.escapeCodeSet(char) };
+  }
+
+  /**
+   * Set for a single escaped character; unusual escapes (\x, \u, \p, ...) are
+   * treated as "any character", which can only make the check stricter.
+   */
+  private escapeCodeSet(char: string): CharSet {
+    const controls: Record<string, number> = { n: 10, r: 13, t: 9, f: 12, v: 11, '0': 0 };
+    if (char in controls) {
+      return CharSet.of(controls[char]);
+    }
+    if (char === 'x') {
+      this.pos += 2;
+      return CharSet.all();
+    }
+    if (char === 'u' || char === 'p' || char === 'P') {
+      if (this.source[this.pos] === '{') {
+        this.pos = this.source.indexOf('}', this.pos) + 1;
+      } else if (char === 'u') {
+        this.pos += 4;
+      }
+      return CharSet.all();
+    }
+    if (char === 'c') {
+      this.pos++;
+      return CharSet.all();
+    }
+    return this.literal(char.charCodeAt(0));
+  }
+
+  private parseClass(): CharSet {
+    let negated = false;
+    if (this.source[this.pos] === '^') {
+      negated = true;
+      this.pos++;
+    }
+
+    let set = new CharSet();
+    let first = true;
+    while (this.pos < this.source.length) {
+      let char = this.source[this.pos++];
+      if (char === ']' && !first) {
+        return negated ? set.complement() : set;
+      }
+      first = false;
+
+      let code: number;
+      if (char === '\\') {
+        char = this.source[this.pos++];
+        const classSet = this.classEscape(char);
+        if (classSet) {
+          set = set.union(classSet);
+          continue;
+        }
+        const escaped = char === 'b' ? CharSet.of(8) : this.escapeCodeSet(char);
+        if (escaped.ranges.length > 0 || escaped.bits.filter((word) => word !== 0).length !== 1) {
+          set = set.union(escaped);
+          continue;
+        }
+        code = char === 'b' ? 8 : this.singleCode(escaped);
+      } else {
+        code = char.charCodeAt(0);
+      }
+
+      if (this.source[this.pos] === '-' && this.source[this.pos + 1] !== ']') {
+        this.pos++;
+        let end = this.source[this.pos++];
+        if (end === '\\') {
+          end = this.source[this.pos++];
+          const escaped = this.escapeCodeSet(end);
+          set = set.union(escaped).union(this.literal(code));
+          continue;
+        }
+        set = set.union(CharSet.range(code, end.charCodeAt(0)));
+        if (this.ignoreCase) {
+          set = set.union(this.caseFolded(code, end.charCodeAt(0)));
+        }
+      } else {
+        set = set.union(this.literal(code));
+      }
+    }
+
+    throw new Error('Unterminated character class');
+  }
+
+  private singleCode(set: CharSet): number {
+    for (let code = 0; code < 128; code++) {
+      if (set.bits[code >>> 5] & (1 << (code & 31))) {
+        return code;
+      }
+    }
+    return 0;
+  }
+
+  private caseFolded(from: number, to: number): CharSet {
+    const set = new CharSet();
+    for (let code = from; code <= to && code < 128; code++) {
+      const char = String.fromCharCode(code);
+      set.add(char.toLowerCase().charCodeAt(0));
+      set.add(char.toUpperCase().charCodeAt(0));
+    }
+    return set;
+  }
+}
+
+function nullable(node: Node): boolean {
+  switch (node.type) {
+    case 'set':
+      return false;
+    case 'empty':
+      return true;
+    case 'seq':
+      return node.items.every(nullable);
+    case 'alt':
+      return node.alts.some(nullable);
+    case 'repeat':
+      return node.min === 0 || nullable(node.body);
+  }
+}
+
+/**
+ * Every character the node can consume
+ */
+function chars(node: Node): CharSet {
+  switch (node.type) {
+    case 'set':
+      return node.set;
+    case 'empty':
+      return new CharSet();
+    case 'seq':
+      return node.items.reduce((set, item) => set.union(chars(item)), new CharSet());
+    case 'alt':
+      return node.alts.reduce((set, alt) => set.union(chars(alt)), new CharSet());
+    case 'repeat':
+      return chars(node.body);
+  }
+}
+
+/**
+ * Characters that can start a non-empty match of the node
+ */
+function first(node: Node): CharSet {
+  switch (node.type) {
+    case 'set':
+      return node.set;
+    case 'empty':
+      return new CharSet();
+    case 'seq': {
+      let set = new CharSet();
+      for (const item of node.items) {
+        set = set.union(first(item));
+        if (!nullable(item)) {
+          break;
+        }
+      }
+      return set;
+    }
+    case 'alt':
+      return node.alts.reduce((set, alt) => set.union(first(alt)), new CharSet());
+    case 'repeat':
+      return first(node.body);
+  }
+}
+
+function children(node: Node): Node[] {
+  switch (node.type) {
+    case 'seq':
+      return node.items;
+    case 'alt':
+      return node.alts;
+    case 'repeat':
+      return [node.body];
+    default:
+      return [];
+  }
+}
+
+function containsUnboundedRepeat(node: Node): Node | null {
+  if (node.type === 'repeat' && node.max === Infinity && !chars(node.body).isEmpty()) {
+    return node;
+  }
+  for (const child of children(node)) {
+    const found = containsUnboundedRepeat(child);
+    if (found) {
+      return found;
+    }
+  }
+  return null;
+}
+
+function sequenceItems(node: Node): Node[] {
+  return node.type === 'seq' ? node.items : [node];
+}
+
+/**
+ * Check one unbounded repeat for the ambiguous shapes described above
+ */
+function checkRepeat(repeat: Node & { type: 'repeat' }): SafetyReport {
+  const body = repeat.body;
+  const items = sequenceItems(body);
+
+  // Nested unbounded repeat: exponential if everything else in one way
+  // through the body can be skipped or consumed by the inner repeat as well.
+  // Each alternative of an alternation body is one such way.
+  const sequences = body.type === 'alt' ? body.alts.map(sequenceItems) : [items];
+  for (const sequence of sequences) {
+    for (let i = 0; i < sequence.length; i++) {
+      const inner = containsUnboundedRepeat(sequence[i]);
+      if (!inner || inner.type !== 'repeat') {
+        continue;
+      }
+      const innerChars = chars(inner.body);
+      const ambiguous = sequence.every(
+        (item, j) => j === i || nullable(item) || chars(item).overlaps(innerChars)
+      );
+      if (ambiguous) {
+        return { safety: 'exponential', reason: 'nested quantifier over overlapping input' };
+      }
+    }
+  }
+
+  // Alternatives that can start with the same character
+  const alternation = items.length === 1 && items[0].type === 'alt' ? items[0] : null;
+  if (alternation) {
+    const alts = alternation.alts;
+    for (let i = 0; i < alts.length; i++) {
+      for (let j = i + 1; j < alts.length; j++) {
+        if (first(alts[i]).overlaps(first(alts[j]))) {
+          const singleChars = alts[i].type === 'set' && alts[j].type === 'set';
+          return singleChars
+            ? { safety: 'exponential', reason: 'repeated alternatives match the same character' }
+            : { safety: 'suspicious', reason: 'repeated alternatives can overlap' };
+        }
+      }
+    }
+  }
+
+  return { safety: 'safe' };
+}
+
+function walk(node: Node): SafetyReport {
+  let report: SafetyReport = { safety: 'safe' };
+
+  if (node.type === 'repeat' && node.max === Infinity) {
+    report = checkRepeat(node);
+    if (report.safety === 'exponential') {
+      return report;
+    }
+  }
+
+  for (const child of children(node)) {
+    const childReport = walk(child);
+    if (childReport.safety === 'exponential') {
+      return childReport;
+    }
+    if (childReport.safety === 'suspicious') {
+      report = childReport;
+    }
+  }
+
+  return report;
+}
+
+/**
+ * Classify a pattern's worst-case backtracking behaviour. Patterns the
+ * checker cannot parse are reported as suspicious.
+ */
+export function checkPatternSafety(source: string, flags = ''): SafetyReport {
+  try {
+    return walk(new RegexParser(source, flags).parse());
+  } catch {
+    return { safety: 'suspicious', reason: 'pattern could not be analyzed' };
+  }
+}
@@ -0,0 +1,326 @@
+/**
+ * Persistent scan result cache
+ *
+ * Findings are stored per file content and per rule: each record holds the
+ * findings for one content hash, attributed to the hashes of the rules that
+ * produced them, along with the rule set it was matched against. When rules
+ * are added or edited, only those rules are run on a file whose content is
+ * cached and the findings of every other rule are replayed; removed rules
+ * simply stop being replayed. A fingerprint of the options that affect
+ * matching covers the whole cache, and changing it discards everything. See
+ * CacheStore for the file format.
+ *
+ * Content hashes are git blob IDs. In a git work tree the IDs of clean
+ * tracked files are read from the index in bulk, so only modified and
+ * untracked files are read and hashed. Since a blob has the same ID in every
+ * clone, a cache can be shared between branches and CI runs. Other files are
+ * hashed once per change: the blob ID is recorded with the file's size,
+ * mtime and inode, and reused for as long as a stat returns the same ones.
+ */
+
+import * as path from 'path';
+import { createHash } from 'crypto';
+import { stat } from 'fs/promises';
+import { Finding, Rule, ScanOptions } from './types';
+import { CompiledRule, RuleProgram } from './rule-program';
+import { RegexFinding } from '../analyzers/regex-finding';
+import { IncrementalScanner } from '../../src/incremental/incremental-scanner';
+import { CacheStore } from '../../src/incremental/cache-store';
+
+/** Cache directory used when neither the options nor the config name one */
+export const DEFAULT_CACHE_DIR = '.vibesec-cache';
+
+// Bump when the stored record format or the content hash changes
+const CACHE_VERSION = 3;
+
+export interface CacheLookup {
+  file: string;
+  /** Key of the file's record, or '' if the file could not be read */
+  hash: string;
+  /** Findings recorded for this content by rules still in the program */
+  findings?: Finding[];
+  /** Rules with no recorded results for this content: all of them on a miss */
+  missing: CompiledRule[];
+}
+
+/**
+ * Metadata of a file when it had content blobId. Numbers are stored as
+ * strings since nanosecond times do not fit in a double.
+ */
+interface CachedStat {
+  size: string;
+  mtimeNs: string;
+  ino: string;
+  blobId: string;
+}
+
+// Files modified this recently may change again within the same mtime tick,
+// so their metadata does not prove their content is unchanged
+const RACY_WINDOW = 2000;
+
+/**
+ * Findings for one file content, each tagged with its rule's position in the
+ * rule set record named by rules
+ */
+interface CachedFile {
+  rules: string;
+  findings: Array<[number, Finding]>;
+}
+
+const ruleHashes = new WeakMap<Rule, string>();
+
+/**
+ * Hash of everything in a rule definition, so any edit gives it a new hash
+ */
+export function ruleHash(rule: Rule): string {
+  let hash = ruleHashes.get(rule);
+  if (!hash) {
+    hash = createHash('sha1').update(JSON.stringify(rule)).digest('hex');
+    ruleHashes.set(rule, hash);
+  }
+  return hash;
+}
+
+/**
+ * Fingerprint of the options that decide findings independently of any rule
+ */
+export function cacheFingerprint(options: ScanOptions): string {
+  return createHash('sha256')
+    .update(
+      JSON.stringify({
+        version: CACHE_VERSION,
+        engine: options.engine || 'regex',
+        regexBackend: options.regexBackend || 'native',
+        maxFileSize: options.maxFileSize,
+      })
+    )
+    .digest('hex');
+}
+
+/**
+ * Sorted, distinct hashes of a program's rules
+ */
+function ruleSetOf(program: RuleProgram): string[] {
+  return Array.from(new Set(program.rules.map(({ rule }) => ruleHash(rule)))).sort();
+}
+
+function ruleSetKey(ruleSet: string[]): string {
+  return createHash('sha1').update(ruleSet.join('\n')).digest('hex');
+}
+
+export class ResultCache {
+  /** Files replayed in full */
+  hits = 0;
+  /** Files with results cached for some rules, run against the others */
+  partial = 0;
+  /** Files run against every rule */
+  misses = 0;
+
+  private store: CacheStore;
+  private blobIds: Map<string, string>;
+  private hasher: IncrementalScanner;
+  private program: RuleProgram;
+  private ruleSet: string[];
+  private ruleSetKey: string;
+  private ruleSetRecorded: boolean;
+  // First program position of each rule hash, used to order merged findings
+  private positions = new Map<string, number>();
+  private ruleSets = new Map<string, Promise<string[] | undefined>>();
+  // Rule hashes of replayed findings, which are plain objects
+  private attribution = new WeakMap<Finding, string>();
+
+  private constructor(
+    store: CacheStore,
+    blobIds: Map<string, string>,
+    hasher: IncrementalScanner,
+    program: RuleProgram,
+    ruleSetRecorded: boolean
+  ) {
+    this.store = store;
+    this.blobIds = blobIds;
+    this.hasher = hasher;
+    this.program = program;
+    this.ruleSet = ruleSetOf(program);
+    this.ruleSetKey = ruleSetKey(this.ruleSet);
+    this.ruleSetRecorded = ruleSetRecorded;
+    program.rules.forEach(({ rule }, index) => {
+      const hash = ruleHash(rule);
+      if (!this.positions.has(hash)) {
+        this.positions.set(hash, index);
+      }
+    });
+  }
+
+  /**
+   * Open the cache kept in dir for a program, starting empty if there is
+   * none or it was produced with a different fingerprint. root is the
+   * directory being scanned, whose index blob IDs are read up front.
+   */
+  static async open(
+    dir: string,
+    fingerprint: string,
+    root: string,
+    program: RuleProgram
+  ): Promise<ResultCache> {
+    const hasher = new IncrementalScanner();
+    const [store, blobIds] = await Promise.all([
+      CacheStore.open(dir, fingerprint),
+      hasher.getBlobIds(root),
+    ]);
+    const recorded = await store.get<string[]>(ruleSetKey(ruleSetOf(program)));
+    return new ResultCache(store, blobIds, hasher, program, recorded !== undefined);
+  }
+
+  /**
+   * Look up findings recorded for a file's content, hashing it only if
+   * neither the git index nor the recorded metadata give its blob ID.
+   * Replayed findings are copies pointing at this file, since identical
+   * content may have been cached under a different path.
+   */
+  async lookup(file: string): Promise<CacheLookup> {
+    const absolute = path.resolve(file);
+    const blobId = this.blobIds.get(absolute) || (await this.contentHash(absolute));
+    // Rules apply by language, so the same content is cached per extension
+    const hash = blobId && recordKey(blobId, path.extname(file));
+    const cached = hash ? await this.store.get<CachedFile>(hash) : undefined;
+    const covered = cached && (await this.loadRuleSet(cached.rules));
+    if (!cached || !covered) {
+      this.misses++;
+      return { file, hash, missing: this.program.rules };
+    }
+
+    const coveredHashes = new Set(covered);
+    const missing = this.program.rules.filter(({ rule }) => !coveredHashes.has(ruleHash(rule)));
+    const findings: Finding[] = [];
+    for (const [index, finding] of cached.findings) {
+      const rule = covered[index];
+      if (this.positions.has(rule)) {
+        const replayed = { ...finding, location: { ...finding.location, file } };
+        this.attribution.set(replayed, rule);
+        findings.push(replayed);
+      }
+    }
+
+    if (missing.length === 0) {
+      this.hits++;
+    } else {
+      this.partial++;
+    }
+    return { file, hash, findings, missing };
+  }
+
+  /**
+   * Combine replayed findings with those of the rules that were just run,
+   * in rule order
+   */
+  merge(lookup: CacheLookup, findings: Finding[]): Finding[] {
+    if (!lookup.findings || lookup.findings.length === 0) {
+      return findings;
+    }
+    if (findings.length === 0) {
+      return lookup.findings;
+    }
+    const position = (finding: Finding): number =>
+      this.positions.get(this.ruleHashOf(finding) || '') ?? Infinity;
+    return [...lookup.findings, ...findings].sort((a, b) => position(a) - position(b));
+  }
+
+  /**
+   * Record a file's findings for every rule in the program. Nothing is
+   * recorded if a finding cannot be traced back to its rule.
+   */
+  set(lookup: CacheLookup, findings: Finding[]): void {
+    if (!lookup.hash) {
+      return;
+    }
+
+    const indexes = new Map(this.ruleSet.map((hash, index) => [hash, index]));
+    const record: CachedFile = { rules: this.ruleSetKey, findings: [] };
+    for (const finding of findings) {
+      const index = indexes.get(this.ruleHashOf(finding) || '');
+      if (index === undefined) {
+        return;
+      }
+      record.findings.push([index, finding]);
+    }
+
+    if (!this.ruleSetRecorded) {
+      this.store.set(this.ruleSetKey, this.ruleSet);
+      this.ruleSetRecorded = true;
+    }
+    this.store.set(lookup.hash, record);
+  }
+
+  /**
+   * Write new results back to the cache directory
+   */
+  async save(): Promise<void> {
+    await this.store.save();
+  }
+
+  /**
+   * Release the cache files without saving
+   */
+  async close(): Promise<void> {
+    await this.store.close();
+  }
+
+  /**
+   * Blob ID of a file, reusing the one recorded with its metadata if its
+   * size, mtime and inode are unchanged, or '' if it cannot be read
+   */
+  private async contentHash(file: string): Promise<string> {
+    let stats;
+    try {
+      stats = await stat(file, { bigint: true });
+    } catch {
+      return '';
+    }
+    const current = {
+      size: stats.size.toString(),
+      mtimeNs: stats.mtimeNs.toString(),
+      ino: stats.ino.toString(),
+    };
+
+    const key = statKey(file);
+    const recorded = await this.store.get<CachedStat>(key);
+    if (
+      recorded &&
+      recorded.size === current.size &&
+      recorded.mtimeNs === current.mtimeNs &&
+      recorded.ino === current.ino
+    ) {
+      return recorded.blobId;
+    }
+
+    const blobId = await this.hasher.getFileHash(file, process.cwd());
+    if (blobId && Number(stats.mtimeMs) < Date.now() - RACY_WINDOW) {
+      this.store.set(key, { ...current, blobId });
+    }
+    return blobId;
+  }
+
+  private loadRuleSet(key: string): Promise<string[] | undefined> {
+    let ruleSet = this.ruleSets.get(key);
+    if (!ruleSet) {
+      ruleSet = this.store.get<string[]>(key);
+      this.ruleSets.set(key, ruleSet);
+    }
+    return ruleSet;
+  }
+
+  private ruleHashOf(finding: Finding): string | undefined {
+    if (finding instanceof RegexFinding) {
+      return ruleHash(finding.compiledRule.rule);
+    }
+    return this.attribution.get(finding);
+  }
+}
+
+function recordKey(blobId: string, extension: string): string {
+  return createHash('sha1').update(`${extension}\0${blobId}`).digest('hex');
+}
+
+function statKey(file: string): string {
+  return createHash('sha1').update(`stat\0${file}`).digest('hex');
+}
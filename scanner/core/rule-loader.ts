@@ -1,56 +1,281 @@
 import * as path from 'path';
 import * as fs from 'fs/promises';
-import * as yaml from 'js-yaml';
+import { createHash } from 'crypto';
 import fg from 'fast-glob';
-import { Rule, Pattern } from './types';
+import { Rule, Pattern, RegexBackend } from './types';
+import { RuleAnalysis, RuleProgram } from './rule-program';
+import { SAFETY_CHECK_VERSION } from './redos';
+import { DEFAULT_FILE_CONCURRENCY, mapBounded } from './pipeline';
+import { compileSchema, SchemaValidator } from './json-schema';
+
+const RULE_FILES = '**/*.{yaml,yml}';
+
+/** Schema every rule is validated against */
+const RULE_SCHEMA_FILE = path.join(__dirname, '../../rules/schema.json');
+
+/** Bundle of validated rules written next to the rule files by compileBundle() */
+export const RULE_BUNDLE_FILE = 'rules.bundle.json';
+
+// Bump when validateRule() normalizes rules differently, so older bundles are ignored
+const BUNDLE_FORMAT = 2;
+
+interface RuleBundle {
+  format: number;
+  /**
+   * Hash of the version of the pattern safety check and the name and content
+   * hash of every rule file the bundle was built from
+   */
+  fingerprint: string;
+  rules: Rule[];
+  /** Analysis of each rule, so loading the bundle skips it */
+  analyses: RuleAnalysis[];
+}
+
+interface RuleFile {
+  file: string;
+  content?: string;
+  /** sha256 of the content */
+  hash?: string;
+  /** Validated rules, once the file has been parsed */
+  rules?: Rule[];
+  /** Why the file could not be read or parsed */
+  error?: Error;
+}
+
+/** Parses a rule file read by readRuleFiles(), setting its rules or error */
+type RuleParser = (file: RuleFile) => RuleFile;
+
+// Compiled on first use and shared by every loader
+let validator: Promise<SchemaValidator> | null = null;
+
+export interface RuleLoaderOptions {
+  /** Backend for rules that do not set their own regexBackend */
+  regexBackend?: RegexBackend;
+}
 
 export class RuleLoader {
   private rulesPath: string;
+  private regexBackend: RegexBackend;
+  private program: RuleProgram | null = null;
 
-  constructor(rulesPath?: string) {
+  constructor(rulesPath?: string, options: RuleLoaderOptions = {}) {
     this.rulesPath = rulesPath || path.join(__dirname, '../../rules/default');
+    this.regexBackend = options.regexBackend || 'native';
   }
 
+  /**
+   * Load every rule in the rules directory: from its bundle if the bundle
+   * was compiled from the rule files as they are now, otherwise by parsing
+   * the YAML files. Invalid rule files are reported and skipped.
+   */
   async load(): Promise<Rule[]> {
-    const rules: Rule[] = [];
+    let rules: Rule[] = [];
+    let analyses: RuleAnalysis[] | undefined;
 
     try {
-      // Find all YAML files in rules directory
-      const ruleFiles = await fg('**/*.{yaml,yml}', {
-        cwd: this.rulesPath,
-        absolute: true,
-        onlyFiles: true,
-      });
-
-      // Load each rule file
-      for (const file of ruleFiles) {
-        try {
-          const content = await fs.readFile(file, 'utf-8');
-          const parsed = yaml.load(content) as any;
-
-          // Handle both single rule and multiple rules in a file
-          if (Array.isArray(parsed)) {
-            rules.push(...parsed.map((r) => this.validateRule(r, file)));
-          } else if (parsed.rules && Array.isArray(parsed.rules)) {
-            rules.push(...parsed.rules.map((r: any) => this.validateRule(r, file)));
-          } else {
-            rules.push(this.validateRule(parsed, file));
-          }
-        } catch (err) {
-          console.error(`⚠️  Error loading rule file ${file}:`, (err as Error).message);
-        }
+      let bundle = await this.readBundle();
+      // Without a bundle every file needs parsing, so each is parsed as soon
+      // as it has been read, while the rest are still being read
+      const files = await this.readRuleFiles(!bundle);
+      if (bundle && bundle.fingerprint !== this.fingerprint(files)) {
+        bundle = null;
+      }
+      if (bundle) {
+        ({ rules, analyses } = bundle);
+      } else {
+        rules = await this.collectRules(files, (file, err) => {
+          console.error(`⚠️  Error loading rule file ${file}:`, err.message);
+        });
       }
     } catch (err) {
       console.error(`⚠️  Error scanning rules directory:`, (err as Error).message);
     }
 
+    // Compile patterns once so broken regexes are reported here, not mid-scan
+    this.program = RuleProgram.compile(rules, this.regexBackend, analyses);
+    for (const error of this.program.errors) {
+      console.error(`⚠️  Error compiling rule ${error.ruleId}:`, error.message);
+    }
+
+    return this.program.rules.map((compiled) => compiled.rule);
+  }
+
+  /**
+   * Validate every rule file and write the normalized rules, along with
+   * their pattern analysis, to a bundle in the rules directory. load() reads
+   * the bundle instead of the YAML files for as long as none of them change.
+   * Nothing is written if a rule file or pattern is invalid.
+   */
+  async compileBundle(): Promise<{ file: string; rules: number }> {
+    const files = await this.readRuleFiles(true);
+    const errors: string[] = [];
+    const rules = await this.collectRules(files, (file, err) => {
+      errors.push(`${file}: ${err.message}`);
+    });
+    // The native backend checks every pattern, whichever backend scans use
+    const program = RuleProgram.compile(rules, 'native');
+    for (const error of program.errors) {
+      errors.push(`${error.ruleId}: ${error.message}`);
+    }
+    if (errors.length > 0) {
+      throw new Error(`Invalid rules in ${this.rulesPath}:\n  ${errors.join('\n  ')}`);
+    }
+
+    const bundle: RuleBundle = {
+      format: BUNDLE_FORMAT,
+      fingerprint: this.fingerprint(files),
+      rules,
+      analyses: program.rules.map((compiled) => RuleProgram.analysis(compiled)),
+    };
+    const file = path.join(this.rulesPath, RULE_BUNDLE_FILE);
+    const temp = `${file}.${process.pid}.tmp`;
+    await fs.writeFile(temp, JSON.stringify(bundle));
+    await fs.rename(temp, file);
+    return { file, rules: rules.length };
+  }
+
+  /**
+   * Paths, sizes and modification times of the rule files, which change
+   * whenever load() would read something different
+   */
+  async signature(): Promise<string> {
+    const entries = await fg(RULE_FILES, {
+      cwd: this.rulesPath,
+      absolute: true,
+      onlyFiles: true,
+      stats: true,
+    });
+    return entries
+      .map(({ path: file, stats }) => `${file}\0${stats?.size}\0${stats?.mtimeMs}`)
+      .sort()
+      .join('\n');
+  }
+
+  /**
+   * Compiled program from the most recent load()
+   */
+  getProgram(): RuleProgram {
+    if (!this.program) {
+      throw new Error('Rules have not been loaded; call load() first');
+    }
+    return this.program;
+  }
+
+  /**
+   * Every rule file in the rules directory, in load order, with its content.
+   * Files are read a bounded number at a time and, when parse is set, each
+   * is parsed and validated while the files after it are being read.
+   */
+  private async readRuleFiles(parse: boolean): Promise<RuleFile[]> {
+    const paths = await fg(RULE_FILES, {
+      cwd: this.rulesPath,
+      absolute: true,
+      onlyFiles: true,
+    });
+    const parser = parse && paths.length > 0 ? await this.ruleParser() : null;
+    const files: RuleFile[] = new Array(paths.length);
+
+    const reads = mapBounded(paths, DEFAULT_FILE_CONCURRENCY, (file) =>
+      fs.readFile(file, 'utf-8').then(
+        (content): RuleFile => ({
+          file,
+          content,
+          hash: createHash('sha256').update(content).digest('hex'),
+        }),
+        (error): RuleFile => ({ file, error })
+      )
+    );
+    for await (const { index, result } of reads) {
+      files[index] = parser ? parser(result) : result;
+    }
+    return files;
+  }
+
+  /**
+   * The bundle, or null if there is none or it is in an older format
+   */
+  private async readBundle(): Promise<RuleBundle | null> {
+    let bundle: RuleBundle;
+    try {
+      bundle = JSON.parse(await fs.readFile(path.join(this.rulesPath, RULE_BUNDLE_FILE), 'utf-8'));
+    } catch {
+      return null;
+    }
+    return bundle.format === BUNDLE_FORMAT ? bundle : null;
+  }
+
+  private fingerprint(files: RuleFile[]): string {
+    const hash = createHash('sha256');
+    // Analyses made by another version of the check may classify patterns differently
+    hash.update(`safety-check ${SAFETY_CHECK_VERSION}\0`);
+    for (const { file, hash: content = '' } of files) {
+      hash.update(`${path.relative(this.rulesPath, file)}\0${content}\0`);
+    }
+    return hash.digest('hex');
+  }
+
+  /**
+   * Rules of every file in order, parsing those not parsed while being
+   * read and passing each file that fails to onError
+   */
+  private async collectRules(
+    files: RuleFile[],
+    onError: (file: string, err: Error) => void
+  ): Promise<Rule[]> {
+    const unparsed = files.some((file) => !file.rules && !file.error);
+    const parse = unparsed ? await this.ruleParser() : null;
+    const rules: Rule[] = [];
+
+    for (let file of files) {
+      if (parse && !file.rules && !file.error) {
+        file = parse(file);
+      }
+      if (file.error) {
+        onError(file.file, file.error);
+      } else {
+        rules.push(...(file.rules as Rule[]));
+      }
+    }
+
     return rules;
   }
 
-  private validateRule(rule: any, file: string): Rule {
-    // Basic validation
-    if (!rule.id || !rule.name || !rule.patterns) {
-      throw new Error(`Invalid rule in ${file}: missing required fields`);
+  /**
+   * Parser for rule files. YAML and the schema are only needed when there
+   * is no fresh bundle, so they are kept off the startup path.
+   */
+  private async ruleParser(): Promise<RuleParser> {
+    const [yaml, validate] = await Promise.all([import('js-yaml'), ruleValidator()]);
+
+    return (read) => {
+      if (read.error) {
+        return read;
+      }
+      const { file } = read;
+      try {
+        const parsed = yaml.load(read.content as string) as any;
+
+        // Handle both single rule and multiple rules in a file
+        let rules: Rule[];
+        if (Array.isArray(parsed)) {
+          rules = parsed.map((r) => this.validateRule(r, file, validate));
+        } else if (parsed?.rules && Array.isArray(parsed.rules)) {
+          rules = parsed.rules.map((r: any) => this.validateRule(r, file, validate));
+        } else {
+          rules = [this.validateRule(parsed, file, validate)];
+        }
+        return { ...read, rules };
+      } catch (err) {
+        return { ...read, error: err as Error };
+      }
+    };
+  }
+
+  private validateRule(rule: any, file: string, validate: SchemaValidator): Rule {
+    const errors = validate(rule);
+    if (errors.length > 0) {
+      const id = typeof rule?.id === 'string' ? ` ${rule.id}` : '';
+      throw new Error(`Invalid rule${id} in ${file}: ${errors.join('; ')}`);
     }
 
     // Convert patterns to Pattern[] format
@@ -90,8 +315,26 @@ export class RuleLoader {
       patterns,
       languages: Array.isArray(rule.languages) ? rule.languages : ['*'],
       enabled: rule.enabled !== false,
+      keywords: Array.isArray(rule.keywords) ? rule.keywords.map(String) : undefined,
+      regexBackend: rule.regexBackend,
       fix,
       metadata,
     };
   }
 }
+
+/**
+ * Validator compiled from the rule schema, read and compiled once per process
+ */
+function ruleValidator(): Promise<SchemaValidator> {
+  if (!validator) {
+    validator = fs
+      .readFile(RULE_SCHEMA_FILE, 'utf-8')
+      .then((schema) => compileSchema(JSON.parse(schema)));
+    // A failed read is retried by the next load rather than cached
+    validator.catch(() => {
+      validator = null;
+    });
+  }
+  return validator;
+}
@@ -0,0 +1,320 @@
+/**
+ * Compiled rule program
+ *
+ * Rules are compiled once, right after loading, and the resulting RegExp
+ * objects are shared by every file in a scan instead of being rebuilt per
+ * pattern, per rule, per file.
+ */
+
+import { Rule, Pattern, RegexBackend } from './types';
+import { LiteralPrefilter, extractRequiredLiterals, normalizeKeywords } from './literal-prefilter';
+import { checkPatternSafety } from './redos';
+import { RegexLike, compileLinearRegex } from './linear-regex';
+
+/**
+ * A pattern with its regular expression already constructed
+ */
+export interface CompiledPattern {
+  source: Pattern;
+  /** Backend that runs the pattern; 'linear' falls back to 'native' for unsupported syntax */
+  backend: RegexBackend;
+  /** Regex with the pattern's own flags, used to match a single line */
+  regex: RegexLike;
+  /**
+   * Regex used to match the whole file buffer. Single-line patterns get the
+   * m flag so ^ and $ keep anchoring at line boundaries.
+   */
+  bufferRegex: RegexLike;
+  /**
+   * Set for single-line patterns that only match like they do on a line on
+   * its own when run line by line, because they look around the match or
+   * anchor to the start or end of the line
+   */
+  lineOnly: boolean;
+  /**
+   * Set when static analysis could not rule out catastrophic backtracking;
+   * such patterns always run under the time budget.
+   */
+  suspicious: boolean;
+}
+
+/**
+ * A rule whose patterns have all been compiled
+ */
+export interface CompiledRule {
+  rule: Rule;
+  patterns: CompiledPattern[];
+  /**
+   * Lowercase literals, one of which must appear in a file for the rule to
+   * match it; null if the rule has to run on every file.
+   */
+  keywords: string[] | null;
+}
+
+/**
+ * Static analysis of a rule, which depends on nothing but the rule and the
+ * version of the checks, and can be stored with it for compiling to reuse
+ */
+export interface RuleAnalysis {
+  keywords: string[] | null;
+  /** For each pattern, whether it is suspicious on the native backend */
+  suspicious: boolean[];
+}
+
+/**
+ * A rule that failed to compile, reported by the loader
+ */
+export interface RuleCompileError {
+  ruleId: string;
+  message: string;
+}
+
+const LOOKAROUND = /^\(\?<?[=!]/;
+
+// Compiled rules are cached by rule identity so callers that only hold a
+// Rule (e.g. RegexAnalyzer.analyze) still reuse the loader's compilation.
+const compiledRules: Record<RegexBackend, WeakMap<Rule, CompiledRule>> = {
+  native: new WeakMap(),
+  linear: new WeakMap(),
+};
+
+/**
+ * Normalize pattern flags: matching always iterates with lastIndex, so the
+ * global flag is required and sticky matching is not supported.
+ */
+export function normalizeFlags(flags?: string): string {
+  const unique = new Set((flags || 'g').replace(/y/g, '').split(''));
+  unique.add('g');
+  return Array.from(unique).join('');
+}
+
+/**
+ * Compile a single pattern, throwing a descriptive error if it is invalid or
+ * prone to exponential backtracking. With the linear backend, patterns it
+ * supports cannot backtrack and skip the check; the rest fall back to RegExp.
+ * A stored result of the check can be passed as suspicious; it is used for
+ * patterns the check does not reject.
+ */
+export function compilePattern(
+  pattern: Pattern,
+  ruleId: string,
+  backend: RegexBackend = 'native',
+  suspicious?: boolean
+): CompiledPattern {
+  if (typeof pattern.regex !== 'string' || pattern.regex.length === 0) {
+    throw new Error(`Invalid pattern in rule ${ruleId}: regex must be a non-empty string`);
+  }
+
+  let compiled: CompiledPattern;
+  try {
+    const flags = normalizeFlags(pattern.flags);
+    const bufferFlags = pattern.multiline || flags.includes('m') ? flags : flags + 'm';
+    const regex = new RegExp(pattern.regex, flags);
+    const bufferRegex = new RegExp(pattern.regex, bufferFlags);
+    const lineOnly = !pattern.multiline && needsLineMatching(pattern.regex, flags);
+    compiled = {
+      source: pattern,
+      backend: 'native',
+      regex,
+      bufferRegex,
+      lineOnly,
+      suspicious: false,
+    };
+
+    if (backend === 'linear') {
+      const linear = compileLinearRegex(pattern.regex, flags);
+      if (linear) {
+        const linearBuffer = compileLinearRegex(pattern.regex, bufferFlags) as RegexLike;
+        return { ...compiled, backend: 'linear', regex: linear, bufferRegex: linearBuffer };
+      }
+    }
+  } catch (err) {
+    throw new Error(`Invalid pattern in rule ${ruleId}: ${(err as Error).message}`);
+  }
+
+  const report = checkPatternSafety(pattern.regex, pattern.flags);
+  if (report.safety === 'exponential') {
+    throw new Error(
+      `Unsafe pattern in rule ${ruleId}: ${report.reason} can cause catastrophic backtracking`
+    );
+  }
+  compiled.suspicious = suspicious ?? report.safety === 'suspicious';
+  return compiled;
+}
+
+/**
+ * Whether matching the file buffer could give different results than
+ * matching each line: lookaround would see the neighbouring lines, and
+ * without the pattern's own m flag, ^ and $ would also match next to a \r
+ * that stays part of the line when it is matched on its own.
+ */
+function needsLineMatching(source: string, flags: string): boolean {
+  const anchors = !flags.includes('m');
+  let inClass = false;
+
+  for (let i = 0; i < source.length; i++) {
+    const char = source[i];
+    if (char === '\\') {
+      i++;
+    } else if (inClass) {
+      inClass = char !== ']';
+    } else if (char === '[') {
+      inClass = true;
+    } else if ((char === '^' || char === '$') && anchors) {
+      return true;
+    } else if (char === '(' && LOOKAROUND.test(source.slice(i, i + 4))) {
+      return true;
+    }
+  }
+  return false;
+}
+
+/**
+ * Literals that gate a rule: its explicit keywords if given, otherwise the
+ * union of the literals required by each pattern.
+ */
+function ruleKeywords(rule: Rule): string[] | null {
+  if (rule.keywords && rule.keywords.length > 0) {
+    return normalizeKeywords(rule.keywords);
+  }
+
+  const keywords = new Set<string>();
+  for (const pattern of rule.patterns) {
+    const literals = extractRequiredLiterals(pattern.regex);
+    if (!literals) {
+      return null;
+    }
+    literals.forEach((literal) => keywords.add(literal));
+  }
+  return keywords.size > 0 ? Array.from(keywords) : null;
+}
+
+/**
+ * Compile a rule, reusing a previous compilation of the same rule object.
+ * The rule's own regexBackend takes precedence over the one passed in.
+ */
+export function compileRule(
+  rule: Rule,
+  backend: RegexBackend = 'native',
+  analysis?: RuleAnalysis
+): CompiledRule {
+  const effective = rule.regexBackend || backend;
+  const cache = compiledRules[effective];
+  const cached = cache.get(rule);
+  if (cached) {
+    return cached;
+  }
+
+  const compiled: CompiledRule = {
+    rule,
+    patterns: rule.patterns.map((pattern, index) =>
+      compilePattern(pattern, rule.id, effective, analysis?.suspicious[index])
+    ),
+    keywords: analysis ? analysis.keywords : ruleKeywords(rule),
+  };
+  cache.set(rule, compiled);
+  return compiled;
+}
+
+/**
+ * The set of compiled rules used for a scan
+ */
+export class RuleProgram {
+  readonly rules: CompiledRule[];
+  readonly errors: RuleCompileError[];
+  private prefilter: LiteralPrefilter<CompiledRule>;
+  /** Enabled rules by language; '*' rules are included in every entry */
+  private byLanguage = new Map<string, CompiledRule[]>();
+  private wildcardRules: CompiledRule[];
+  private positions?: Map<CompiledRule, number>;
+
+  private constructor(rules: CompiledRule[], errors: RuleCompileError[]) {
+    this.rules = rules;
+    this.errors = errors;
+    this.prefilter = new LiteralPrefilter(
+      rules.map((compiled) => ({ target: compiled, keywords: compiled.keywords }))
+    );
+
+    // Index enabled rules by language once instead of filtering per file
+    const enabled = rules.filter(({ rule }) => rule.enabled);
+    this.wildcardRules = enabled.filter(({ rule }) => rule.languages.includes('*'));
+    for (const compiled of enabled) {
+      for (const language of compiled.rule.languages) {
+        if (language !== '*' && !this.byLanguage.has(language)) {
+          const applicable = enabled.filter(({ rule }) => this.appliesTo(rule, language));
+          this.byLanguage.set(language, applicable);
+        }
+      }
+    }
+  }
+
+  /**
+   * Enabled rules that apply to a language, in program order
+   */
+  rulesForLanguage(language: string): CompiledRule[] {
+    return this.byLanguage.get(language) || this.wildcardRules;
+  }
+
+  /**
+   * Position of a compiled rule in the program, or -1. Rule ids are not
+   * guaranteed unique, so this is how rules are referred to across threads.
+   */
+  indexOf(compiled: CompiledRule): number {
+    if (!this.positions) {
+      this.positions = new Map(this.rules.map((rule, index) => [rule, index]));
+    }
+    return this.positions.get(compiled) ?? -1;
+  }
+
+  private appliesTo(rule: Rule, language: string): boolean {
+    return rule.languages.includes(language) || rule.languages.includes('*');
+  }
+
+  /**
+   * Narrow rules down to those that can possibly match content, using one
+   * literal-prefilter pass over the file.
+   */
+  selectRules(rules: CompiledRule[], content: string): CompiledRule[] {
+    const matched = this.prefilter.match(content);
+    return rules.filter((compiled) => compiled.keywords === null || matched.has(compiled));
+  }
+
+  /**
+   * Program restricted to the rules matching predicate, sharing their
+   * compilation with this one
+   */
+  select(predicate: (rule: Rule) => boolean): RuleProgram {
+    return new RuleProgram(this.rules.filter(({ rule }) => predicate(rule)), this.errors);
+  }
+
+  /**
+   * Analysis of a compiled rule in the form compile() accepts
+   */
+  static analysis({ keywords, patterns }: CompiledRule): RuleAnalysis {
+    return { keywords, suspicious: patterns.map((pattern) => pattern.suspicious) };
+  }
+
+  /**
+   * Compile every rule; rules with invalid patterns are collected as errors
+   * and left out of the program. analyses, if given, holds a stored
+   * analysis for the rule at the same position.
+   */
+  static compile(
+    rules: Rule[],
+    backend: RegexBackend = 'native',
+    analyses?: RuleAnalysis[]
+  ): RuleProgram {
+    const compiled: CompiledRule[] = [];
+    const errors: RuleCompileError[] = [];
+
+    for (const [index, rule] of rules.entries()) {
+      try {
+        compiled.push(compileRule(rule, backend, analyses?.[index]));
+      } catch (err) {
+        errors.push({ ruleId: rule.id, message: (err as Error).message });
+      }
+    }
+
+    return new RuleProgram(compiled, errors);
+  }
+}
@@ -0,0 +1,43 @@
+/**
+ * Scan results assembled from scan events
+ *
+ * Kept apart from the engine so callers that receive events from elsewhere,
+ * such as the scan daemon client, do not load the scanner to use it.
+ */
+
+import { Finding, ScanEvent, ScanResult } from './types';
+
+type ScanComplete = Extract<ScanEvent, { type: 'complete' }>;
+
+/**
+ * Full result of a scan from its events
+ */
+export async function collectScanResult(events: AsyncIterable<ScanEvent>): Promise<ScanResult> {
+  // Findings are slotted by file so the output order does not depend on timing
+  const results: Finding[][] = [];
+  let complete: ScanComplete | undefined;
+
+  for await (const event of events) {
+    if (event.type === 'file') {
+      results[event.index] = event.findings;
+    } else if (event.type === 'complete') {
+      complete = event;
+    }
+  }
+
+  const findings: Finding[] = [];
+  results.forEach((fileFindings) => findings.push(...fileFindings));
+
+  const { scan, summary, diagnostics } = complete as ScanComplete;
+  const result: ScanResult = {
+    version: '0.1.0',
+    scan,
+    summary,
+    findings,
+  };
+  if (diagnostics.length > 0) {
+    result.diagnostics = diagnostics;
+  }
+
+  return result;
+}
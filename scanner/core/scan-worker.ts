@@ -0,0 +1,61 @@
+/**
+ * Entry point of a scan worker thread, started by scanInWorkers
+ *
+ * Rules are loaded and compiled once when the worker starts; every batch of
+ * files is then scanned with the same program.
+ */
+
+import { parentPort, workerData } from 'worker_threads';
+import { Scanner } from './engine';
+import { Finding } from './types';
+import { RuleProgram } from './rule-program';
+import { CompactFinding, RegexFinding } from '../analyzers/regex-finding';
+import {
+  WorkerBatchRequest,
+  WorkerBatchResponse,
+  WorkerData,
+  WorkerFileResult,
+} from './worker-pool';
+
+const { options } = workerData as WorkerData;
+const scanner = new Scanner(options);
+const loaded = scanner.loadRules();
+// Programs restricted to a subset of the rules, by the positions requested
+const subsets = new Map<string, RuleProgram>();
+
+function toCompact(finding: Finding, program: RuleProgram): CompactFinding {
+  if (!(finding instanceof RegexFinding)) {
+    throw new Error(`Finding for rule ${finding.rule} cannot be sent to the main thread`);
+  }
+  return finding.toCompact(program);
+}
+
+/**
+ * The rules at the given positions in program, or all of them
+ */
+function selectRules(program: RuleProgram, positions?: number[]): RuleProgram {
+  if (!positions) {
+    return program;
+  }
+  const key = positions.join(',');
+  let subset = subsets.get(key);
+  if (!subset) {
+    const wanted = new Set(positions.map((position) => program.rules[position].rule));
+    subset = program.select((rule) => wanted.has(rule));
+    subsets.set(key, subset);
+  }
+  return subset;
+}
+
+parentPort?.on('message', async ({ files, rules }: WorkerBatchRequest) => {
+  const program = await loaded;
+  const results: WorkerFileResult[] = [];
+  for await (const result of scanner.scanFiles(files, selectRules(program, rules))) {
+    results.push({
+      ...result,
+      findings: result.findings.map((finding) => toCompact(finding, program)),
+    });
+  }
+  const response: WorkerBatchResponse = { results };
+  parentPort?.postMessage(response);
+});
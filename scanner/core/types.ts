@@ -80,9 +80,17 @@ export interface Finding {
 export interface Pattern {
   regex: string;
   flags?: string;
-  multiline?: boolean;
+  multiline?: boolean; // Allow matches to span line breaks
 }
 
+/**
+ * Regex implementation used to run rule patterns:
+ * - native: V8 RegExp (default)
+ * - linear: in-repo Thompson-NFA matcher with linear-time worst case; falls
+ *   back to native for syntax it does not support (backreferences, lookaround)
+ */
+export type RegexBackend = 'native' | 'linear';
+
 /**
  * Detection rule definition
  */
@@ -95,6 +103,8 @@ export interface Rule {
   patterns: Pattern[];
   languages: string[];
   enabled: boolean;
+  keywords?: string[]; // Literals required for a match; skip files without any of them
+  regexBackend?: RegexBackend; // Overrides ScanOptions.regexBackend for this rule
   fix?: {
     template: string;
     references: string[];
@@ -141,8 +151,44 @@ export interface ScanResult {
   scan: ScanMetadata;
   summary: ScanSummary;
   findings: Finding[];
+  diagnostics?: ScanDiagnostic[]; // Present only when something went wrong
 }
 
+/**
+ * Non-fatal problem encountered while scanning
+ */
+export interface ScanDiagnostic {
+  type: 'rule-error' | 'rule-timeout';
+  rule: string;
+  file?: string;
+  message: string;
+}
+
+/**
+ * Findings for one file, produced as soon as the file has been scanned
+ */
+export interface FileScanResult {
+  file: string;
+  index: number; // Position of the file in the scan's file list
+  findings: Finding[];
+  diagnostics: ScanDiagnostic[];
+  scanned: boolean; // false if the file could not be read
+}
+
+/**
+ * Event yielded by Scanner.scanStream: a start event, one file event per
+ * file in completion order, then a complete event with the totals
+ */
+export type ScanEvent =
+  | { type: 'start'; files: number; rules: number }
+  | ({ type: 'file' } & FileScanResult)
+  | {
+      type: 'complete';
+      scan: ScanMetadata;
+      summary: ScanSummary;
+      diagnostics: ScanDiagnostic[];
+    };
+
 /**
  * Scanner configuration options
  */
@@ -151,10 +197,18 @@ export interface ScanOptions {
   exclude?: string[];
   include?: string[];
   severity?: Severity;
-  format?: 'text' | 'json' | 'sarif';
+  ruleIds?: string[]; // Only run these rules (default: all)
+  format?: 'text' | 'json' | 'ndjson' | 'sarif';
   output?: string;
   rulesPath?: string;
   parallel?: boolean;
+  concurrency?: number; // Files read and matched at once in parallel mode (default: 16)
+  workers?: number; // Worker threads scanning batches of files (default: 1, scan in-process)
+  cache?: boolean; // Replay findings for files unchanged since a cached scan (default: false)
+  cacheDir?: string; // Result cache location (default: performance.cacheDir in .vibesec.yaml)
+  engine?: 'regex' | 'combined'; // Rule-by-rule matching (default) or one combined regex per language
   maxFileSize?: number; // bytes
+  patternTimeout?: number; // ms each pattern may spend on one file (0 disables)
+  regexBackend?: RegexBackend; // Regex implementation for rule patterns (default: native)
   quiet?: boolean; // Suppress progress messages
 }
@@ -0,0 +1,339 @@
+/**
+ * Watch mode
+ *
+ * Rules are loaded and compiled once, every file is scanned once, and the
+ * findings are kept in memory per file. After that only the files reported
+ * by file system events are matched again. Events are debounced: a burst of
+ * saves, a checkout or a formatter run is coalesced into one rescan, and
+ * each rescan reports what changed relative to the findings before it.
+ *
+ * Directories are watched recursively where the platform supports it
+ * (Linux only from Node 20); elsewhere every directory gets its own watcher.
+ */
+
+import * as fs from 'fs';
+import * as path from 'path';
+import { Finding, ScanDiagnostic, ScanOptions, ScanSummary } from './types';
+import { DEFAULT_EXCLUDE, DEFAULT_INCLUDE, Scanner, addToSummary, createSummary } from './engine';
+import { RuleProgram } from './rule-program';
+
+/** Milliseconds without events before changed files are rescanned */
+export const DEFAULT_DEBOUNCE = 100;
+
+export interface WatchOptions {
+  debounce?: number;
+  /**
+   * Watch the tree with one recursive watcher (default), falling back to a
+   * watcher per directory where that is unsupported; false always uses a
+   * watcher per directory
+   */
+  recursive?: boolean;
+}
+
+/**
+ * Changes in findings since the previous delta. The first delta reports
+ * every finding of the initial scan as added.
+ */
+export interface WatchDelta {
+  /** Files that were scanned again or removed */
+  files: string[];
+  added: Finding[];
+  fixed: Finding[];
+  /** Totals over every watched file after the change */
+  summary: ScanSummary;
+  diagnostics: ScanDiagnostic[];
+}
+
+export class ScanWatcher {
+  private scanner: Scanner;
+  private root: string;
+  private debounce: number;
+  private program?: RuleProgram;
+  private results = new Map<string, Finding[]>();
+  private watchers = new Map<string, fs.FSWatcher>();
+  private recursive: boolean;
+  // Paths reported since the last rescan, and whether the debounce has passed
+  private changed = new Set<string>();
+  private due = false;
+  private timer?: NodeJS.Timeout;
+  private wake?: () => void;
+  private error?: Error;
+  private closed = false;
+  // Directories every event under which is ignored, from **/<name>/** excludes
+  private excludedDirs: Set<string>;
+  // Extensions a new file needs to be scanned, or null if include is not that simple
+  private extensions: Set<string> | null;
+
+  constructor(options: ScanOptions, watchOptions: WatchOptions = {}) {
+    this.scanner = new Scanner(options);
+    this.root = path.resolve(options.path);
+    this.debounce = watchOptions.debounce ?? DEFAULT_DEBOUNCE;
+    this.recursive = watchOptions.recursive !== false;
+
+    const names = (options.exclude || DEFAULT_EXCLUDE).map(
+      (pattern) => /^\*\*\/([^*?{}[\]/]+)\/\*\*$/.exec(pattern)?.[1]
+    );
+    this.excludedDirs = new Set(names.filter((name): name is string => name !== undefined));
+
+    const extensions = (options.include || DEFAULT_INCLUDE).map(
+      (pattern) => /^\*\*\/\*(\.[\w-]+)$/.exec(pattern)?.[1]
+    );
+    this.extensions = extensions.every((extension) => extension !== undefined)
+      ? new Set(extensions as string[])
+      : null;
+  }
+
+  /**
+   * Scan every file, then keep yielding a delta per batch of changes until
+   * close is called
+   */
+  async *deltas(): AsyncGenerator<WatchDelta> {
+    this.program = await this.scanner.loadRules();
+    const files = await this.scanner.findFiles();
+    await this.watch((await fs.promises.stat(this.root)).isFile());
+    try {
+      yield this.rescan(files, []);
+      yield* this.changes();
+    } finally {
+      this.close();
+    }
+  }
+
+  /**
+   * Stop watching; a pending deltas() call returns
+   */
+  close(): void {
+    this.closed = true;
+    clearTimeout(this.timer);
+    this.watchers.forEach((watcher) => watcher.close());
+    this.watchers.clear();
+    this.wake?.();
+  }
+
+  private async *changes(): AsyncGenerator<WatchDelta> {
+    while (!this.closed) {
+      if (!this.due && !this.error) {
+        await new Promise<void>((resolve) => (this.wake = resolve));
+      }
+      this.wake = undefined;
+      if (this.error) {
+        throw this.error;
+      }
+      if (this.closed) {
+        break;
+      }
+
+      // Events arriving during the rescan are kept for the next one
+      const changed = Array.from(this.changed);
+      this.changed.clear();
+      this.due = false;
+      const { rescan, removed } = await this.classify(changed);
+      if (rescan.length > 0 || removed.length > 0) {
+        yield this.rescan(rescan, removed);
+      }
+    }
+  }
+
+  private async watch(rootIsFile: boolean): Promise<void> {
+    if (rootIsFile) {
+      this.addWatcher(this.root, { file: true });
+      return;
+    }
+    if (this.recursive) {
+      try {
+        this.addWatcher(this.root, { recursive: true });
+        return;
+      } catch (error) {
+        if ((error as NodeJS.ErrnoException).code !== 'ERR_FEATURE_UNAVAILABLE_ON_PLATFORM') {
+          throw error;
+        }
+        this.recursive = false;
+      }
+    }
+    await this.watchTree(this.root);
+  }
+
+  /**
+   * Watch dir and every directory below it that is not excluded, each with
+   * its own watcher
+   */
+  private async watchTree(dir: string): Promise<void> {
+    if (this.closed || this.watchers.has(dir) || this.isExcluded(dir)) {
+      return;
+    }
+    try {
+      this.addWatcher(dir);
+      const entries = await fs.promises.readdir(dir, { withFileTypes: true });
+      for (const entry of entries) {
+        if (entry.isDirectory()) {
+          await this.watchTree(path.join(dir, entry.name));
+        }
+      }
+    } catch (error) {
+      // Removed before it could be watched; classify() handles the removal
+      if ((error as NodeJS.ErrnoException).code !== 'ENOENT' || dir === this.root) {
+        throw error;
+      }
+    }
+  }
+
+  private addWatcher(target: string, options: { recursive?: boolean; file?: boolean } = {}): void {
+    const watcher = fs.watch(target, { recursive: options.recursive }, (_event, filename) => {
+      const file = options.file ? target : filename && path.resolve(target, filename.toString());
+      if (file && !this.isExcluded(file)) {
+        this.onChange(file);
+      }
+    });
+    watcher.on('error', (error) => {
+      if (target === this.root) {
+        this.error = error;
+        this.wake?.();
+      } else {
+        // A watched subdirectory went away
+        watcher.close();
+        this.watchers.delete(target);
+      }
+    });
+    this.watchers.set(target, watcher);
+  }
+
+  private onChange(file: string): void {
+    this.changed.add(file);
+    if (!this.recursive) {
+      this.updateWatchers(file).catch((error) => {
+        this.error = error;
+        this.wake?.();
+      });
+    }
+    clearTimeout(this.timer);
+    this.timer = setTimeout(() => {
+      this.due = true;
+      this.wake?.();
+    }, this.debounce);
+  }
+
+  /**
+   * With a watcher per directory, watch directories created since watching
+   * started and stop watching removed ones
+   */
+  private async updateWatchers(file: string): Promise<void> {
+    const stat = await fs.promises.stat(file).catch(() => null);
+    if (stat?.isDirectory()) {
+      await this.watchTree(file);
+    } else if (!stat) {
+      for (const [dir, watcher] of this.watchers) {
+        if (dir === file || dir.startsWith(file + path.sep)) {
+          watcher.close();
+          this.watchers.delete(dir);
+        }
+      }
+    }
+  }
+
+  /**
+   * Sort changed paths into files to scan again and files that are gone.
+   * Other paths that could add or remove files to scan, such as a new
+   * source file or a deleted directory, have the file list refreshed once.
+   */
+  private async classify(changed: string[]): Promise<{ rescan: string[]; removed: string[] }> {
+    const rescan: string[] = [];
+    const removed: string[] = [];
+    let refresh = false;
+
+    for (const file of changed) {
+      const stat = await fs.promises.stat(file).catch(() => null);
+      if (this.results.has(file)) {
+        (stat ? rescan : removed).push(file);
+      } else if (stat ? stat.isDirectory() || this.mayInclude(file) : this.isKnownDir(file)) {
+        refresh = true;
+      }
+    }
+
+    if (refresh) {
+      const files = new Set(await this.scanner.findFiles());
+      for (const file of files) {
+        if (!this.results.has(file)) {
+          rescan.push(file);
+        }
+      }
+      for (const file of this.results.keys()) {
+        if (!files.has(file) && !removed.includes(file)) {
+          removed.push(file);
+        }
+      }
+    }
+
+    return { rescan, removed };
+  }
+
+  private async rescan(files: string[], removed: string[]): Promise<WatchDelta> {
+    const before: Finding[] = [];
+    const after: Finding[] = [];
+    const diagnostics: ScanDiagnostic[] = [];
+
+    for (const file of removed) {
+      before.push(...(this.results.get(file) || []));
+      this.results.delete(file);
+    }
+    const results = this.scanner.collectResults(files, this.program as RuleProgram);
+    for await (const result of results) {
+      before.push(...(this.results.get(result.file) || []));
+      after.push(...result.findings);
+      diagnostics.push(...result.diagnostics);
+      this.results.set(result.file, result.findings);
+    }
+
+    const summary = createSummary();
+    for (const findings of this.results.values()) {
+      addToSummary(summary, findings);
+    }
+    return {
+      files: [...files, ...removed],
+      added: difference(after, before),
+      fixed: difference(before, after),
+      summary,
+      diagnostics,
+    };
+  }
+
+  private isExcluded(file: string): boolean {
+    return path
+      .relative(this.root, file)
+      .split(path.sep)
+      .some((segment) => this.excludedDirs.has(segment));
+  }
+
+  private mayInclude(file: string): boolean {
+    return !this.extensions || this.extensions.has(path.extname(file));
+  }
+
+  private isKnownDir(dir: string): boolean {
+    const prefix = dir + path.sep;
+    for (const file of this.results.keys()) {
+      if (file.startsWith(prefix)) {
+        return true;
+      }
+    }
+    return false;
+  }
+}
+
+/**
+ * Findings in a without a counterpart in b. Findings are matched by rule,
+ * file and the text of the flagged line rather than by position, so code
+ * moving up or down the file does not show up as a fix and a new finding.
+ */
+function difference(a: Finding[], b: Finding[]): Finding[] {
+  const key = (finding: Finding): string =>
+    `${finding.rule}\0${finding.location.file}\0${finding.fix.before}`;
+
+  const remaining = new Map<string, number>();
+  for (const finding of b) {
+    remaining.set(key(finding), (remaining.get(key(finding)) || 0) + 1);
+  }
+  return a.filter((finding) => {
+    const count = remaining.get(key(finding)) || 0;
+    remaining.set(key(finding), count - 1);
+    return count <= 0;
+  });
+}
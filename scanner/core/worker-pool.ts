@@ -0,0 +1,154 @@
+/**
+ * Worker-thread scanning
+ *
+ * Matching is synchronous CPU work, so a single scanner only ever uses one
+ * core. With more than one worker, a pool of worker_threads each loads and
+ * compiles the rules once, then takes batches of file paths as they free up.
+ * Findings come back in compact form and are rebuilt against the main
+ * thread's own compilation of the same rules.
+ */
+
+import * as path from 'path';
+import { Worker } from 'worker_threads';
+import { ScanOptions, FileScanResult, ScanDiagnostic } from './types';
+import { RuleProgram } from './rule-program';
+import { mapBounded } from './pipeline';
+import { CompactFinding, RegexFinding } from '../analyzers/regex-finding';
+
+/** Most files sent to a worker at once */
+export const DEFAULT_WORKER_BATCH_SIZE = 64;
+
+export interface WorkerBatchRequest {
+  files: string[];
+  /** Program positions of the rules to run, if not all of them */
+  rules?: number[];
+}
+
+/** FileScanResult with compact findings, as sent back by a worker */
+export interface WorkerFileResult {
+  file: string;
+  index: number; // Position of the file in its batch
+  findings: CompactFinding[];
+  diagnostics: ScanDiagnostic[];
+  scanned: boolean;
+}
+
+export interface WorkerBatchResponse {
+  results: WorkerFileResult[];
+}
+
+export interface WorkerData {
+  options: ScanOptions;
+}
+
+// Run the worker from the same kind of file as this module (.ts from source, .js once built)
+const WORKER_SCRIPT = path.join(__dirname, `scan-worker${path.extname(__filename)}`);
+
+/**
+ * Split files into batches small enough that every worker gets several,
+ * so a slow batch does not leave the other workers idle at the end
+ */
+export function createBatches(files: string[], workers: number): string[][] {
+  const size = Math.max(
+    1,
+    Math.min(DEFAULT_WORKER_BATCH_SIZE, Math.ceil(files.length / (workers * 4)))
+  );
+  const batches: string[][] = [];
+  for (let i = 0; i < files.length; i += size) {
+    batches.push(files.slice(i, i + size));
+  }
+  return batches;
+}
+
+/**
+ * Send one batch to a worker and wait for its results. A worker exiting
+ * because the pool is being shut down (stopping() is true) ends the batch
+ * without results instead of failing it.
+ */
+function runBatch(
+  worker: Worker,
+  request: WorkerBatchRequest,
+  stopping: () => boolean
+): Promise<WorkerBatchResponse> {
+  return new Promise((resolve, reject) => {
+    const onMessage = (response: WorkerBatchResponse): void => {
+      cleanup();
+      resolve(response);
+    };
+    const onError = (error: Error): void => {
+      cleanup();
+      reject(error);
+    };
+    const onExit = (code: number): void => {
+      cleanup();
+      if (stopping()) {
+        resolve({ results: [] });
+      } else {
+        reject(new Error(`Scan worker exited with code ${code}`));
+      }
+    };
+    const cleanup = (): void => {
+      worker.off('message', onMessage);
+      worker.off('error', onError);
+      worker.off('exit', onExit);
+    };
+
+    worker.on('message', onMessage);
+    worker.on('error', onError);
+    worker.on('exit', onExit);
+    worker.postMessage(request);
+  });
+}
+
+/**
+ * Scan files across a pool of worker threads, yielding each file's results
+ * as its batch completes. Findings are rebuilt against the main thread's
+ * program, and file indexes refer to the full file list. rules restricts the
+ * scan to the rules at those positions in the program.
+ */
+export async function* scanInWorkers(
+  options: ScanOptions,
+  files: string[],
+  workers: number,
+  program: RuleProgram,
+  rules?: number[]
+): AsyncGenerator<FileScanResult> {
+  const batches = createBatches(files, workers);
+  if (batches.length === 0) {
+    return;
+  }
+
+  const workerData: WorkerData = { options: { ...options, workers: 1, quiet: true } };
+  const pool = Array.from(
+    { length: Math.min(workers, batches.length) },
+    () => new Worker(WORKER_SCRIPT, { workerData })
+  );
+  // mapBounded never runs more batches than there are workers, so one is
+  // always idle when a batch starts
+  const idle = [...pool];
+  const batchSize = batches[0].length;
+  let stopping = false;
+
+  try {
+    const pipeline = mapBounded(batches, pool.length, async (batch) => {
+      const worker = idle.pop() as Worker;
+      try {
+        return await runBatch(worker, { files: batch, rules }, () => stopping);
+      } finally {
+        idle.push(worker);
+      }
+    });
+
+    for await (const { index, result } of pipeline) {
+      for (const fileResult of result.results) {
+        const findings = fileResult.findings.map((compact) =>
+          RegexFinding.fromCompact(program, compact)
+        );
+        yield { ...fileResult, index: index * batchSize + fileResult.index, findings };
+      }
+    }
+  } finally {
+    stopping = true;
+    await Promise.all(pool.map((worker) => worker.terminate()));
+  }
+}
@@ -29,9 +29,11 @@ async function main() {
     console.log('This may take 2-5 minutes depending on your hardware.\n');
 
     const reports = await suite.runAll();
+    const scaling = await suite.runScaling();
+    const startup = await suite.runStartup();
 
     // Generate text report
-    const reportText = BenchmarkSuite.generateReport(reports);
+    const reportText = BenchmarkSuite.generateReport(reports, scaling, startup);
     console.log('\n' + reportText);
 
     // Save reports
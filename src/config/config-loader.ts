@@ -87,10 +87,10 @@ export class ConfigLoader {
     return config;
   }
 
-  async loadConfig(configPath?: string): Promise<VibeSecConfig> {
+  async loadConfig(configPath?: string, cwd: string = process.cwd()): Promise<VibeSecConfig> {
     const searchPaths = configPath
-      ? [resolve(configPath)]
-      : [resolve(process.cwd(), '.vibesec.yaml'), resolve(process.cwd(), '.vibesec.yml')];
+      ? [resolve(cwd, configPath)]
+      : [resolve(cwd, '.vibesec.yaml'), resolve(cwd, '.vibesec.yml')];
 
     for (const path of searchPaths) {
       try {
@@ -0,0 +1,150 @@
+/**
+ * Scan daemon client
+ *
+ * Used by the CLI to hand scans to a running daemon. When none is running
+ * every function here returns null straight away, so callers fall back to
+ * scanning in-process.
+ */
+
+import * as fs from 'fs';
+import * as net from 'net';
+import { createInterface } from 'readline';
+import { ScanEvent, ScanOptions } from '../../scanner/core/types';
+import {
+  DaemonRequest,
+  DaemonResponse,
+  DaemonStatus,
+  PROTOCOL_VERSION,
+  socketPath,
+} from './protocol';
+
+/**
+ * Run a scan in the daemon, yielding the same events Scanner.scanStream()
+ * would. Returns null if no daemon is running or it speaks a different
+ * protocol version; errors raised by the scan itself are thrown from the
+ * events.
+ */
+export async function scanWithDaemon(
+  options: ScanOptions,
+  socket?: string
+): Promise<AsyncGenerator<ScanEvent> | null> {
+  const connection = await connect(socket);
+  if (!connection) {
+    return null;
+  }
+
+  const request: DaemonRequest = {
+    type: 'scan',
+    version: PROTOCOL_VERSION,
+    cwd: process.cwd(),
+    options,
+  };
+  const responses = exchange(connection, request);
+  // Wait for the first response so a daemon that cannot serve the scan
+  // is known about before anything has been written
+  const first = await responses.next().catch(() => null);
+  if (!first || first.done || (first.value.type === 'error' && first.value.code === 'version')) {
+    await responses.return(undefined);
+    return null;
+  }
+  return scanEvents(first.value, responses);
+}
+
+/**
+ * Status of the running daemon, or null if there is none
+ */
+export async function daemonStatus(socket?: string): Promise<DaemonStatus | null> {
+  return statusReply(await connect(socket), { type: 'status' });
+}
+
+/**
+ * Ask the running daemon to exit once its scans in progress finish,
+ * returning its last status, or null if there is none
+ */
+export async function stopDaemon(socket?: string): Promise<DaemonStatus | null> {
+  return statusReply(await connect(socket), { type: 'shutdown' });
+}
+
+async function statusReply(
+  connection: net.Socket | null,
+  request: DaemonRequest
+): Promise<DaemonStatus | null> {
+  if (!connection) {
+    return null;
+  }
+  for await (const response of exchange(connection, request)) {
+    if (response.type === 'status') {
+      const { type: _type, ...status } = response;
+      return status;
+    }
+  }
+  return null;
+}
+
+async function* scanEvents(
+  first: DaemonResponse,
+  responses: AsyncGenerator<DaemonResponse>
+): AsyncGenerator<ScanEvent> {
+  try {
+    let response: DaemonResponse | undefined = first;
+    while (response) {
+      if (response.type === 'error') {
+        throw new Error(response.message);
+      }
+      if (response.type === 'status') {
+        throw new Error('Unexpected status response from the scan daemon');
+      }
+      yield response;
+      if (response.type === 'complete') {
+        return;
+      }
+      const next = await responses.next();
+      response = next.done ? undefined : next.value;
+    }
+    throw new Error('Scan daemon closed the connection before the scan completed');
+  } finally {
+    await responses.return(undefined);
+  }
+}
+
+/**
+ * Send a request and yield each line of the reply
+ */
+async function* exchange(
+  connection: net.Socket,
+  request: DaemonRequest
+): AsyncGenerator<DaemonResponse> {
+  try {
+    connection.write(JSON.stringify(request) + '\n');
+    const lines = createInterface({ input: connection, crlfDelay: Infinity });
+    for await (const line of lines) {
+      yield JSON.parse(line) as DaemonResponse;
+    }
+  } finally {
+    connection.destroy();
+  }
+}
+
+/**
+ * Connection to the daemon, or null if none is listening. Outside Windows
+ * the socket must belong to this user, so scans are never sent to a
+ * daemon someone else started.
+ */
+async function connect(socket: string = socketPath()): Promise<net.Socket | null> {
+  if (process.platform !== 'win32') {
+    const stat = await fs.promises.stat(socket).catch(() => null);
+    if (!stat || !stat.isSocket() || stat.uid !== process.getuid?.()) {
+      return null;
+    }
+  }
+
+  return new Promise((resolve) => {
+    const connection = net.connect(socket);
+    const onError = (): void => resolve(null);
+    connection.once('error', onError);
+    connection.once('connect', () => {
+      connection.off('error', onError);
+      resolve(connection);
+    });
+  });
+}
@@ -0,0 +1,61 @@
+/**
+ * Scan daemon protocol
+ *
+ * A client connects to the daemon's socket and writes one request as a line
+ * of JSON. A scan is answered with the scan's events, one per line, ending
+ * with its complete event; an error ends the stream with an error message.
+ */
+
+import * as os from 'os';
+import * as path from 'path';
+import { ScanEvent, ScanOptions } from '../../scanner/core/types';
+
+/** Bump when requests or responses change shape */
+export const PROTOCOL_VERSION = 1;
+
+/** Overrides the socket path for the daemon and its clients */
+export const SOCKET_ENV = 'VIBESEC_DAEMON_SOCKET';
+
+export type DaemonRequest =
+  | {
+      type: 'scan';
+      version: number;
+      /** Directory relative paths in options are resolved against */
+      cwd: string;
+      options: ScanOptions;
+    }
+  | { type: 'status' }
+  | { type: 'shutdown' };
+
+export interface DaemonStatus {
+  pid: number;
+  version: number;
+  /** Seconds since the daemon started */
+  uptime: number;
+  scans: number;
+  /** Rule sets currently loaded */
+  programs: number;
+}
+
+export type DaemonResponse =
+  | ScanEvent
+  | ({ type: 'status' } & DaemonStatus)
+  | { type: 'error'; message: string; code?: 'version' | 'request' };
+
+/**
+ * Socket the daemon listens on: a named pipe on Windows, otherwise a file in
+ * the user's runtime directory or, failing that, a per-user name in the
+ * temporary directory
+ */
+export function socketPath(): string {
+  if (process.env[SOCKET_ENV]) {
+    return process.env[SOCKET_ENV] as string;
+  }
+  if (process.platform === 'win32') {
+    return `\\\\.\\pipe\\vibesec-${os.userInfo().username}`;
+  }
+  if (process.env.XDG_RUNTIME_DIR) {
+    return path.join(process.env.XDG_RUNTIME_DIR, 'vibesec.sock');
+  }
+  return path.join(os.tmpdir(), `vibesec-${process.getuid?.() ?? os.userInfo().username}.sock`);
+}
@@ -0,0 +1,237 @@
+/**
+ * Scan daemon
+ *
+ * A long-running process that answers scan requests over a local socket.
+ * Rules are loaded and compiled once per rule directory, regex backend and
+ * filter, and the same compiled program, with its optimized regexes, serves
+ * every later scan until one of its rule files changes. Each request only
+ * pays for finding, reading and matching files, without process startup,
+ * module loading or rule parsing.
+ */
+
+import * as fs from 'fs';
+import * as net from 'net';
+import * as path from 'path';
+import { createInterface } from 'readline';
+import { ScanOptions } from '../../scanner/core/types';
+import { Scanner } from '../../scanner/core/engine';
+import { RuleLoader } from '../../scanner/core/rule-loader';
+import { RuleProgram } from '../../scanner/core/rule-program';
+import { DEFAULT_CACHE_DIR } from '../../scanner/core/result-cache';
+import { writeChunk } from '../../reporters/write-stream';
+import { ConfigLoader } from '../config/config-loader';
+import {
+  DaemonRequest,
+  DaemonResponse,
+  DaemonStatus,
+  PROTOCOL_VERSION,
+  socketPath,
+} from './protocol';
+
+export interface DaemonOptions {
+  /** Socket to listen on (default: socketPath()) */
+  socket?: string;
+}
+
+interface LoadedRules {
+  /** RuleLoader.signature() of the rule files when they were loaded */
+  signature: string;
+  program: Promise<RuleProgram>;
+}
+
+export class ScanDaemon {
+  readonly socket: string;
+  private server?: net.Server;
+  private closing?: Promise<void>;
+  private programs = new Map<string, LoadedRules>();
+  private started = Date.now();
+  private scans = 0;
+
+  constructor(options: DaemonOptions = {}) {
+    this.socket = options.socket || socketPath();
+  }
+
+  /**
+   * Start accepting requests. A socket left behind by a daemon that has
+   * exited is replaced; fails if another daemon is listening.
+   */
+  async listen(): Promise<void> {
+    if (await isListening(this.socket)) {
+      throw new Error(`A scan daemon is already listening on ${this.socket}`);
+    }
+
+    const server = net.createServer((socket) => this.accept(socket));
+    if (process.platform === 'win32') {
+      await listenOn(server, this.socket);
+    } else {
+      await fs.promises.rm(this.socket, { force: true });
+      // Created owner-only, since whoever connects can read any file this user can
+      const umask = process.umask(0o177);
+      try {
+        await listenOn(server, this.socket);
+      } finally {
+        process.umask(umask);
+      }
+    }
+    this.server = server;
+  }
+
+  /**
+   * Stop accepting requests and wait for scans in progress to finish
+   */
+  close(): Promise<void> {
+    if (!this.closing) {
+      const server = this.server;
+      this.closing = server
+        ? new Promise((resolve) => server.close(() => resolve()))
+        : Promise.resolve();
+    }
+    return this.closing;
+  }
+
+  /**
+   * Resolves once the daemon has closed, whether by close() or a shutdown
+   * request
+   */
+  async closed(): Promise<void> {
+    if (this.server?.listening) {
+      await new Promise((resolve) => this.server?.once('close', resolve));
+    }
+  }
+
+  status(): DaemonStatus {
+    return {
+      pid: process.pid,
+      version: PROTOCOL_VERSION,
+      uptime: Math.round((Date.now() - this.started) / 1000),
+      scans: this.scans,
+      programs: this.programs.size,
+    };
+  }
+
+  private async accept(socket: net.Socket): Promise<void> {
+    // A client going away mid-scan ends the scan at its next write
+    socket.on('error', () => socket.destroy());
+
+    try {
+      const request = await readRequest(socket);
+      if (request?.type === 'scan') {
+        await this.scan(request, socket);
+      } else if (request?.type === 'status') {
+        await send(socket, { type: 'status', ...this.status() });
+      } else if (request?.type === 'shutdown') {
+        await send(socket, { type: 'status', ...this.status() });
+        this.close();
+      } else if (request) {
+        await send(socket, { type: 'error', code: 'request', message: 'Unknown request' });
+      }
+    } catch (error) {
+      await send(socket, { type: 'error', message: (error as Error).message }).catch(() => {});
+    }
+    socket.end();
+  }
+
+  private async scan(
+    request: Extract<DaemonRequest, { type: 'scan' }>,
+    socket: net.Socket
+  ): Promise<void> {
+    if (request.version !== PROTOCOL_VERSION) {
+      const message = `Scan daemon speaks protocol ${PROTOCOL_VERSION}, not ${request.version}`;
+      await send(socket, { type: 'error', code: 'version', message });
+      return;
+    }
+
+    const options = await resolveOptions(request.options, request.cwd);
+    const scanner = new Scanner(options);
+    const program = await this.rules(scanner, options);
+    this.scans++;
+    for await (const event of scanner.scanStream(program)) {
+      if (event.type === 'complete') {
+        // Reported as the client named it, as an in-process scan would
+        event.scan.path = request.options.path;
+      }
+      await send(socket, event);
+    }
+  }
+
+  /**
+   * Program loaded earlier with the same rule options, unless a rule file
+   * has been added, removed or modified since
+   */
+  private async rules(scanner: Scanner, options: ScanOptions): Promise<RuleProgram> {
+    const { rulesPath, regexBackend = 'native', severity, ruleIds } = options;
+    const key = JSON.stringify([rulesPath, regexBackend, severity, ruleIds]);
+    const signature = await new RuleLoader(rulesPath).signature();
+
+    let loaded = this.programs.get(key);
+    if (!loaded || loaded.signature !== signature) {
+      loaded = { signature, program: scanner.loadRules() };
+      this.programs.set(key, loaded);
+    }
+    return loaded.program;
+  }
+}
+
+/**
+ * Scan options with paths made absolute, since the daemon's working
+ * directory is not the client's. The cache directory is settled here too,
+ * as the config naming it is found relative to the client.
+ */
+async function resolveOptions(options: ScanOptions, cwd: string): Promise<ScanOptions> {
+  const resolved: ScanOptions = {
+    ...options,
+    path: path.resolve(cwd, options.path),
+    output: undefined,
+    quiet: true,
+  };
+  if (options.rulesPath) {
+    resolved.rulesPath = path.resolve(cwd, options.rulesPath);
+  }
+  if (options.cache) {
+    const cacheDir =
+      options.cacheDir ||
+      (await new ConfigLoader().loadConfig(undefined, cwd)).performance?.cacheDir ||
+      DEFAULT_CACHE_DIR;
+    resolved.cacheDir = path.resolve(cwd, cacheDir);
+  }
+  return resolved;
+}
+
+/**
+ * First line sent by the client, or undefined if it hung up without one
+ */
+async function readRequest(socket: net.Socket): Promise<DaemonRequest | undefined> {
+  const lines = createInterface({ input: socket, crlfDelay: Infinity });
+  for await (const line of lines) {
+    return JSON.parse(line) as DaemonRequest;
+  }
+  return undefined;
+}
+
+function send(socket: net.Socket, response: DaemonResponse): Promise<void> {
+  if (socket.destroyed) {
+    return Promise.reject(new Error('Client disconnected'));
+  }
+  return writeChunk(socket, JSON.stringify(response) + '\n');
+}
+
+function listenOn(server: net.Server, socket: string): Promise<void> {
+  return new Promise((resolve, reject) => {
+    server.once('error', reject);
+    server.listen(socket, () => {
+      server.off('error', reject);
+      resolve();
+    });
+  });
+}
+
+function isListening(socket: string): Promise<boolean> {
+  return new Promise((resolve) => {
+    const connection = net.connect(socket);
+    connection.once('connect', () => {
+      connection.destroy();
+      resolve(true);
+    });
+    connection.once('error', () => resolve(false));
+  });
+}
@@ -0,0 +1,385 @@
+/**
+ * Indexed, append-only store for cached scan results
+ *
+ * Values are JSON documents keyed by 40-character hex digests such as git
+ * blob IDs. They are kept in two files:
+ *
+ * - a records file, to which every value is appended as one line of JSON,
+ *   prefixed with its key
+ * - an index holding the offset and length of each live record, sorted by key
+ *   behind a 256-entry fan-out table, the same layout as a git pack index
+ *
+ * Opening a store reads the index as a single buffer without parsing it. A
+ * lookup is a fan-out jump plus a short binary search, and only the records
+ * that are looked up are read. Saving appends new records and rewrites the
+ * index; records that are no longer indexed, because they were replaced or
+ * expired, are dropped by compaction once they make up most of the file.
+ */
+
+import { createHash } from 'crypto';
+import { FileHandle, mkdir, open, readFile, rename, stat, writeFile } from 'fs/promises';
+import * as path from 'path';
+
+export const INDEX_FILE = 'results.idx';
+export const RECORDS_FILE = 'results.log';
+
+/** Entries neither read nor written for this long are dropped on save */
+export const DEFAULT_MAX_AGE = 30 * 24 * 60 * 60 * 1000;
+
+const MAGIC = 'VSCI';
+const FORMAT_VERSION = 1;
+const KEY_SIZE = 20;
+const KEY_PATTERN = /^[0-9a-f]{40}$/;
+
+// Magic, format version, fingerprint digest, records file size, entry count
+const HEADER_SIZE = 4 + 4 + 32 + 6 + 4;
+// Number of entries whose key starts with a byte <= i, for every byte value i
+const FANOUT_SIZE = 256 * 4;
+// Key, record offset, record length, last use in seconds since the epoch
+const ENTRY_SIZE = KEY_SIZE + 6 + 4 + 4;
+
+// Records files smaller than this are not worth compacting
+const MIN_COMPACT_SIZE = 1024 * 1024;
+
+export interface CacheStoreOptions {
+  /** Milliseconds an unused entry is kept (default: 30 days) */
+  maxAge?: number;
+}
+
+interface IndexEntry {
+  key: string;
+  offset: number;
+  length: number;
+  lastUsed: number;
+}
+
+export class CacheStore {
+  private dir: string;
+  private fingerprint: Buffer;
+  private maxAge: number;
+  private index: Buffer;
+  private count: number;
+  private recordsSize: number;
+  private records?: Promise<FileHandle>;
+  // Records set since the last save, keyed like the index
+  private pending = new Map<string, string>();
+  // Keys read from the index since the last save
+  private used = new Set<string>();
+
+  private constructor(
+    dir: string,
+    fingerprint: Buffer,
+    index: Buffer | null,
+    options: CacheStoreOptions
+  ) {
+    this.dir = dir;
+    this.fingerprint = fingerprint;
+    this.maxAge = options.maxAge ?? DEFAULT_MAX_AGE;
+    this.index = index || Buffer.alloc(0);
+    this.count = index ? index.readUInt32LE(46) : 0;
+    this.recordsSize = index ? index.readUIntLE(40, 6) : 0;
+  }
+
+  /**
+   * Open the store kept in dir. It starts out empty if there is none, it is
+   * damaged, or it was written with a different fingerprint.
+   */
+  static async open(
+    dir: string,
+    fingerprint: string,
+    options: CacheStoreOptions = {}
+  ): Promise<CacheStore> {
+    const digest = createHash('sha256').update(fingerprint).digest();
+    const index = await readIndex(dir, digest);
+    return new CacheStore(dir, digest, index, options);
+  }
+
+  get size(): number {
+    return this.count + this.pending.size;
+  }
+
+  /**
+   * The value stored under key, or undefined if there is none or its record
+   * cannot be read back
+   */
+  async get<T>(key: string): Promise<T | undefined> {
+    const pending = this.pending.get(key);
+    if (pending !== undefined) {
+      return JSON.parse(pending.slice(KEY_SIZE * 2 + 1));
+    }
+
+    const position = this.find(key);
+    if (position === -1) {
+      return undefined;
+    }
+    const offset = this.index.readUIntLE(position + KEY_SIZE, 6);
+    const length = this.index.readUInt32LE(position + KEY_SIZE + 6);
+
+    try {
+      const handle = await this.openRecords();
+      const record = Buffer.alloc(length);
+      const { bytesRead } = await handle.read(record, 0, length, offset);
+      // A record that does not start with its key was overwritten by another writer
+      if (bytesRead !== length || record.toString('latin1', 0, KEY_SIZE * 2) !== key) {
+        return undefined;
+      }
+      const value = JSON.parse(record.toString('utf8', KEY_SIZE * 2 + 1, length - 1));
+      this.used.add(key);
+      return value;
+    } catch {
+      return undefined;
+    }
+  }
+
+  /**
+   * Store value under key. The value is serialized right away, so later
+   * changes to it are not recorded.
+   */
+  set(key: string, value: unknown): void {
+    if (!KEY_PATTERN.test(key)) {
+      throw new Error(`Invalid cache key: ${key}`);
+    }
+    this.pending.set(key, `${key} ${JSON.stringify(value)}\n`);
+  }
+
+  /**
+   * Append new records and write the index, dropping expired entries.
+   * Compacts the records file when most of it is no longer referenced, or
+   * whenever compact is set.
+   */
+  async save({ compact = false }: { compact?: boolean } = {}): Promise<void> {
+    await this.closeRecords();
+    await mkdir(this.dir, { recursive: true });
+
+    const now = Math.floor(Date.now() / 1000);
+    const kept = this.keptEntries(now);
+    const appended = await this.appendPending(now);
+    let entries = mergeEntries(kept, appended);
+
+    const live = entries.reduce((total, entry) => total + entry.length, 0);
+    if (compact || (this.recordsSize >= MIN_COMPACT_SIZE && live * 2 < this.recordsSize)) {
+      entries = await this.compact(entries);
+    }
+
+    this.index = await writeIndex(this.dir, this.fingerprint, this.recordsSize, entries);
+    this.count = entries.length;
+    this.pending.clear();
+    this.used.clear();
+  }
+
+  /**
+   * Release the records file without saving
+   */
+  async close(): Promise<void> {
+    await this.closeRecords();
+  }
+
+  /**
+   * Position of key's entry in the index, or -1
+   */
+  private find(key: string): number {
+    if (this.count === 0 || !KEY_PATTERN.test(key)) {
+      return -1;
+    }
+    const target = Buffer.from(key, 'hex');
+    let low = target[0] === 0 ? 0 : this.index.readUInt32LE(HEADER_SIZE + (target[0] - 1) * 4);
+    let high = this.index.readUInt32LE(HEADER_SIZE + target[0] * 4);
+
+    while (low < high) {
+      const middle = (low + high) >>> 1;
+      const position = HEADER_SIZE + FANOUT_SIZE + middle * ENTRY_SIZE;
+      const order = target.compare(this.index, position, position + KEY_SIZE);
+      if (order === 0) {
+        return position;
+      }
+      if (order < 0) {
+        high = middle;
+      } else {
+        low = middle + 1;
+      }
+    }
+    return -1;
+  }
+
+  /**
+   * Indexed entries that are neither replaced by a pending record nor expired,
+   * in key order
+   */
+  private keptEntries(now: number): IndexEntry[] {
+    const oldest = now - Math.floor(this.maxAge / 1000);
+    const entries: IndexEntry[] = [];
+    for (let i = 0; i < this.count; i++) {
+      const position = HEADER_SIZE + FANOUT_SIZE + i * ENTRY_SIZE;
+      const key = this.index.toString('hex', position, position + KEY_SIZE);
+      if (this.pending.has(key)) {
+        continue;
+      }
+      const lastUsed = this.used.has(key)
+        ? now
+        : this.index.readUInt32LE(position + KEY_SIZE + 10);
+      if (lastUsed >= oldest) {
+        entries.push({
+          key,
+          offset: this.index.readUIntLE(position + KEY_SIZE, 6),
+          length: this.index.readUInt32LE(position + KEY_SIZE + 6),
+          lastUsed,
+        });
+      }
+    }
+    return entries;
+  }
+
+  /**
+   * Append pending records in a single write, returning their entries in
+   * key order
+   */
+  private async appendPending(now: number): Promise<IndexEntry[]> {
+    const recordsFile = path.join(this.dir, RECORDS_FILE);
+    // An empty store may sit next to a records file it cannot use
+    const handle = await open(recordsFile, this.count === 0 ? 'w' : 'a');
+    try {
+      let offset = (await handle.stat()).size;
+      const keys = Array.from(this.pending.keys()).sort();
+      const entries: IndexEntry[] = [];
+      const chunks: Buffer[] = [];
+      for (const key of keys) {
+        const record = Buffer.from(this.pending.get(key) as string);
+        entries.push({ key, offset, length: record.length, lastUsed: now });
+        chunks.push(record);
+        offset += record.length;
+      }
+      if (chunks.length > 0) {
+        await handle.write(Buffer.concat(chunks));
+      }
+      this.recordsSize = offset;
+      return entries;
+    } finally {
+      await handle.close();
+    }
+  }
+
+  /**
+   * Rewrite the records file with only the records entries refer to,
+   * returning the entries with their new offsets
+   */
+  private async compact(entries: IndexEntry[]): Promise<IndexEntry[]> {
+    const recordsFile = path.join(this.dir, RECORDS_FILE);
+    const compactFile = `${recordsFile}.${process.pid}.tmp`;
+    const source = await open(recordsFile, 'r');
+    const target = await open(compactFile, 'w');
+    const compacted: IndexEntry[] = [];
+    let offset = 0;
+
+    try {
+      // Copy in file order so the old file is read front to back
+      const byOffset = [...entries].sort((a, b) => a.offset - b.offset);
+      for (const entry of byOffset) {
+        const record = Buffer.alloc(entry.length);
+        await source.read(record, 0, entry.length, entry.offset);
+        await target.write(record);
+        compacted.push({ ...entry, offset });
+        offset += entry.length;
+      }
+    } finally {
+      await source.close();
+      await target.close();
+    }
+
+    await rename(compactFile, recordsFile);
+    this.recordsSize = offset;
+    return compacted.sort((a, b) => (a.key < b.key ? -1 : 1));
+  }
+
+  private openRecords(): Promise<FileHandle> {
+    if (!this.records) {
+      this.records = open(path.join(this.dir, RECORDS_FILE), 'r');
+    }
+    return this.records;
+  }
+
+  private async closeRecords(): Promise<void> {
+    const records = this.records;
+    this.records = undefined;
+    if (records) {
+      await records.then(
+        (handle) => handle.close(),
+        () => undefined
+      );
+    }
+  }
+}
+
+/**
+ * Read and check the index in dir, returning null unless it is intact, was
+ * written with this fingerprint, and its records file is all there
+ */
+async function readIndex(dir: string, fingerprint: Buffer): Promise<Buffer | null> {
+  try {
+    const [index, records] = await Promise.all([
+      readFile(path.join(dir, INDEX_FILE)),
+      stat(path.join(dir, RECORDS_FILE)),
+    ]);
+    const valid =
+      index.length >= HEADER_SIZE + FANOUT_SIZE &&
+      index.toString('latin1', 0, 4) === MAGIC &&
+      index.readUInt32LE(4) === FORMAT_VERSION &&
+      index.compare(fingerprint, 0, 32, 8, 40) === 0 &&
+      index.length === HEADER_SIZE + FANOUT_SIZE + index.readUInt32LE(46) * ENTRY_SIZE &&
+      records.size >= index.readUIntLE(40, 6);
+    return valid ? index : null;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Write the index for entries, which must be in key order, and return it.
+ * The index is replaced atomically so readers never see a partial one.
+ */
+async function writeIndex(
+  dir: string,
+  fingerprint: Buffer,
+  recordsSize: number,
+  entries: IndexEntry[]
+): Promise<Buffer> {
+  const index = Buffer.alloc(HEADER_SIZE + FANOUT_SIZE + entries.length * ENTRY_SIZE);
+  index.write(MAGIC, 0, 'latin1');
+  index.writeUInt32LE(FORMAT_VERSION, 4);
+  fingerprint.copy(index, 8);
+  index.writeUIntLE(recordsSize, 40, 6);
+  index.writeUInt32LE(entries.length, 46);
+
+  const fanout = new Uint32Array(256);
+  entries.forEach((entry, i) => {
+    const position = HEADER_SIZE + FANOUT_SIZE + i * ENTRY_SIZE;
+    index.write(entry.key, position, 'hex');
+    index.writeUIntLE(entry.offset, position + KEY_SIZE, 6);
+    index.writeUInt32LE(entry.length, position + KEY_SIZE + 6);
+    index.writeUInt32LE(entry.lastUsed, position + KEY_SIZE + 10);
+    fanout[index[position]]++;
+  });
+  let total = 0;
+  for (let i = 0; i < 256; i++) {
+    total += fanout[i];
+    index.writeUInt32LE(total, HEADER_SIZE + i * 4);
+  }
+
+  const indexFile = path.join(dir, INDEX_FILE);
+  const tempFile = `${indexFile}.${process.pid}.tmp`;
+  await writeFile(tempFile, index);
+  await rename(tempFile, indexFile);
+  return index;
+}
+
+/**
+ * Merge two key-ordered entry lists whose keys do not overlap
+ */
+function mergeEntries(a: IndexEntry[], b: IndexEntry[]): IndexEntry[] {
+  const merged: IndexEntry[] = [];
+  let i = 0;
+  let j = 0;
+  while (i < a.length && j < b.length) {
+    merged.push(a[i].key < b[j].key ? a[i++] : b[j++]);
+  }
+  return merged.concat(a.slice(i), b.slice(j));
+}
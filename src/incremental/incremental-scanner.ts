@@ -1,23 +1,52 @@
 import { spawn } from 'child_process';
+import { createHash } from 'crypto';
 import { readFile, writeFile, access } from 'fs/promises';
+import { resolve } from 'path';
 import { Finding } from '../../scanner/core/types';
 
 export interface ScanCache {
   files: Map<string, { hash: string; timestamp: number }>;
   rules: Map<string, { hash: string }>;
   results: Map<string, Finding[]>;
+  fingerprint?: string; // Rule set and options the results were produced with
+}
+
+// Index entries for regular files; symlinks and submodules are hashed differently
+const REGULAR_FILE_MODES = new Set(['100644', '100755']);
+
+// Attributes under which git converts content between the working tree and
+// the index, so a clean file's bytes can differ from its blob
+const CONVERSION_ATTRIBUTES = ['text', 'eol', 'filter', 'ident', 'working-tree-encoding'];
+
+/**
+ * The ID git gives a blob with this content, as `git hash-object` prints it
+ */
+export function computeBlobId(content: Buffer): string {
+  return createHash('sha1')
+    .update(`blob ${content.length}\0`)
+    .update(content)
+    .digest('hex');
 }
 
 export class IncrementalScanner {
-  private async execGit(args: string[], cwd: string): Promise<string> {
+  private async execGit(args: string[], cwd: string, input?: string): Promise<string> {
     return new Promise((resolve, reject) => {
       const proc = spawn('git', args, { cwd });
+      if (input !== undefined) {
+        // git can exit before reading all of its input; the exit code then
+        // reports the failure, so a broken pipe is not an error of its own
+        proc.stdin.on('error', (error: NodeJS.ErrnoException) => {
+          if (error.code !== 'EPIPE') reject(error);
+        });
+        proc.stdin.end(input);
+      }
       let stdout = '';
       let stderr = '';
 
       proc.stdout.on('data', (data) => (stdout += data.toString()));
       proc.stderr.on('data', (data) => (stderr += data.toString()));
 
+      proc.on('error', reject);
       proc.on('close', (code) => {
         if (code !== 0) reject(new Error(stderr));
         else resolve(stdout.trim());
@@ -34,28 +63,118 @@ export class IncrementalScanner {
     }
   }
 
+  /**
+   * Git blob ID of a file's current content, computed in-process
+   */
   async getFileHash(filePath: string, cwd: string): Promise<string> {
     try {
-      return await this.execGit(['hash-object', filePath], cwd);
+      return computeBlobId(await readFile(resolve(cwd, filePath)));
     } catch {
       return '';
     }
   }
 
-  getCachedResults(cache: ScanCache, fileHash: string): Finding[] | undefined {
-    for (const [hash, results] of cache.results.entries()) {
-      if (hash === fileHash) return results;
+  /**
+   * Blob IDs of every tracked file under cwd whose working-tree copy matches
+   * the index byte for byte, keyed by absolute path. A few git calls cover
+   * the whole tree; files missing from the map (modified, untracked,
+   * conflicted, or converted on checkout by autocrlf, eol or filter
+   * settings) need their content hashed. Returns an empty map outside a git
+   * work tree.
+   */
+  async getBlobIds(cwd: string): Promise<Map<string, string>> {
+    const blobIds = new Map<string, string>();
+    let entries: string;
+    let dirty: string;
+    let autocrlf: string;
+    try {
+      [entries, dirty, autocrlf] = await Promise.all([
+        this.execGit(['ls-files', '--stage', '-z'], cwd),
+        this.execGit(['diff-files', '--name-only', '--relative', '-z'], cwd),
+        // Exits non-zero when unset
+        this.execGit(['config', '--get', 'core.autocrlf'], cwd).catch(() => 'false'),
+      ]);
+    } catch {
+      return blobIds;
+    }
+
+    const candidates = new Map<string, string>();
+    for (const entry of entries.split('\0')) {
+      // <mode> <object> <stage>\t<path>
+      const tab = entry.indexOf('\t');
+      if (tab === -1) continue;
+      const [mode, object, stage] = entry.slice(0, tab).split(' ');
+      if (stage === '0' && REGULAR_FILE_MODES.has(mode)) {
+        candidates.set(entry.slice(tab + 1), object);
+      }
+    }
+    for (const file of dirty.split('\0')) {
+      if (file) candidates.delete(file);
+    }
+
+    let converted: Set<string>;
+    try {
+      converted = await this.getConvertedFiles(
+        Array.from(candidates.keys()),
+        cwd,
+        autocrlf === 'true' || autocrlf === 'input'
+      );
+    } catch {
+      return blobIds;
+    }
+    for (const [file, object] of candidates) {
+      if (!converted.has(file)) {
+        blobIds.set(resolve(cwd, file), object);
+      }
+    }
+
+    return blobIds;
+  }
+
+  /**
+   * Files among paths that git may convert between the index and the working
+   * tree: those with a filter, ident, encoding or eol attribute, text files,
+   * and with core.autocrlf every file not marked -text
+   */
+  private async getConvertedFiles(
+    paths: string[],
+    cwd: string,
+    autocrlf: boolean
+  ): Promise<Set<string>> {
+    const converted = new Set<string>();
+    if (paths.length === 0) {
+      return converted;
+    }
+
+    const output = await this.execGit(
+      ['check-attr', '-z', '--stdin', ...CONVERSION_ATTRIBUTES],
+      cwd,
+      paths.join('\0') + '\0'
+    );
+    // <path>\0<attribute>\0<value>\0 for every path and attribute
+    const fields = output.split('\0');
+    for (let i = 0; i + 2 < fields.length; i += 3) {
+      const [file, attribute, value] = fields.slice(i, i + 3);
+      const set = value !== 'unspecified' && value !== 'unset';
+      if (set || (attribute === 'text' && value === 'unspecified' && autocrlf)) {
+        converted.add(file);
+      }
     }
-    return undefined;
+    return converted;
+  }
+
+  getCachedResults(cache: ScanCache, fileHash: string): Finding[] | undefined {
+    return cache.results.get(fileHash);
   }
 
   async saveCache(cache: ScanCache, path: string): Promise<void> {
     const serialized = {
+      fingerprint: cache.fingerprint,
       files: Array.from(cache.files.entries()),
       rules: Array.from(cache.rules.entries()),
       results: Array.from(cache.results.entries()),
     };
-    await writeFile(path, JSON.stringify(serialized, null, 2));
+    await writeFile(path, JSON.stringify(serialized));
   }
 
   async loadCache(path: string): Promise<ScanCache | null> {
@@ -67,6 +186,7 @@ export class IncrementalScanner {
         files: new Map(data.files || []),
         rules: new Map(data.rules || []),
         results: new Map(data.results || []),
+        fingerprint: data.fingerprint,
       };
     } catch {
       return null;
@@ -128,6 +128,7 @@ export async function handleScan(params: unknown): Promise<ScanToolResult> {
     severity: scanParams.severity ? (scanParams.severity.toLowerCase() as Severity) : Severity.LOW,
     format: scanParams.format === 'text' ? 'text' : 'json',
     include: scanParams.files.length > 0 ? scanParams.files : ['**/*.{js,ts,py,jsx,tsx}'],
+    ruleIds: scanParams.rules && scanParams.rules.length > 0 ? scanParams.rules : undefined,
     parallel: scanParams.parallel !== false,
     quiet: true, // Suppress console output for MCP
   });
@@ -136,7 +137,7 @@ export async function handleScan(params: unknown): Promise<ScanToolResult> {
   const result: CoreScanResult = await scanner.scan();
 
   // Transform to MCP response format
-  return transformScanResult(result, scanParams);
+  return transformScanResult(result);
 }
 
 /**
@@ -206,12 +207,9 @@ function validateScanParams(params: unknown): ScanParams {
 /**
  * Transform core ScanResult to MCP tool result
  */
-function transformScanResult(coreResult: CoreScanResult, params: ScanParams): ScanToolResult {
-  // Apply additional filtering if specific rules requested
-  let findings = coreResult.findings;
-  if (params.rules && params.rules.length > 0) {
-    findings = findings.filter((f) => params.rules!.includes(f.rule));
-  }
+function transformScanResult(coreResult: CoreScanResult): ScanToolResult {
+  // Requested rules were already applied by the scanner
+  const findings = coreResult.findings;
 
   // Calculate summary
   const summary = {
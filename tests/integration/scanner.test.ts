@@ -3,8 +3,15 @@
  * Tests the complete scanning workflow from file discovery to finding generation
  */
 
+import * as fs from 'fs';
+import * as os from 'os';
 import * as path from 'path';
 import { Scanner } from '../../scanner/core/engine';
+import { collectScanResult } from '../../scanner/core/scan-result';
+import { ScanResult, Severity } from '../../scanner/core/types';
+import { ScanWatcher, WatchDelta } from '../../scanner/core/watcher';
+import { ScanDaemon } from '../../src/daemon/server';
+import { daemonStatus, scanWithDaemon, stopDaemon } from '../../src/daemon/client';
 
 describe('Scanner Integration', () => {
   const fixturesPath = path.join(__dirname, '../fixtures');
@@ -93,6 +100,278 @@ describe('Scanner Integration', () => {
       expect(result.findings.length).toBeGreaterThan(20); // At least 20 vulnerabilities
       expect(result.scan.filesScanned).toBeGreaterThan(5);
     });
+
+    it('should only run rules at or above the minimum severity', async () => {
+      const vulnerablePath = path.join(fixturesPath, 'vulnerable');
+      const all = await new Scanner({ path: vulnerablePath, quiet: true }).scan();
+      const critical = await new Scanner({
+        path: vulnerablePath,
+        severity: Severity.CRITICAL,
+        quiet: true,
+      }).scan();
+
+      expect(critical.findings.length).toBeGreaterThan(0);
+      expect(critical.findings.every((f) => f.severity === Severity.CRITICAL)).toBe(true);
+      expect(critical.findings.length).toBe(
+        all.findings.filter((f) => f.severity === Severity.CRITICAL).length
+      );
+    });
+
+    it('should only run the requested rules', async () => {
+      const vulnerablePath = path.join(fixturesPath, 'vulnerable');
+      const all = await new Scanner({ path: vulnerablePath, quiet: true }).scan();
+      const ruleId = all.findings[0].rule;
+
+      const result = await new Scanner({
+        path: vulnerablePath,
+        ruleIds: [ruleId],
+        quiet: true,
+      }).scan();
+
+      expect(result.findings.length).toBe(all.findings.filter((f) => f.rule === ruleId).length);
+      expect(result.findings.every((f) => f.rule === ruleId)).toBe(true);
+    });
+  });
+
+  describe('Streaming', () => {
+    it('should yield a start event, one event per file, then the totals', async () => {
+      const vulnerablePath = path.join(fixturesPath, 'vulnerable');
+      const result = await new Scanner({ path: vulnerablePath, quiet: true }).scan();
+      const events = [];
+      for await (const event of new Scanner({ path: vulnerablePath, quiet: true }).scanStream()) {
+        events.push(event);
+      }
+
+      const first = events[0];
+      const last = events[events.length - 1];
+      const fileEvents = events.filter((event) => event.type === 'file');
+      expect(first.type === 'start' && first.files).toBe(fileEvents.length);
+      expect(last.type).toBe('complete');
+      if (last.type === 'complete') {
+        expect(last.summary).toEqual(result.summary);
+        expect(last.scan.filesScanned).toBe(result.scan.filesScanned);
+      }
+      const streamed = fileEvents.reduce(
+        (total, event) => total + (event.type === 'file' ? event.findings.length : 0),
+        0
+      );
+      expect(streamed).toBe(result.findings.length);
+    });
+  });
+
+  describe('Worker Threads', () => {
+    it('should report the same findings as an in-process scan', async () => {
+      const vulnerablePath = path.join(fixturesPath, 'vulnerable');
+      const inProcess = await new Scanner({ path: vulnerablePath, quiet: true }).scan();
+      const threaded = await new Scanner({ path: vulnerablePath, workers: 3, quiet: true }).scan();
+
+      const strip = (result: typeof inProcess) =>
+        JSON.parse(JSON.stringify(result.findings)).map(({ id, ...finding }: any) => finding);
+      expect(threaded.scan.filesScanned).toBe(inProcess.scan.filesScanned);
+      expect(strip(threaded)).toEqual(strip(inProcess));
+    });
+
+    it('should report the same findings with the combined engine', async () => {
+      const vulnerablePath = path.join(fixturesPath, 'vulnerable');
+      const options = { path: vulnerablePath, engine: 'combined' as const, quiet: true };
+      const inProcess = await new Scanner(options).scan();
+      const threaded = await new Scanner({ ...options, workers: 3 }).scan();
+
+      const strip = (result: typeof inProcess) =>
+        JSON.parse(JSON.stringify(result.findings)).map(({ id, ...finding }: any) => finding);
+      expect(inProcess.findings.length).toBeGreaterThan(0);
+      expect(strip(threaded)).toEqual(strip(inProcess));
+    });
+  });
+
+  describe('Result Cache', () => {
+    const strip = (findings: unknown[]) =>
+      JSON.parse(JSON.stringify(findings)).map(({ id, ...finding }: any) => finding);
+
+    it('should replay findings for unchanged files and rescan changed ones', async () => {
+      const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'vibesec-cache-'));
+      const projectDir = path.join(tempDir, 'project');
+      const cacheDir = path.join(tempDir, 'cache');
+      fs.cpSync(path.join(fixturesPath, 'vulnerable/js'), projectDir, { recursive: true });
+
+      try {
+        const options = { path: projectDir, cache: true, cacheDir, quiet: true };
+        const first = await new Scanner(options).scan();
+        const second = await new Scanner(options).scan();
+        expect(strip(second.findings)).toEqual(strip(first.findings));
+        expect(fs.existsSync(path.join(cacheDir, 'results.idx'))).toBe(true);
+
+        // Clearing one file's content must not replay its old findings
+        const file = first.findings[0].location.file;
+        fs.writeFileSync(file, '// nothing to see here\n');
+        const third = await new Scanner(options).scan();
+        expect(third.findings.some((f) => f.location.file === file)).toBe(false);
+        expect(third.findings.length).toBe(
+          first.findings.filter((f) => f.location.file !== file).length
+        );
+      } finally {
+        fs.rmSync(tempDir, { recursive: true, force: true });
+      }
+    });
+
+    it('should trust unchanged file metadata instead of reading the file', async () => {
+      const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'vibesec-cache-'));
+      const projectDir = path.join(tempDir, 'project');
+      const cacheDir = path.join(tempDir, 'cache');
+      fs.cpSync(path.join(fixturesPath, 'vulnerable/js'), projectDir, { recursive: true });
+
+      try {
+        const file = path.join(projectDir, 'xss.js');
+        const past = new Date(Date.now() - 60 * 60 * 1000);
+        fs.utimesSync(file, past, past);
+        const options = { path: projectDir, cache: true, cacheDir, quiet: true };
+        const first = await new Scanner(options).scan();
+        const count = (result: ScanResult) =>
+          result.findings.filter((f) => f.location.file === file).length;
+        expect(count(first)).toBeGreaterThan(0);
+
+        // Same size and mtime: the stale findings are replayed without a read
+        const content = fs.readFileSync(file, 'utf-8');
+        fs.writeFileSync(file, content.replace(/\S/g, ' '));
+        fs.utimesSync(file, past, past);
+        expect(count(await new Scanner(options).scan())).toBe(count(first));
+
+        // A new mtime gets the file hashed again
+        fs.utimesSync(file, new Date(), new Date());
+        expect(count(await new Scanner(options).scan())).toBe(0);
+      } finally {
+        fs.rmSync(tempDir, { recursive: true, force: true });
+      }
+    });
+
+    it('should match cached files against edited rules only', async () => {
+      const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'vibesec-cache-'));
+      const rulesPath = path.join(tempDir, 'rules');
+      const cacheDir = path.join(tempDir, 'cache');
+      fs.cpSync(path.join(__dirname, '../../rules/default'), rulesPath, { recursive: true });
+
+      try {
+        const options = { path: fixturesPath, rulesPath, cache: true, cacheDir, quiet: true };
+        await new Scanner(options).scan();
+
+        // Drop one of the CORS patterns, which the fixtures match
+        const rulesFile = path.join(rulesPath, 'ai-specific.yaml');
+        const rules = fs.readFileSync(rulesFile, 'utf-8');
+        fs.writeFileSync(rulesFile, rules.replace(/ {6}- "Access-Control-Allow-Origin.*\n/, ''));
+
+        const edited = await new Scanner(options).scan();
+        const uncached = await new Scanner({ ...options, cache: false }).scan();
+        expect(strip(edited.findings)).toEqual(strip(uncached.findings));
+      } finally {
+        fs.rmSync(tempDir, { recursive: true, force: true });
+      }
+    });
+  });
+
+  describe('Watch Mode', () => {
+    it('should report findings fixed and added by file changes', async () => {
+      const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'vibesec-watch-'));
+      fs.cpSync(path.join(fixturesPath, 'vulnerable/js'), tempDir, { recursive: true });
+      const watcher = new ScanWatcher({ path: tempDir, quiet: true }, { debounce: 20 });
+      const deltas = watcher.deltas();
+
+      try {
+        const initial = (await deltas.next()).value as WatchDelta;
+        expect(initial.fixed).toEqual([]);
+        expect(initial.added.length).toBe(initial.summary.total);
+
+        const file = path.join(tempDir, 'xss.js');
+        const count = initial.added.filter((f) => f.location.file === file).length;
+        const content = fs.readFileSync(file);
+        fs.writeFileSync(file, '// nothing to see here\n');
+        const fixed = (await deltas.next()).value as WatchDelta;
+        expect(fixed.files).toEqual([file]);
+        expect(fixed.fixed.length).toBe(count);
+        expect(fixed.added).toEqual([]);
+        expect(fixed.summary.total).toBe(initial.summary.total - count);
+
+        fs.writeFileSync(path.join(tempDir, 'copy.js'), content);
+        const added = (await deltas.next()).value as WatchDelta;
+        expect(added.added.length).toBe(count);
+        expect(added.summary.total).toBe(initial.summary.total);
+      } finally {
+        watcher.close();
+        await deltas.return(undefined);
+        fs.rmSync(tempDir, { recursive: true, force: true });
+      }
+    });
+
+    it('should watch every directory without a recursive watcher', async () => {
+      const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'vibesec-watch-'));
+      fs.cpSync(path.join(fixturesPath, 'vulnerable/js'), path.join(tempDir, 'src'), {
+        recursive: true,
+      });
+      // As on Linux before Node 20, where recursive watching is unavailable
+      const watcher = new ScanWatcher(
+        { path: tempDir, quiet: true },
+        { debounce: 20, recursive: false }
+      );
+      const deltas = watcher.deltas();
+
+      try {
+        const initial = (await deltas.next()).value as WatchDelta;
+        const file = path.join(tempDir, 'src', 'xss.js');
+        const count = initial.added.filter((f) => f.location.file === file).length;
+        expect(count).toBeGreaterThan(0);
+
+        const content = fs.readFileSync(file);
+        fs.writeFileSync(file, '// nothing to see here\n');
+        const fixed = (await deltas.next()).value as WatchDelta;
+        expect(fixed.files).toEqual([file]);
+        expect(fixed.fixed.length).toBe(count);
+
+        // Files in a directory created after watching started are picked up
+        fs.mkdirSync(path.join(tempDir, 'lib'));
+        await new Promise((resolve) => setTimeout(resolve, 100));
+        fs.writeFileSync(path.join(tempDir, 'lib', 'copy.js'), content);
+        let added = (await deltas.next()).value as WatchDelta;
+        while (added.added.length === 0) {
+          added = (await deltas.next()).value as WatchDelta;
+        }
+        expect(added.added.length).toBe(count);
+      } finally {
+        watcher.close();
+        await deltas.return(undefined);
+        fs.rmSync(tempDir, { recursive: true, force: true });
+      }
+    });
+  });
+
+  describe('Scan Daemon', () => {
+    it('should report the same results as an in-process scan', async () => {
+      const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'vibesec-daemon-'));
+      const socket = path.join(tempDir, 'daemon.sock');
+      const daemon = new ScanDaemon({ socket });
+      await daemon.listen();
+
+      try {
+        const options = { path: path.relative(process.cwd(), fixturesPath), quiet: true };
+        const local = await new Scanner(options).scan();
+        const strip = (result: ScanResult) =>
+          JSON.parse(JSON.stringify(result.findings)).map(({ id, ...finding }: any) => finding);
+        for (let run = 0; run < 2; run++) {
+          const result = await collectScanResult((await scanWithDaemon(options, socket))!);
+          expect(strip(result)).toEqual(strip(local));
+          expect(result.summary).toEqual(local.summary);
+          expect(result.scan.path).toBe(options.path);
+        }
+        expect((await daemonStatus(socket))?.scans).toBe(2);
+        expect((await daemonStatus(socket))?.programs).toBe(1);
+
+        const missing = await scanWithDaemon({ path: path.join(tempDir, 'missing') }, socket);
+        await expect(collectScanResult(missing!)).rejects.toThrow('Path not found');
+      } finally {
+        await stopDaemon(socket);
+        await daemon.closed();
+        fs.rmSync(tempDir, { recursive: true, force: true });
+      }
+      expect(await scanWithDaemon({ path: fixturesPath }, socket)).toBeNull();
+    });
   });
 
   describe('Secure Code (False Positive Testing)', () => {
@@ -9,7 +9,9 @@
  */
 
 import * as fs from 'fs';
+import * as os from 'os';
 import * as path from 'path';
+import { spawn } from 'child_process';
 import { Scanner } from '../../scanner/core/engine';
 import { PerformanceBenchmark, BenchmarkResult } from '../../lib/performance/benchmark';
 import { MemoryProfiler, MemoryProfile } from '../../lib/performance/memory-profiler';
@@ -33,6 +35,28 @@ export interface BenchmarkReport {
   timestamp: Date;
 }
 
+export interface ScalingResult {
+  workers: number;
+  duration: number; // ms
+  filesPerSecond: number;
+  speedup: number; // relative to one worker
+  efficiency: number; // speedup per worker
+}
+
+export interface StartupResult {
+  command: string;
+  runtime: string; // runtime the CLI ran under, e.g. 'node 22.20.0'
+  firstByte: number; // ms from spawn to the first byte on stdout, median
+  exit: number; // ms from spawn to exit, median
+}
+
+// CLI invocations whose time is dominated by process startup and imports
+const STARTUP_COMMANDS = [['--version'], ['scan', '<empty>', '--format', 'json']];
+
+// Built CLI entry point, relative to this file when it runs from source and
+// when it runs compiled into dist/
+const BUILT_CLI = ['../../dist/cli/index.js', '../../cli/index.js'];
+
 export class BenchmarkSuite {
   private tempDirs: string[] = [];
 
@@ -117,6 +141,108 @@ export class BenchmarkSuite {
     };
   }
 
+  /**
+   * Scan the same project with 1, 2, 4, ... worker threads, up to the number
+   * of CPUs, to show how the worker pool scales
+   */
+  async runScaling(
+    fileCount: number = 2000,
+    maxWorkers: number = os.cpus().length
+  ): Promise<ScalingResult[]> {
+    const testPath = this.createTempDir('worker-scaling');
+    await this.generateFiles(testPath, fileCount, 'large');
+
+    const workerCounts: number[] = [];
+    for (let workers = 1; workers < maxWorkers; workers *= 2) {
+      workerCounts.push(workers);
+    }
+    workerCounts.push(maxWorkers);
+
+    console.log(`⏱️  Worker Scaling (${fileCount} files, up to ${maxWorkers} workers)`);
+    const results: ScalingResult[] = [];
+    for (const workers of workerCounts) {
+      const start = performance.now();
+      await new Scanner({ path: testPath, workers, quiet: true }).scan();
+      const duration = performance.now() - start;
+
+      const speedup = results.length > 0 ? results[0].duration / duration : 1;
+      results.push({
+        workers,
+        duration,
+        filesPerSecond: (fileCount / duration) * 1000,
+        speedup,
+        efficiency: speedup / workers,
+      });
+      console.log(`   ${workers} worker(s): ${PerformanceBenchmark.formatDuration(duration)}`);
+    }
+    console.log('');
+
+    return results;
+  }
+
+  /**
+   * Spawn the CLI for commands that do almost no work, so the time to its
+   * first byte of output is what startup costs. Scans run in-process, as
+   * in CI, rather than through a scan daemon. The built CLI is run with the
+   * current runtime, so the numbers do not depend on a TypeScript loader;
+   * without a build the benchmark is skipped.
+   */
+  async runStartup(runs: number = 10): Promise<StartupResult[]> {
+    const cli = BUILT_CLI.map((entry) => path.join(__dirname, entry)).find(fs.existsSync);
+    if (!cli) {
+      console.log('⏭️  CLI Startup skipped: build the CLI first (npm run build)\n');
+      return [];
+    }
+    const runtime = process.versions.bun
+      ? `bun ${process.versions.bun}`
+      : `node ${process.versions.node}`;
+    const emptyDir = this.createTempDir('startup');
+
+    console.log(`⏱️  CLI Startup (${runs} runs each, ${runtime})`);
+    const results: StartupResult[] = [];
+    for (const command of STARTUP_COMMANDS) {
+      const args = command.map((arg) => (arg === '<empty>' ? emptyDir : arg));
+      const samples: Array<{ firstByte: number; exit: number }> = [];
+      // The first run only warms the file system cache
+      for (let run = 0; run <= runs; run++) {
+        const sample = await this.timeCommand(cli, args);
+        if (run > 0) {
+          samples.push(sample);
+        }
+      }
+
+      const median = (values: number[]): number =>
+        values.sort((a, b) => a - b)[Math.floor(values.length / 2)];
+      const result = {
+        command: `vibesec ${command.join(' ').replace('<empty>', '<empty dir>')}`,
+        runtime,
+        firstByte: median(samples.map((sample) => sample.firstByte)),
+        exit: median(samples.map((sample) => sample.exit)),
+      };
+      results.push(result);
+      const firstByte = PerformanceBenchmark.formatDuration(result.firstByte);
+      console.log(`   ${result.command}: ${firstByte} to first byte`);
+    }
+    console.log('');
+
+    return results;
+  }
+
+  private timeCommand(cli: string, args: string[]): Promise<{ firstByte: number; exit: number }> {
+    return new Promise((resolve, reject) => {
+      const start = performance.now();
+      let firstByte = NaN;
+      const child = spawn(process.execPath, [cli, ...args], {
+        env: { ...process.env, VIBESEC_NO_DAEMON: '1' },
+        stdio: ['ignore', 'pipe', 'ignore'],
+      });
+      child.stdout.once('data', () => (firstByte = performance.now() - start));
+      child.stdout.resume();
+      child.once('error', reject);
+      child.once('close', () => resolve({ firstByte, exit: performance.now() - start }));
+    });
+  }
+
   /**
    * Get all benchmark scenarios
    */
@@ -398,7 +524,11 @@ def process_data(data):
   /**
    * Generate performance report
    */
-  static generateReport(reports: BenchmarkReport[]): string {
+  static generateReport(
+    reports: BenchmarkReport[],
+    scaling: ScalingResult[] = [],
+    startup: StartupResult[] = []
+  ): string {
     const lines: string[] = [
       '═══════════════════════════════════════════════════════════════',
       '                VibeSec Performance Benchmark Report           ',
@@ -454,6 +584,38 @@ def process_data(data):
       lines.push('');
     }
 
+    if (scaling.length > 0) {
+      lines.push(`─────────────────────────────────────────────────────────────────`);
+      lines.push('Worker Scaling:');
+      lines.push('');
+      lines.push('  Workers   Duration   Files/sec   Speedup   Efficiency');
+      for (const result of scaling) {
+        lines.push(
+          `  ${String(result.workers).padStart(7)}` +
+            `   ${PerformanceBenchmark.formatDuration(result.duration).padStart(8)}` +
+            `   ${result.filesPerSecond.toFixed(0).padStart(9)}` +
+            `   ${(result.speedup.toFixed(2) + 'x').padStart(7)}` +
+            `   ${(result.efficiency * 100).toFixed(0).padStart(9)}%`
+        );
+      }
+      lines.push('');
+    }
+
+    if (startup.length > 0) {
+      lines.push(`─────────────────────────────────────────────────────────────────`);
+      lines.push(`CLI Startup (${startup[0].runtime}):`);
+      lines.push('');
+      lines.push('  First byte   Exit       Command');
+      for (const result of startup) {
+        lines.push(
+          `  ${PerformanceBenchmark.formatDuration(result.firstByte).padStart(10)}` +
+            `   ${PerformanceBenchmark.formatDuration(result.exit).padEnd(8)}` +
+            `   ${result.command}`
+        );
+      }
+      lines.push('');
+    }
+
     lines.push(`═══════════════════════════════════════════════════════════════`);
     lines.push(`Generated: ${new Date().toISOString()}`);
     lines.push('');
@@ -0,0 +1,93 @@
+/**
+ * Unit tests for the indexed scan result store
+ */
+
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { createHash } from 'crypto';
+import { CacheStore, RECORDS_FILE } from '../../src/incremental/cache-store';
+
+describe('CacheStore', () => {
+  const key = (n: number) => createHash('sha1').update(String(n)).digest('hex');
+  let dir: string;
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'vibesec-store-'));
+  });
+
+  afterEach(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('should read back values after reopening', async () => {
+    const store = await CacheStore.open(dir, 'rules-a');
+    for (let i = 0; i < 1000; i++) {
+      store.set(key(i), [{ rule: `rule-${i}` }]);
+    }
+    await store.save();
+
+    const reopened = await CacheStore.open(dir, 'rules-a');
+    expect(reopened.size).toBe(1000);
+    expect(await reopened.get(key(0))).toEqual([{ rule: 'rule-0' }]);
+    expect(await reopened.get(key(999))).toEqual([{ rule: 'rule-999' }]);
+    expect(await reopened.get(key(1000))).toBeUndefined();
+    await reopened.close();
+  });
+
+  it('should keep earlier records when saving again', async () => {
+    const first = await CacheStore.open(dir, 'rules-a');
+    first.set(key(1), 'one');
+    await first.save();
+
+    const second = await CacheStore.open(dir, 'rules-a');
+    second.set(key(2), 'two');
+    await second.save();
+
+    const third = await CacheStore.open(dir, 'rules-a');
+    expect(await third.get(key(1))).toBe('one');
+    expect(await third.get(key(2))).toBe('two');
+    await third.close();
+  });
+
+  it('should start empty when the fingerprint changes', async () => {
+    const store = await CacheStore.open(dir, 'rules-a');
+    store.set(key(1), 'one');
+    await store.save();
+
+    const changed = await CacheStore.open(dir, 'rules-b');
+    expect(changed.size).toBe(0);
+    expect(await changed.get(key(1))).toBeUndefined();
+    await changed.close();
+  });
+
+  it('should drop replaced records when compacting', async () => {
+    const store = await CacheStore.open(dir, 'rules-a');
+    store.set(key(1), 'x'.repeat(1000));
+    store.set(key(2), 'two');
+    await store.save();
+    store.set(key(1), 'one');
+    await store.save({ compact: true });
+
+    const reopened = await CacheStore.open(dir, 'rules-a');
+    expect(await reopened.get(key(1))).toBe('one');
+    expect(await reopened.get(key(2))).toBe('two');
+    expect(fs.statSync(path.join(dir, RECORDS_FILE)).size).toBeLessThan(200);
+    await reopened.close();
+  });
+
+  it('should drop entries that have not been used within the maximum age', async () => {
+    const store = await CacheStore.open(dir, 'rules-a');
+    store.set(key(1), 'one');
+    await store.save();
+
+    const expired = await CacheStore.open(dir, 'rules-a', { maxAge: -1000 });
+    await expired.save();
+    expect((await CacheStore.open(dir, 'rules-a')).size).toBe(0);
+  });
+
+  it('should reject keys that are not hex digests', async () => {
+    const store = await CacheStore.open(dir, 'rules-a');
+    expect(() => store.set('not-a-hash', [])).toThrow('Invalid cache key');
+  });
+});
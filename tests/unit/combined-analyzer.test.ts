@@ -0,0 +1,107 @@
+import * as path from 'path';
+import { CombinedRegexAnalyzer } from '../../scanner/analyzers/combined';
+import { RegexAnalyzer } from '../../scanner/analyzers/regex';
+import { createFileContext } from '../../scanner/core/file-context';
+import { RuleProgram } from '../../scanner/core/rule-program';
+import { Scanner } from '../../scanner/core/engine';
+import { Finding, Pattern, Rule, Severity, Category } from '../../scanner/core/types';
+
+describe('CombinedRegexAnalyzer', () => {
+  const makeRule = (id: string, patterns: Pattern[]): Rule => ({
+    id,
+    name: id,
+    description: '',
+    severity: Severity.HIGH,
+    category: Category.CUSTOM,
+    patterns,
+    languages: ['javascript'],
+    enabled: true,
+  });
+
+  const key = (f: Finding): string => `${f.rule}:${f.location.line}:${f.location.column}`;
+
+  const compare = async (rules: Rule[], code: string): Promise<string[]> => {
+    const program = RuleProgram.compile(rules);
+    const context = createFileContext('test.js', code, 'javascript');
+    const analyzer = new RegexAnalyzer();
+
+    const expected: Finding[] = [];
+    for (const compiled of program.rules) {
+      expected.push(...(await analyzer.analyzeContext(context, compiled)));
+    }
+    const combined = await new CombinedRegexAnalyzer().analyzeFile(context, program);
+
+    expect(combined.map(key).sort()).toEqual(expected.map(key).sort());
+    return combined.map(key).sort();
+  };
+
+  it('should report overlapping matches from different patterns', async () => {
+    const rules = [
+      makeRule('long', [{ regex: 'password\\s*=\\s*"[^"]+"', flags: 'gi' }]),
+      makeRule('short', [{ regex: 'password', flags: 'gi' }]),
+      makeRule('inner', [{ regex: 'word', flags: 'gi' }]),
+    ];
+
+    const found = await compare(rules, 'const password = "hunter22";\nPASSWORD = "x"');
+
+    expect(found).toEqual([
+      'inner:1:10',
+      'inner:2:4',
+      'long:1:6',
+      'long:2:0',
+      'short:1:6',
+      'short:2:0',
+    ]);
+  });
+
+  it('should keep each pattern non-overlapping with itself', async () => {
+    const rules = [
+      makeRule('word', [{ regex: '[a-z]+', flags: 'g' }]),
+      makeRule('letter', [{ regex: '[a-z]', flags: 'g' }]),
+    ];
+
+    const found = await compare(rules, 'ab cd');
+
+    expect(found.filter((k) => k.startsWith('word'))).toEqual(['word:1:0', 'word:1:3']);
+  });
+
+  it('should not let single-line patterns span lines', async () => {
+    const rules = [
+      makeRule('assign', [{ regex: 'secret\\s*=\\s*\\w+', flags: 'g' }]),
+      makeRule('other', [{ regex: 'token', flags: 'g' }]),
+    ];
+
+    const found = await compare(rules, 'secret\n= value; secret = ok\ntoken');
+
+    expect(found).toEqual(['assign:2:9', 'other:3:0']);
+  });
+
+  it('should fall back for backreferences, named groups and mixed flags', async () => {
+    const rules = [
+      makeRule('backref', [{ regex: '(["\'])secret\\1', flags: 'g' }]),
+      makeRule('named', [{ regex: '(?<name>eval)\\(', flags: 'g' }]),
+      makeRule('case', [{ regex: 'SELECT', flags: 'gi' }]),
+      makeRule('plain', [{ regex: 'eval', flags: 'g' }]),
+      makeRule('multi', [{ regex: 'a\\s+b', flags: 'g', multiline: true }]),
+    ];
+
+    const found = await compare(rules, '"secret" eval(x) select a\nb');
+
+    expect(found).toHaveLength(5);
+  });
+
+  it('should produce the same findings as the default engine in a full scan', async () => {
+    const fixtures = path.join(__dirname, '../fixtures/vulnerable');
+    const regexResult = await new Scanner({ path: fixtures, quiet: true }).scan();
+    const combinedResult = await new Scanner({
+      path: fixtures,
+      quiet: true,
+      engine: 'combined',
+    }).scan();
+
+    const locate = (f: Finding): string => `${f.location.file}:${key(f)}`;
+    expect(combinedResult.findings.map(locate).sort()).toEqual(
+      regexResult.findings.map(locate).sort()
+    );
+  });
+});
@@ -0,0 +1,52 @@
+import {
+  computeLineOffsets,
+  createFileContext,
+  findLineIndex,
+} from '../../scanner/core/file-context';
+
+describe('FileContext', () => {
+  describe('computeLineOffsets()', () => {
+    it('should return a single offset for content without newlines', () => {
+      expect(Array.from(computeLineOffsets('no newline'))).toEqual([0]);
+    });
+
+    it('should record the start of every line', () => {
+      expect(Array.from(computeLineOffsets('ab\ncde\n\nf'))).toEqual([0, 3, 7, 8]);
+    });
+
+    it('should include a trailing empty line', () => {
+      expect(Array.from(computeLineOffsets('a\n'))).toEqual([0, 2]);
+    });
+  });
+
+  describe('findLineIndex()', () => {
+    const offsets = computeLineOffsets('ab\ncde\n\nf');
+
+    it('should map offsets to the line containing them', () => {
+      expect(findLineIndex(offsets, 0)).toBe(0);
+      expect(findLineIndex(offsets, 2)).toBe(0); // the newline belongs to its line
+      expect(findLineIndex(offsets, 3)).toBe(1);
+      expect(findLineIndex(offsets, 6)).toBe(1);
+      expect(findLineIndex(offsets, 7)).toBe(2);
+      expect(findLineIndex(offsets, 8)).toBe(3);
+    });
+
+    it('should map the end of the buffer to the last line', () => {
+      expect(findLineIndex(offsets, 9)).toBe(3);
+    });
+  });
+
+  describe('createFileContext()', () => {
+    it('should split lines once and keep them aligned with offsets', () => {
+      const content = 'line 1\nline 2\r\nline 3';
+      const context = createFileContext('test.js', content, 'javascript');
+
+      expect(context.language).toBe('javascript');
+      expect(context.lines).toEqual(['line 1', 'line 2\r', 'line 3']);
+      expect(context.lineOffsets).toHaveLength(context.lines.length);
+      context.lines.forEach((line, i) => {
+        expect(content.substr(context.lineOffsets[i], line.length)).toBe(line);
+      });
+    });
+  });
+});
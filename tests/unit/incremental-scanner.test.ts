@@ -0,0 +1,86 @@
+/**
+ * Unit tests for git-based content hashing in the incremental scanner
+ */
+
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { execFileSync } from 'child_process';
+import { IncrementalScanner, computeBlobId } from '../../src/incremental/incremental-scanner';
+
+describe('IncrementalScanner', () => {
+  const scanner = new IncrementalScanner();
+  const fixturesPath = path.join(__dirname, '../fixtures');
+
+  it('should compute the same blob ID as git hash-object', () => {
+    expect(computeBlobId(Buffer.from('hello\n'))).toBe('ce013625030ba8dba906f756967f9e9ca394464a');
+  });
+
+  it('should hash files in-process', async () => {
+    const file = path.join(fixturesPath, 'vulnerable/js/xss.js');
+    const hash = await scanner.getFileHash(file, process.cwd());
+
+    expect(hash).toBe(computeBlobId(fs.readFileSync(file)));
+  });
+
+  it('should read blob IDs of clean tracked files from the index', async () => {
+    const blobIds = await scanner.getBlobIds(fixturesPath);
+
+    expect(blobIds.size).toBeGreaterThan(0);
+    for (const [file, blobId] of blobIds) {
+      expect(path.isAbsolute(file)).toBe(true);
+      expect(blobId).toBe(computeBlobId(fs.readFileSync(file)));
+    }
+  });
+
+  it('should leave out files git converts on checkout', async () => {
+    const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'vibesec-git-'));
+    const git = (...args: string[]) => execFileSync('git', args, { cwd: tempDir, stdio: 'pipe' });
+    try {
+      git('init', '-q');
+      git('config', 'core.autocrlf', 'false');
+      fs.writeFileSync(path.join(tempDir, '.gitattributes'), '*.crlf.js text eol=crlf\n');
+      fs.writeFileSync(path.join(tempDir, 'plain.js'), 'const a = 1;\n');
+      fs.writeFileSync(path.join(tempDir, 'windows.crlf.js'), 'const b = 2;\r\n');
+      fs.writeFileSync(path.join(tempDir, 'image.bin'), 'binary\r\n');
+      git('add', '.');
+
+      const files = (blobIds: Map<string, string>) =>
+        Array.from(blobIds.keys(), (file) => path.basename(file)).sort();
+      expect(files(await scanner.getBlobIds(tempDir))).toEqual([
+        '.gitattributes',
+        'image.bin',
+        'plain.js',
+      ]);
+
+      // With autocrlf, only files marked -text are stored as they are
+      git('config', 'core.autocrlf', 'true');
+      fs.appendFileSync(path.join(tempDir, '.gitattributes'), '*.bin -text\n');
+      git('add', '.gitattributes');
+      expect(files(await scanner.getBlobIds(tempDir))).toEqual(['image.bin']);
+    } finally {
+      fs.rmSync(tempDir, { recursive: true, force: true });
+    }
+  });
+
+  it('should return no blob IDs outside a git work tree', async () => {
+    const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'vibesec-nogit-'));
+    try {
+      expect((await scanner.getBlobIds(tempDir)).size).toBe(0);
+    } finally {
+      fs.rmSync(tempDir, { recursive: true, force: true });
+    }
+  });
+
+  it('should reject when git exits before reading its input', async () => {
+    const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'vibesec-nogit-'));
+    const input = 'file.js\0'.repeat(1 << 17);
+    try {
+      await expect(
+        (scanner as any).execGit(['check-attr', '-z', '--stdin', 'text'], tempDir, input)
+      ).rejects.toThrow('not a git repository');
+    } finally {
+      fs.rmSync(tempDir, { recursive: true, force: true });
+    }
+  });
+});
@@ -0,0 +1,53 @@
+import { compileSchema } from '../../scanner/core/json-schema';
+
+describe('compileSchema()', () => {
+  const validate = compileSchema({
+    type: 'object',
+    required: ['name', 'items'],
+    properties: {
+      name: { type: 'string', minLength: 1 },
+      level: { type: 'integer', minimum: 1, maximum: 3 },
+      items: { type: ['string', 'array'], minItems: 1, items: { $ref: '#/definitions/item' } },
+    },
+    definitions: {
+      item: {
+        type: 'object',
+        required: ['id'],
+        properties: { id: { type: 'string', pattern: '^[a-z]+$' } },
+      },
+    },
+  });
+
+  it('should accept values matching the schema', () => {
+    expect(validate({ name: 'a', level: 2, items: [{ id: 'x' }] })).toEqual([]);
+    expect(validate({ name: 'a', items: 'one', extra: true })).toEqual([]);
+  });
+
+  it('should report each error with the path to the field', () => {
+    expect(validate({ name: '', level: 5, items: [{ id: 'X1' }, {}] })).toEqual([
+      'name: must not be empty',
+      'level: must be at most 3',
+      'items[0].id: must match ^[a-z]+$',
+      'items[1]: missing required fields: id',
+    ]);
+    expect(validate({ items: [] })).toEqual([
+      'missing required fields: name',
+      'items: must not be empty',
+    ]);
+  });
+
+  it('should skip other checks on a value of the wrong type', () => {
+    expect(validate({ name: 'a', level: 1.5, items: 3 })).toEqual([
+      'level: must be integer',
+      'items: must be string or array',
+    ]);
+    expect(validate(null)).toEqual(['must be object']);
+  });
+
+  it('should reject schemas using unsupported keywords or references', () => {
+    expect(() => compileSchema({ oneOf: [] })).toThrow('Unsupported schema keyword oneOf');
+    expect(() => compileSchema({ $ref: '#/definitions/missing' })).toThrow(
+      'Unresolved schema reference #/definitions/missing'
+    );
+  });
+});
@@ -0,0 +1,96 @@
+import { compileLinearRegex, LinearRegex, RegexLike } from '../../scanner/core/linear-regex';
+import { compileRule } from '../../scanner/core/rule-program';
+import { Rule, Severity, Category } from '../../scanner/core/types';
+
+/**
+ * Every match of a global regex, as "index:text"
+ */
+function allMatches(regex: RegexLike, input: string): string[] {
+  const matches: string[] = [];
+  regex.lastIndex = 0;
+  let match: RegExpExecArray | null;
+  while ((match = regex.exec(input)) !== null) {
+    matches.push(`${match.index}:${match[0]}`);
+    if (match[0].length === 0) {
+      regex.lastIndex++;
+    }
+  }
+  return matches;
+}
+
+describe('LinearRegex', () => {
+  const cases: Array<[string, string, string]> = [
+    ['eval\\s*\\(', 'g', 'x = eval (y); eval(z)'],
+    ['a*?b', 'g', 'aaab ab b'],
+    ['^\\s*password\\s*=', 'gim', 'x\n  PASSWORD = 1\npassword=2'],
+    ['\\bfoo\\b', 'g', 'foo foobar barfoo foo'],
+    ['(a|ab)(c|bcd)', 'g', 'abcd'],
+    ['a{2,3}', 'g', 'aaaaaaa'],
+    ['[^"]*"', 'g', 'abc"def"'],
+    ['\\x41\\u0042[\\d-z]', 'g', 'AB- AB5 ABz'],
+    ['.+', 'g', 'line1\r\nline2'],
+    ['$', 'gm', 'a\nb'],
+    ['x*', 'g', 'axxb'],
+    ['(?:api[_-]?key|secret)\\s*[:=]\\s*["\'][A-Za-z0-9]{16,}["\']', 'gi', 'API_KEY = "abcdefghijklmnop"'],
+  ];
+
+  it('should find the same matches as RegExp', () => {
+    for (const [source, flags, input] of cases) {
+      const linear = compileLinearRegex(source, flags) as LinearRegex;
+
+      expect(linear).not.toBeNull();
+      expect(allMatches(linear, input)).toEqual(allMatches(new RegExp(source, flags), input));
+    }
+  });
+
+  it('should reject syntax that needs backtracking', () => {
+    for (const source of ['a(?=b)', 'a(?!b)', '(?<=a)b', '(a)\\1', '(?<x>a)\\k<x>']) {
+      expect(compileLinearRegex(source, 'g')).toBeNull();
+    }
+    expect(compileLinearRegex('a', 'gu')).toBeNull();
+  });
+
+  it('should run patterns with nested quantifiers in linear time', () => {
+    const linear = compileLinearRegex('(\\w+\\s?)+$', 'g') as LinearRegex;
+    const input = 'a'.repeat(20000) + '!';
+
+    const start = Date.now();
+    expect(linear.exec(input)).toBeNull();
+    expect(Date.now() - start).toBeLessThan(1000);
+  });
+});
+
+describe('compileRule() with the linear backend', () => {
+  const createRule = (regex: string, regexBackend?: 'native' | 'linear'): Rule => ({
+    id: 'test-linear',
+    name: 'Linear Rule',
+    description: 'Test description',
+    severity: Severity.HIGH,
+    category: Category.CUSTOM,
+    patterns: [{ regex, flags: 'g' }],
+    languages: ['*'],
+    enabled: true,
+    regexBackend,
+  });
+
+  it('should accept patterns that would backtrack catastrophically', () => {
+    expect(() => compileRule(createRule('(\\w+\\s?)+$'))).toThrow('catastrophic backtracking');
+
+    const compiled = compileRule(createRule('(\\w+\\s?)+$'), 'linear');
+    expect(compiled.patterns[0].backend).toBe('linear');
+    expect(compiled.patterns[0].regex).toBeInstanceOf(LinearRegex);
+  });
+
+  it('should fall back to RegExp for unsupported syntax', () => {
+    const compiled = compileRule(createRule('eval(?!uate)'), 'linear');
+
+    expect(compiled.patterns[0].backend).toBe('native');
+    expect(compiled.patterns[0].regex).toBeInstanceOf(RegExp);
+  });
+
+  it('should let a rule choose its own backend', () => {
+    const compiled = compileRule(createRule('eval\\(', 'linear'));
+
+    expect(compiled.patterns[0].backend).toBe('linear');
+  });
+});
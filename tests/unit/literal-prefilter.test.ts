@@ -0,0 +1,114 @@
+import {
+  AhoCorasick,
+  LiteralPrefilter,
+  extractRequiredLiterals,
+} from '../../scanner/core/literal-prefilter';
+import { RuleProgram } from '../../scanner/core/rule-program';
+import { Rule, Severity, Category } from '../../scanner/core/types';
+
+describe('Literal prefilter', () => {
+  describe('extractRequiredLiterals()', () => {
+    it('should take the longest required literal run', () => {
+      expect(extractRequiredLiterals('eval\\s*\\(')).toEqual(['eval']);
+      expect(extractRequiredLiterals('child_process\\.exec\\(')).toEqual(['child_process.exec(']);
+    });
+
+    it('should collect every alternative of a required group', () => {
+      expect(extractRequiredLiterals('(password|passwd|pwd)\\s*[=:]')).toEqual([
+        'password',
+        'passwd',
+        'pwd',
+      ]);
+    });
+
+    it('should lowercase literals for case-insensitive matching', () => {
+      expect(extractRequiredLiterals('SELECT\\s+.*FROM')).toEqual(['select']);
+    });
+
+    it('should drop characters made optional by a quantifier', () => {
+      expect(extractRequiredLiterals('secrets?Key')).toEqual(['secret']);
+      expect(extractRequiredLiterals('abc(def)?ghij')).toEqual(['ghij']);
+    });
+
+    it('should return null when an alternative has no usable literal', () => {
+      expect(extractRequiredLiterals('password|[a-z]+=')).toBeNull();
+      expect(extractRequiredLiterals('\\w+\\s*=')).toBeNull();
+      expect(extractRequiredLiterals('iv\\s*=')).toBeNull();
+    });
+
+    it('should ignore literals inside lookarounds', () => {
+      expect(extractRequiredLiterals('(?!safe)token')).toEqual(['token']);
+      expect(extractRequiredLiterals('(?<=abc)')).toBeNull();
+    });
+  });
+
+  describe('AhoCorasick', () => {
+    it('should find overlapping keywords case-insensitively', () => {
+      const automaton = new AhoCorasick(['he', 'she', 'hers', 'his']);
+      const found: number[] = [];
+
+      automaton.search('uSHERS', (index) => {
+        found.push(index);
+      });
+
+      expect(found.sort()).toEqual([0, 1, 2]);
+    });
+
+    it('should stop when the callback returns true', () => {
+      const automaton = new AhoCorasick(['a']);
+      let calls = 0;
+
+      automaton.search('aaaa', () => {
+        calls++;
+        return true;
+      });
+
+      expect(calls).toBe(1);
+    });
+  });
+
+  describe('LiteralPrefilter', () => {
+    it('should select only targets whose keywords appear', () => {
+      const prefilter = new LiteralPrefilter([
+        { target: 'exec', keywords: ['exec'] },
+        { target: 'sql', keywords: ['select', 'insert'] },
+        { target: 'always', keywords: null },
+      ]);
+
+      expect(Array.from(prefilter.match('const x = db.query("INSERT INTO t")'))).toEqual(['sql']);
+      expect(prefilter.match('nothing here').size).toBe(0);
+    });
+  });
+
+  describe('RuleProgram.selectRules()', () => {
+    const makeRule = (id: string, regex: string, keywords?: string[]): Rule => ({
+      id,
+      name: id,
+      description: '',
+      severity: Severity.HIGH,
+      category: Category.CUSTOM,
+      patterns: [{ regex, flags: 'gi' }],
+      languages: ['*'],
+      enabled: true,
+      keywords,
+    });
+
+    it('should keep rules that cannot be prefiltered', () => {
+      const program = RuleProgram.compile([
+        makeRule('eval', 'eval\\('),
+        makeRule('generic', '\\w+\\s*='),
+      ]);
+
+      const selected = program.selectRules(program.rules, 'const a = 1;');
+
+      expect(selected.map((r) => r.rule.id)).toEqual(['generic']);
+    });
+
+    it('should prefer explicit keywords over extracted literals', () => {
+      const program = RuleProgram.compile([makeRule('keyed', 'eval\\(', ['dangerous'])]);
+
+      expect(program.selectRules(program.rules, 'eval(x)')).toHaveLength(0);
+      expect(program.selectRules(program.rules, '// DANGEROUS\neval(x)')).toHaveLength(1);
+    });
+  });
+});
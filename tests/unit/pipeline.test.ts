@@ -0,0 +1,70 @@
+import { mapBounded } from '../../scanner/core/pipeline';
+
+describe('mapBounded()', () => {
+  const delay = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+  it('should never run more tasks than the concurrency limit', async () => {
+    const items = Array.from({ length: 20 }, (_, i) => i);
+    let inFlight = 0;
+    let peak = 0;
+
+    const results: number[] = new Array(items.length);
+    for await (const { index, result } of mapBounded(items, 3, async (item) => {
+      inFlight++;
+      peak = Math.max(peak, inFlight);
+      await delay(item % 4);
+      inFlight--;
+      return item * 2;
+    })) {
+      results[index] = result;
+    }
+
+    expect(peak).toBe(3);
+    expect(results).toEqual(items.map((item) => item * 2));
+  });
+
+  it('should yield results as they finish', async () => {
+    const order: number[] = [];
+    for await (const { result } of mapBounded([30, 0, 10], 3, async (ms) => {
+      await delay(ms);
+      return ms;
+    })) {
+      order.push(result);
+    }
+
+    expect(order).toEqual([0, 10, 30]);
+  });
+
+  it('should not leave failures of tasks still in flight unhandled', async () => {
+    const unhandled: unknown[] = [];
+    const onUnhandled = (reason: unknown) => unhandled.push(reason);
+    process.on('unhandledRejection', onUnhandled);
+
+    try {
+      for await (const { result } of mapBounded([0, 10, 20], 2, async (ms) => {
+        await delay(ms);
+        if (ms > 0) {
+          throw new Error(`task ${ms} failed`);
+        }
+        return ms;
+      })) {
+        expect(result).toBe(0);
+        break;
+      }
+      await delay(40);
+    } finally {
+      process.off('unhandledRejection', onUnhandled);
+    }
+
+    expect(unhandled).toEqual([]);
+  });
+
+  it('should handle an empty list', async () => {
+    const results: unknown[] = [];
+    for await (const result of mapBounded([], 4, async () => 1)) {
+      results.push(result);
+    }
+
+    expect(results).toHaveLength(0);
+  });
+});
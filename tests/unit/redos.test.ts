@@ -0,0 +1,41 @@
+import { checkPatternSafety } from '../../scanner/core/redos';
+
+describe('checkPatternSafety()', () => {
+  it('should flag nested quantifiers over overlapping input as exponential', () => {
+    for (const source of ['(a+)+$', '(\\w+\\s?)*$', '(x\\w+)+', '([a-z]+)*']) {
+      expect(checkPatternSafety(source).safety).toBe('exponential');
+    }
+  });
+
+  it('should flag repeated alternatives matching the same character', () => {
+    expect(checkPatternSafety('(a|a)*').safety).toBe('exponential');
+    expect(checkPatternSafety('(\\d|\\w)+').safety).toBe('exponential');
+    expect(checkPatternSafety('(a|aa)+$').safety).toBe('suspicious');
+  });
+
+  it('should accept nested quantifiers separated by a distinct character', () => {
+    expect(checkPatternSafety('(a+b)+').safety).toBe('safe');
+    expect(checkPatternSafety('(\\w+\\.)+com').safety).toBe('safe');
+    expect(checkPatternSafety('(?:foo|bar)+').safety).toBe('safe');
+  });
+
+  it('should leave polynomial patterns to the runtime budget', () => {
+    expect(checkPatternSafety('.*password.*=').safety).toBe('safe');
+  });
+
+  it('should check each alternative of a repeated alternation on its own', () => {
+    expect(checkPatternSafety(`(?:"[^"]*"|'[^']*')*;`).safety).toBe('safe');
+    expect(checkPatternSafety('(?:a+|b)*$').safety).toBe('exponential');
+  });
+
+  it('should tell apart classes that only differ outside ASCII', () => {
+    expect(checkPatternSafety('(\\s|\\S)+x').safety).toBe('safe');
+    expect(checkPatternSafety('(\\s|\\u00a0)+x').safety).toBe('exponential');
+    expect(checkPatternSafety('(.|\\s)+x').safety).toBe('exponential');
+  });
+
+  it('should take the case-insensitive flag into account', () => {
+    expect(checkPatternSafety('(A+a)+').safety).toBe('safe');
+    expect(checkPatternSafety('(A+a)+', 'i').safety).toBe('exponential');
+  });
+});
@@ -1,5 +1,8 @@
 import { RegexAnalyzer } from '../../scanner/analyzers/regex';
 import { Rule, Severity, Category } from '../../scanner/core/types';
+import { createFileContext } from '../../scanner/core/file-context';
+import { RuleProgram, compileRule } from '../../scanner/core/rule-program';
+import { RegexFinding } from '../../scanner/analyzers/regex-finding';
 
 describe('RegexAnalyzer', () => {
   const analyzer = new RegexAnalyzer();
@@ -144,6 +147,26 @@ line 7`;
       expect(findings[0].snippet).toContain('→'); // Should mark the vulnerable line
     });
 
+    it('should keep only the lines its snippet shows', () => {
+      const lines = Array.from({ length: 100 }, (_, i) => `line ${i + 1}`);
+      lines[49] = 'vulnerable line';
+      const rule = createTestRule('vulnerable');
+      const program = RuleProgram.compile([rule], 'native');
+      const [compiled] = program.rules;
+      const location = { file: 'test.js', line: 50, column: 0 };
+
+      const finding = new RegexFinding(compiled, compiled.patterns[0], lines, 49, location, 10);
+      // The file's lines are not referenced once the finding exists
+      lines.fill('');
+
+      expect(finding.toCompact(program)).toMatchObject({
+        firstLine: 47,
+        lines: ['line 48', 'line 49', 'vulnerable line', 'line 51', 'line 52'],
+      });
+      expect(finding.snippet).toContain('→   50 | vulnerable line');
+      expect(finding.fix.before).toBe('vulnerable line');
+    });
+
     it('should include metadata in findings', async () => {
       const code = 'vulnerable pattern';
       const rule = createTestRule('vulnerable');
@@ -240,6 +263,137 @@ const secure = 'implementation';
       expect(findings).toHaveLength(0);
     });
 
+    it('should reuse a compiled rule across files', async () => {
+      const rule = createTestRule('secret');
+
+      const first = await analyzer.analyze('a.js', 'const secret = 1;\nsecret();', rule);
+      const second = await analyzer.analyze('b.js', 'secret', rule);
+
+      expect(first).toHaveLength(2);
+      expect(second).toHaveLength(1);
+      expect(second[0].location.column).toBe(0);
+    });
+
+    it('should match patterns declared without the global flag', async () => {
+      const rule = createTestRule('eval');
+      rule.patterns = [{ regex: 'eval', flags: 'i' }];
+
+      const findings = await analyzer.analyze('test.js', 'EVAL(a); eval(b);', rule);
+
+      expect(findings).toHaveLength(2);
+    });
+
+    it('should not let single-line patterns span lines', async () => {
+      const code = `const password
+  = "hunter22";
+const other = 1;`;
+      const rule = createTestRule('password\\s*=\\s*"[^"]+"');
+
+      const findings = await analyzer.analyze('test.js', code, rule);
+
+      expect(findings).toHaveLength(0);
+    });
+
+    it('should match patterns flagged as multiline across lines', async () => {
+      const code = `const password
+  = "hunter22";`;
+      const rule = createTestRule('password\\s*=\\s*"[^"]+"');
+      rule.patterns = [{ regex: rule.patterns[0].regex, flags: 'g', multiline: true }];
+
+      const findings = await analyzer.analyze('test.js', code, rule);
+
+      expect(findings).toHaveLength(1);
+      expect(findings[0].location).toEqual({
+        file: 'test.js',
+        line: 1,
+        column: 6,
+        endLine: 2,
+        endColumn: 14,
+      });
+    });
+
+    it('should anchor ^ at line starts in buffer mode', async () => {
+      const code = `import x
+  import y
+import z`;
+      const rule = createTestRule('^import');
+      rule.patterns = [{ regex: '^import', flags: 'g' }];
+
+      const findings = await analyzer.analyze('test.js', code, rule);
+
+      expect(findings.map((f) => f.location.line)).toEqual([1, 3]);
+    });
+
+    it('should return the same locations in buffer and line mode', async () => {
+      const code = `const apiKey = "abc"; const password = "secret"
+password
+= "split"; password = "again"
+`;
+      const rule = createTestRule('(apiKey|password)\\s*=\\s*"');
+      const lineAnalyzer = new RegexAnalyzer({ mode: 'line' });
+
+      const buffer = await analyzer.analyze('test.js', code, rule);
+      const line = await lineAnalyzer.analyze('test.js', code, rule);
+
+      expect(buffer.map((f) => f.location)).toEqual(line.map((f) => f.location));
+      expect(buffer.map((f) => f.location.column)).toEqual([6, 28, 11]);
+    });
+
+    it('should not let lookarounds see neighbouring lines in buffer mode', async () => {
+      const code = `import yaml
+data = yaml.load(f,
+    Loader=yaml.SafeLoader)
+app.use(session({ cookie: {
+  httpOnly: true } }))
+`;
+      const yamlRule = createTestRule('yaml\\.load\\s*\\([^,)]+(?!,\\s*Loader\\s*=)');
+      const sessionRule = createTestRule(
+        'session\\s*\\(\\s*\\{(?!.*cookie\\s*:\\s*\\{[^}]*httpOnly)'
+      );
+      const lineAnalyzer = new RegexAnalyzer({ mode: 'line' });
+
+      for (const rule of [yamlRule, sessionRule]) {
+        const buffer = await analyzer.analyze('test.py', code, rule);
+        const line = await lineAnalyzer.analyze('test.py', code, rule);
+        expect(buffer).toHaveLength(1);
+        expect(buffer.map((f) => f.location)).toEqual(line.map((f) => f.location));
+      }
+    });
+
+    it('should anchor $ the same way as line mode on CRLF input', async () => {
+      const code = 'password = hunter2\r\nconst x = 1\r\n';
+      const rule = createTestRule('password\\s*=\\s*\\w+$');
+      rule.patterns = [{ regex: 'password\\s*=\\s*\\w+$', flags: 'g' }];
+      const lineAnalyzer = new RegexAnalyzer({ mode: 'line' });
+
+      const buffer = await analyzer.analyze('test.js', code, rule);
+      const line = await lineAnalyzer.analyze('test.js', code, rule);
+
+      expect(line).toHaveLength(0);
+      expect(buffer).toHaveLength(0);
+    });
+
+    it('should abort a pattern that exceeds its time budget and keep going', async () => {
+      // Overlapping alternation is not rejected at load time, but backtracks
+      // exponentially on a long run of a's without a match
+      const slow = createTestRule('(a|aa)+$');
+      const fast = createTestRule('password');
+      const context = createFileContext('test.js', 'a'.repeat(64) + '!\npassword', 'javascript');
+      const timedAnalyzer = new RegexAnalyzer({ timeout: 50 });
+
+      const slowFindings = await timedAnalyzer.analyzeContext(context, compileRule(slow));
+      const fastFindings = await timedAnalyzer.analyzeContext(context, compileRule(fast));
+
+      expect(slowFindings).toHaveLength(0);
+      expect(fastFindings).toHaveLength(1);
+      expect(context.diagnostics).toHaveLength(1);
+      expect(context.diagnostics[0]).toMatchObject({
+        type: 'rule-timeout',
+        rule: 'test-rule',
+        file: 'test.js',
+      });
+    });
+
     it('should generate unique finding IDs', async () => {
       const code = `
 pattern here
@@ -255,5 +409,20 @@ pattern here
       const uniqueIds = new Set(ids);
       expect(uniqueIds.size).toBe(3); // All IDs should be unique
     });
+
+    it('should include snippet, fix and metadata when serialized', async () => {
+      const code = 'const a = 1;\neval(userInput);\n';
+      const rule = createTestRule('eval\\(');
+
+      const findings = await analyzer.analyze('test.js', code, rule);
+      const serialized = JSON.parse(JSON.stringify(findings[0]));
+
+      expect(serialized.rule).toBe('test-rule');
+      expect(serialized.location).toEqual({ file: 'test.js', line: 2, column: 0 });
+      expect(serialized.snippet).toBe(findings[0].snippet);
+      expect(serialized.snippet).toContain('→    2 | eval(userInput);');
+      expect(serialized.fix.before).toBe('eval(userInput);');
+      expect(serialized.metadata.cwe).toBe('CWE-TEST');
+    });
   });
 });
@@ -1,6 +1,9 @@
+import { PassThrough } from 'stream';
 import { JsonReporter } from '../../reporters/json';
+import { NdjsonReporter } from '../../reporters/ndjson';
+import { SarifReporter } from '../../reporters/sarif';
 import { PlainTextReporter } from '../../reporters/plaintext';
-import { ScanResult, Finding, Severity, Category } from '../../scanner/core/types';
+import { ScanResult, ScanEvent, Finding, Severity, Category } from '../../scanner/core/types';
 
 describe('Reporters', () => {
   const createTestFinding = (overrides: Partial<Finding> = {}): Finding => ({
@@ -153,6 +156,162 @@ describe('Reporters', () => {
     });
   });
 
+  describe('NdjsonReporter', () => {
+    const reporter = new NdjsonReporter();
+
+    const parseLines = (output: string) =>
+      output
+        .trim()
+        .split('\n')
+        .map((line) => JSON.parse(line));
+
+    it('should write one line per finding followed by a summary record', () => {
+      const result = createTestResult([
+        createTestFinding({ severity: Severity.CRITICAL }),
+        createTestFinding({ severity: Severity.HIGH }),
+      ]);
+      const records = parseLines(reporter.generate(result));
+
+      expect(records.map((record) => record.type)).toEqual(['finding', 'finding', 'summary']);
+      expect(records[0].severity).toBe('critical');
+      expect(records[2].summary.total).toBe(2);
+      expect(records[2].scan.path).toBe('/test/path');
+    });
+
+    it('should stream findings from scan events', async () => {
+      const result = createTestResult([createTestFinding()]);
+      async function* events(): AsyncGenerator<ScanEvent> {
+        yield { type: 'start', files: 1, rules: 1 };
+        yield {
+          type: 'file',
+          file: 'test.js',
+          index: 0,
+          findings: result.findings,
+          diagnostics: [],
+          scanned: true,
+        };
+        yield { type: 'complete', scan: result.scan, summary: result.summary, diagnostics: [] };
+      }
+
+      const out = new PassThrough();
+      const chunks: string[] = [];
+      out.on('data', (chunk) => chunks.push(chunk.toString()));
+      const complete = await reporter.write(events(), out);
+
+      expect(complete.summary).toEqual(result.summary);
+      expect(parseLines(chunks.join(''))).toEqual(parseLines(reporter.generate(result)));
+    });
+  });
+
+  describe('SarifReporter', () => {
+    const reporter = new SarifReporter();
+
+    it('should generate a SARIF 2.1.0 log', () => {
+      const result = createTestResult([createTestFinding()]);
+      const log = JSON.parse(reporter.generate(result));
+
+      expect(log.version).toBe('2.1.0');
+      expect(log.runs.length).toBe(1);
+      expect(log.runs[0].tool.driver.name).toBe('VibeSec');
+      expect(log.runs[0].results.length).toBe(1);
+    });
+
+    it('should describe each rule once and reference it by index', () => {
+      const result = createTestResult([
+        createTestFinding({ rule: 'sql-injection' }),
+        createTestFinding({ rule: 'hardcoded-secret', severity: Severity.LOW }),
+        createTestFinding({ rule: 'sql-injection' }),
+      ]);
+      const [run] = JSON.parse(reporter.generate(result)).runs;
+
+      expect(run.tool.driver.rules.map((rule: { id: string }) => rule.id)).toEqual([
+        'sql-injection',
+        'hardcoded-secret',
+      ]);
+      expect(run.results.map((r: { ruleIndex: number }) => r.ruleIndex)).toEqual([0, 1, 0]);
+      expect(run.results.map((r: { level: string }) => r.level)).toEqual([
+        'error',
+        'note',
+        'error',
+      ]);
+      expect(run.results[0].message.text).not.toContain('Use parameterized queries');
+      expect(run.tool.driver.rules[0].help.text).toBe('Use parameterized queries');
+    });
+
+    it('should write a repeated rule description only once', () => {
+      const result = createTestResult([
+        createTestFinding(),
+        createTestFinding(),
+        createTestFinding(),
+      ]);
+      const output = reporter.generate(result);
+      const [run] = JSON.parse(output).runs;
+
+      expect(output.split('SQL injection vulnerability detected')).toHaveLength(2);
+      expect(run.tool.driver.rules[0].fullDescription.text).toBe(
+        'SQL injection vulnerability detected'
+      );
+      expect(run.results[0].message.text).toBe(result.findings[0].title);
+    });
+
+    it('should describe rules that share an id separately', () => {
+      const result = createTestResult([
+        createTestFinding({ rule: 'insecure-random' }),
+        createTestFinding({ rule: 'insecure-random', severity: Severity.LOW }),
+        createTestFinding({ rule: 'insecure-random' }),
+      ]);
+      const [run] = JSON.parse(reporter.generate(result)).runs;
+      const rules = run.tool.driver.rules;
+
+      expect(rules).toHaveLength(2);
+      expect(rules[0].id).toBe('insecure-random');
+      expect(rules[1].id).toMatch(/^insecure-random\/[0-9a-f]{8}$/);
+      expect(rules[1].defaultConfiguration.level).toBe('note');
+      expect(run.results.map((r: { ruleIndex: number }) => r.ruleIndex)).toEqual([0, 1, 0]);
+      expect(run.results.map((r: { ruleId: string }) => r.ruleId)).toEqual([
+        rules[0].id,
+        rules[1].id,
+        rules[0].id,
+      ]);
+    });
+
+    it('should use one-based columns and paths relative to the scan root', () => {
+      const finding = createTestFinding({
+        location: { file: '/test/path/src/db.js', line: 10, column: 5 },
+      });
+      const [run] = JSON.parse(reporter.generate(createTestResult([finding]))).runs;
+      const { physicalLocation } = run.results[0].locations[0];
+
+      expect(physicalLocation.artifactLocation).toEqual({ uri: 'src/db.js', uriBaseId: 'SRCROOT' });
+      expect(physicalLocation.region.startLine).toBe(10);
+      expect(physicalLocation.region.startColumn).toBe(6);
+    });
+
+    it('should stream the same log as generate', async () => {
+      const result = createTestResult([createTestFinding(), createTestFinding()]);
+      async function* events(): AsyncGenerator<ScanEvent> {
+        for (const finding of result.findings) {
+          yield {
+            type: 'file',
+            file: finding.location.file,
+            index: 0,
+            findings: [finding],
+            diagnostics: [],
+            scanned: true,
+          };
+        }
+        yield { type: 'complete', scan: result.scan, summary: result.summary, diagnostics: [] };
+      }
+
+      const out = new PassThrough();
+      const chunks: string[] = [];
+      out.on('data', (chunk) => chunks.push(chunk.toString()));
+      await new SarifReporter({ root: '/test/path' }).write(events(), out);
+
+      expect(JSON.parse(chunks.join(''))).toEqual(JSON.parse(reporter.generate(result)));
+    });
+  });
+
   describe('PlainTextReporter', () => {
     const reporter = new PlainTextReporter();
 
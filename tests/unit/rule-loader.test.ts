@@ -1,6 +1,6 @@
 import * as path from 'path';
 import * as fs from 'fs/promises';
-import { RuleLoader } from '../../scanner/core/rule-loader';
+import { RULE_BUNDLE_FILE, RuleLoader } from '../../scanner/core/rule-loader';
 import { Rule } from '../../scanner/core/types';
 
 describe('RuleLoader', () => {
@@ -303,6 +303,200 @@ name: Incomplete Rule
       consoleErrorSpy.mockRestore();
     });
 
+    it('should reject rules that do not match the schema with the fields at fault', async () => {
+      const invalidYaml = `
+id: test-invalid
+name: Invalid Rule
+severity: urgent
+patterns:
+  - regex: "eval"
+    flags: "gx"
+  - ""
+languages: javascript
+`;
+      await fs.writeFile(path.join(testRulesPath, 'invalid.yaml'), invalidYaml);
+
+      const consoleErrorSpy = jest.spyOn(console, 'error').mockImplementation();
+
+      const rules = await new RuleLoader(testRulesPath).load();
+
+      expect(rules).toHaveLength(0);
+      const [, message] = consoleErrorSpy.mock.calls[0];
+      expect(message).toContain('Invalid rule test-invalid');
+      expect(message).toContain('severity: must be one of critical, high, medium, low');
+      expect(message).toContain('patterns[0].flags: must match ^[dgimsuvy]*$');
+      expect(message).toContain('patterns[1]: must not be empty');
+      expect(message).toContain('languages: must be array');
+
+      consoleErrorSpy.mockRestore();
+    });
+
+    it('should keep file order when reading many files concurrently', async () => {
+      const ids = Array.from({ length: 40 }, (_, i) => `test-${String(i).padStart(2, '0')}`);
+      for (const id of ids) {
+        const yaml = `id: ${id}\nname: Rule ${id}\npatterns:\n  - "${id}"\n`;
+        await fs.writeFile(path.join(testRulesPath, `${id}.yaml`), yaml);
+      }
+
+      const rules = await new RuleLoader(testRulesPath).load();
+
+      expect(rules.map((rule) => rule.id)).toEqual(ids);
+    });
+
+    it('should report invalid regex patterns at load time', async () => {
+      const ruleYaml = `
+rules:
+  - id: test-valid
+    name: Valid Rule
+    patterns:
+      - "valid\\\\("
+  - id: test-broken-regex
+    name: Broken Regex
+    patterns:
+      - "unclosed(group"
+`;
+      await fs.writeFile(path.join(testRulesPath, 'broken.yaml'), ruleYaml);
+
+      const consoleErrorSpy = jest.spyOn(console, 'error').mockImplementation();
+
+      const loader = new RuleLoader(testRulesPath);
+      const rules = await loader.load();
+
+      expect(rules.map((r) => r.id)).toEqual(['test-valid']);
+      expect(loader.getProgram().errors).toHaveLength(1);
+      expect(loader.getProgram().errors[0].ruleId).toBe('test-broken-regex');
+      expect(consoleErrorSpy).toHaveBeenCalledWith(
+        expect.stringContaining('Error compiling rule test-broken-regex'),
+        expect.stringContaining('Invalid pattern')
+      );
+
+      consoleErrorSpy.mockRestore();
+    });
+
+    it('should reject patterns prone to catastrophic backtracking', async () => {
+      const ruleYaml = `
+rules:
+  - id: test-valid
+    name: Valid Rule
+    patterns:
+      - "valid\\\\("
+  - id: test-redos
+    name: Nested Quantifier
+    patterns:
+      - "(\\\\w+\\\\s?)+$"
+`;
+      await fs.writeFile(path.join(testRulesPath, 'redos.yaml'), ruleYaml);
+
+      const consoleErrorSpy = jest.spyOn(console, 'error').mockImplementation();
+
+      const loader = new RuleLoader(testRulesPath);
+      const rules = await loader.load();
+
+      expect(rules.map((r) => r.id)).toEqual(['test-valid']);
+      expect(loader.getProgram().errors[0].ruleId).toBe('test-redos');
+      expect(loader.getProgram().errors[0].message).toContain('catastrophic backtracking');
+
+      consoleErrorSpy.mockRestore();
+    });
+
+    it('should expose compiled patterns after load', async () => {
+      const ruleYaml = `
+id: test-compiled
+name: Compiled Rule
+patterns:
+  - regex: "eval\\\\("
+    flags: i
+`;
+      await fs.writeFile(path.join(testRulesPath, 'compiled.yaml'), ruleYaml);
+
+      const loader = new RuleLoader(testRulesPath);
+      const rules = await loader.load();
+      const program = loader.getProgram();
+
+      expect(program.rules).toHaveLength(1);
+      expect(program.rules[0].rule).toBe(rules[0]);
+      expect(program.rules[0].patterns[0].regex.source).toBe('eval\\(');
+      expect(program.rules[0].patterns[0].regex.flags).toBe('gi');
+    });
+
+    it('should parse optional keywords', async () => {
+      const ruleYaml = `
+id: test-keywords
+name: Keywords Rule
+keywords:
+  - dangerous
+patterns:
+  - "\\\\w+\\\\("
+`;
+      await fs.writeFile(path.join(testRulesPath, 'keywords.yaml'), ruleYaml);
+
+      const loader = new RuleLoader(testRulesPath);
+      const rules = await loader.load();
+
+      expect(rules[0].keywords).toEqual(['dangerous']);
+      expect(loader.getProgram().rules[0].keywords).toEqual(['dangerous']);
+    });
+
+    it('should compile rules on the linear backend when asked to', async () => {
+      const ruleYaml = `
+rules:
+  - id: test-default
+    name: Default Backend
+    patterns:
+      - "(\\\\w+\\\\s?)+$"
+  - id: test-per-rule
+    name: Per-rule Backend
+    regexBackend: linear
+    patterns:
+      - "(\\\\w+\\\\s?)+$"
+`;
+      await fs.writeFile(path.join(testRulesPath, 'backend.yaml'), ruleYaml);
+
+      const consoleErrorSpy = jest.spyOn(console, 'error').mockImplementation();
+
+      const nativeLoader = new RuleLoader(testRulesPath);
+      expect((await nativeLoader.load()).map((r) => r.id)).toEqual(['test-per-rule']);
+
+      const linearLoader = new RuleLoader(testRulesPath, { regexBackend: 'linear' });
+      await linearLoader.load();
+      const backends = linearLoader.getProgram().rules.map((r) => r.patterns[0].backend);
+      expect(backends).toEqual(['linear', 'linear']);
+
+      consoleErrorSpy.mockRestore();
+    });
+
+    it('should index enabled rules by language', async () => {
+      const ruleYaml = `
+rules:
+  - id: test-js
+    name: JavaScript Rule
+    languages: [javascript]
+    patterns: ["js"]
+  - id: test-any
+    name: Any Language Rule
+    patterns: ["any"]
+  - id: test-py
+    name: Python Rule
+    languages: [python]
+    patterns: ["py"]
+  - id: test-disabled
+    name: Disabled Rule
+    languages: [javascript]
+    enabled: false
+    patterns: ["off"]
+`;
+      await fs.writeFile(path.join(testRulesPath, 'languages.yaml'), ruleYaml);
+
+      const loader = new RuleLoader(testRulesPath);
+      await loader.load();
+      const program = loader.getProgram();
+      const ids = (language: string) => program.rulesForLanguage(language).map((r) => r.rule.id);
+
+      expect(ids('javascript')).toEqual(['test-js', 'test-any']);
+      expect(ids('python')).toEqual(['test-any', 'test-py']);
+      expect(ids('go')).toEqual(['test-any']);
+    });
+
     it('should load real rules from default directory', async () => {
       const loader = new RuleLoader();
       const rules = await loader.load();
@@ -316,4 +510,78 @@ name: Incomplete Rule
       expect(sqlInjectionRule?.metadata?.cwe).toBeDefined();
     });
   });
+
+  describe('compileBundle()', () => {
+    const ruleYaml = (id: string) => `
+id: ${id}
+name: Bundled Rule
+severity: high
+patterns:
+  - "dangerouslyEval"
+languages:
+  - javascript
+`;
+
+    it('should load the same rules from a fresh bundle', async () => {
+      await fs.writeFile(path.join(testRulesPath, 'a.yaml'), ruleYaml('test-a'));
+      await fs.writeFile(path.join(testRulesPath, 'b.yaml'), ruleYaml('test-b'));
+      const yamlLoader = new RuleLoader(testRulesPath);
+      const fromYaml = await yamlLoader.load();
+
+      const { file, rules } = await new RuleLoader(testRulesPath).compileBundle();
+      expect(file).toBe(path.join(testRulesPath, RULE_BUNDLE_FILE));
+      expect(rules).toBe(2);
+
+      // Rules only present in the bundle show it is what was loaded
+      const bundle = JSON.parse(await fs.readFile(file, 'utf-8'));
+      bundle.rules[0].name = 'From Bundle';
+      await fs.writeFile(file, JSON.stringify(bundle));
+      const bundleLoader = new RuleLoader(testRulesPath);
+      const fromBundle = await bundleLoader.load();
+      expect(fromBundle).toHaveLength(2);
+      expect(fromBundle[0].name).toBe('From Bundle');
+      expect(fromBundle[1]).toEqual(JSON.parse(JSON.stringify(fromYaml[1])));
+
+      const [compiled] = bundleLoader.getProgram().rules;
+      expect(compiled.keywords).toEqual(['dangerouslyeval']);
+      expect(compiled.keywords).toEqual(yamlLoader.getProgram().rules[0].keywords);
+      expect(compiled.patterns[0].suspicious).toBe(false);
+    });
+
+    it('should still reject bundled patterns the safety check reports as exponential', async () => {
+      await fs.writeFile(path.join(testRulesPath, 'a.yaml'), ruleYaml('test-a'));
+      await fs.writeFile(path.join(testRulesPath, 'b.yaml'), ruleYaml('test-b'));
+      const { file } = await new RuleLoader(testRulesPath).compileBundle();
+
+      const bundle = JSON.parse(await fs.readFile(file, 'utf-8'));
+      bundle.rules[0].patterns[0].regex = '(a+)+b';
+      await fs.writeFile(file, JSON.stringify(bundle));
+      const loader = new RuleLoader(testRulesPath);
+      const rules = await loader.load();
+
+      expect(rules.map((rule) => rule.id)).toEqual(['test-b']);
+      expect(loader.getProgram().errors[0].message).toContain('catastrophic backtracking');
+    });
+
+    it('should fall back to the rule files once one changes', async () => {
+      await fs.writeFile(path.join(testRulesPath, 'a.yaml'), ruleYaml('test-a'));
+      await new RuleLoader(testRulesPath).compileBundle();
+
+      await fs.writeFile(path.join(testRulesPath, 'a.yaml'), ruleYaml('test-edited'));
+      await fs.writeFile(path.join(testRulesPath, 'c.yaml'), ruleYaml('test-c'));
+      const rules = await new RuleLoader(testRulesPath).load();
+
+      expect(rules.map((rule) => rule.id)).toEqual(['test-edited', 'test-c']);
+    });
+
+    it('should not write a bundle for invalid rules', async () => {
+      await fs.writeFile(path.join(testRulesPath, 'a.yaml'), ruleYaml('test-a'));
+      await fs.writeFile(path.join(testRulesPath, 'bad.yaml'), 'id: test-bad\nname: Bad\n');
+
+      await expect(new RuleLoader(testRulesPath).compileBundle()).rejects.toThrow(
+        'missing required fields'
+      );
+      await expect(fs.access(path.join(testRulesPath, RULE_BUNDLE_FILE))).rejects.toThrow();
+    });
+  });
 });
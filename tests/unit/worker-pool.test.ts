@@ -0,0 +1,32 @@
+/**
+ * Unit tests for splitting files into worker batches
+ */
+
+import { DEFAULT_WORKER_BATCH_SIZE, createBatches } from '../../scanner/core/worker-pool';
+
+describe('createBatches', () => {
+  const files = (count: number) => Array.from({ length: count }, (_, i) => `file-${i}.js`);
+
+  it('should keep every file once, in order', () => {
+    const input = files(1000);
+    const batches = createBatches(input, 4);
+
+    expect(batches.flat()).toEqual(input);
+  });
+
+  it('should give each worker several batches', () => {
+    const batches = createBatches(files(100), 4);
+
+    expect(batches.length).toBeGreaterThan(4 * 3);
+  });
+
+  it('should cap the batch size on large inputs', () => {
+    const batches = createBatches(files(10000), 2);
+
+    expect(Math.max(...batches.map((batch) => batch.length))).toBe(DEFAULT_WORKER_BATCH_SIZE);
+  });
+
+  it('should return no batches for no files', () => {
+    expect(createBatches([], 8)).toEqual([]);
+  });
+});